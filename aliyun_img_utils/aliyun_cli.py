@@ -22,17 +22,35 @@
 
 import json
 import logging
+import os
 import sys
 import click
 
+from functools import partial
+
+from aliyun_img_utils.aliyun_daemon import (
+    AliyunDaemon,
+    DaemonClientGroup,
+    get_socket_path,
+    send_request
+)
+from aliyun_img_utils.aliyun_endpoints import AUTO_ENDPOINT
 from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_inventory import ImageInventory
+from aliyun_img_utils.aliyun_profiling import CommandProfiler
+from aliyun_img_utils.aliyun_replication import (
+    REPLICATION_STRATEGIES,
+    load_region_topology,
+    simulate_replication
+)
 from aliyun_img_utils.aliyun_utils import (
     get_config,
     echo_style,
     handle_errors,
     process_shared_options,
     get_logger,
-    click_progress_callback
+    click_progress_callback,
+    click_image_progress_callback
 )
 
 
@@ -94,6 +112,24 @@ shared_options = [
         '--region',
         type=click.STRING,
         help='The region to use for the image requests.'
+    ),
+    click.option(
+        '--timings',
+        is_flag=True,
+        help='Display a summary of the API call timings per action '
+             'and region on stderr when the command finishes.'
+    ),
+    click.option(
+        '--metrics-file',
+        type=click.Path(dir_okay=False, writable=True),
+        help='Write every API call record and the timing summary as '
+             'JSON to this file when the command finishes.'
+    ),
+    click.option(
+        '--trace-file',
+        type=click.Path(dir_okay=False, writable=True),
+        help='Write spans of the image methods, regions and waiters as '
+             'a Chrome trace event JSON file when the command finishes.'
     )
 ]
 
@@ -113,12 +149,28 @@ def print_license(ctx, param, value):
     ctx.exit()
 
 
+def parse_destinations(ctx, param, value):
+    destinations = []
+
+    for destination in value:
+        bucket_name, _, region = destination.partition(':')
+
+        if not bucket_name or not region:
+            raise click.BadParameter(
+                f'{destination} is not in the format BUCKET:REGION'
+            )
+
+        destinations.append((bucket_name, region))
+
+    return destinations
+
+
 def abort_if_false(ctx, param, value):
     if not value:
         ctx.abort()
 
 
-@click.group()
+@click.group(cls=DaemonClientGroup)
 @click.version_option()
 @click.option(
     '--license',
@@ -128,8 +180,20 @@ def abort_if_false(ctx, param, value):
     is_eager=True,
     help='Show license information.'
 )
+@click.option(
+    '--profile-cpu',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Profile the command with cProfile and write the pstats '
+         'report to this file.'
+)
+@click.option(
+    '--profile-mem',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Trace memory allocations of the command with tracemalloc and '
+         'write the top allocations to this file.'
+)
 @click.pass_context
-def main(context):
+def main(context, profile_cpu, profile_mem):
     """
     The command line interface provides aliyun image utilities.
 
@@ -139,6 +203,79 @@ def main(context):
     if context.obj is None:
         context.obj = {}
 
+    if profile_cpu or profile_mem:
+        profiler = CommandProfiler(profile_cpu, profile_mem)
+        profiler.start()
+        context.call_on_close(
+            lambda: click.echo(profiler.stop(), err=True)
+        )
+
+
+@click.command()
+@click.option(
+    '--socket',
+    'socket_path',
+    type=click.Path(dir_okay=False),
+    help='Unix socket to listen on. Default: '
+         '$XDG_RUNTIME_DIR/aliyun-img-utils-<uid>.sock'
+)
+@click.option(
+    '--status',
+    is_flag=True,
+    help='Display the status of the running daemon.'
+)
+@click.option(
+    '--stop',
+    is_flag=True,
+    help='Stop the running daemon.'
+)
+def serve(socket_path, status, stop):
+    """
+    Run image commands in a long running daemon.
+
+    While the daemon is running image commands of the CLI are forwarded
+    to it and reuse pooled clients and cached config files. Commands
+    which ask for confirmation always run locally. Set
+    ALIYUN_IMG_UTILS_NO_DAEMON to run all commands locally. Commands
+    are only forwarded to a socket which is private to the user.
+    """
+    socket_path = socket_path or get_socket_path()
+
+    if not socket_path:
+        echo_style(
+            'XDG_RUNTIME_DIR is not set, use --socket to choose a private '
+            'socket path.',
+            True,
+            fg='red'
+        )
+        sys.exit(1)
+
+    if status or stop:
+        action = 'status' if status else 'shutdown'
+
+        try:
+            response = send_request({'action': action}, socket_path)
+        except OSError:
+            echo_style(f'No daemon on {socket_path}', True, fg='red')
+            sys.exit(1)
+
+        click.echo(json.dumps(response, indent=2))
+        return
+
+    with handle_errors(logging.INFO, False):
+        daemon = AliyunDaemon(main, socket_path)
+
+    click.echo(f'Listening on {socket_path}', err=True)
+    daemon.activate()
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.deactivate()
+        daemon.server_close()
+
 
 @click.group()
 def image():
@@ -178,6 +315,20 @@ def image():
     help='Session timeout (in minutes) for image upload. '
          'Default is 180 minutes.'
 )
+@click.option(
+    '--transfer-engine',
+    type=click.Choice(['sync', 'async']),
+    default='sync',
+    help='Transfer engine for the upload. The async engine uploads '
+         'parts concurrently and requires aiohttp. Default is sync.'
+)
+@click.option(
+    '--max-concurrency',
+    type=click.IntRange(min=1),
+    default=8,
+    help='Number of parts uploaded concurrently by the async '
+         'transfer engine. Default is 8.'
+)
 @click.option(
     '--direct-transfer',
     'transfer_acceleration',
@@ -193,6 +344,39 @@ def image():
          'See docs for more info: '
          'https://www.alibabacloud.com/help/doc-detail/131312.htm.'
 )
+@click.option(
+    '--auto-transfer',
+    'transfer_acceleration',
+    flag_value=AUTO_ENDPOINT,
+    help='Probe the accelerate, public and internal endpoints of the '
+         'region and upload to the fastest reachable one. Each probe '
+         'writes and deletes a temporary 256 KiB object '
+         '(.aliyun-img-utils-probe-*) in the bucket. The selected '
+         'endpoint is cached per host and region for a day.'
+)
+@click.option(
+    '--destination',
+    'destinations',
+    multiple=True,
+    callback=parse_destinations,
+    metavar='BUCKET:REGION',
+    help='Also upload the image to this bucket in this region. Can be '
+         'repeated. The image file is read once and uploaded to all '
+         'buckets concurrently. Only supported by the sync transfer '
+         'engine.'
+)
+@click.option(
+    '--transfer-stats',
+    is_flag=True,
+    help='Display the part throughput and latency histograms of the '
+         'upload on stderr.'
+)
+@click.option(
+    '--transfer-report',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Write the per part telemetry and summary of the upload as '
+         'JSON to this file, also if the upload fails.'
+)
 @add_options(shared_options)
 @click.pass_context
 def upload(
@@ -202,12 +386,26 @@ def upload(
     blob_name,
     force_replace_image,
     timeout,
+    transfer_engine,
+    max_concurrency,
     transfer_acceleration,
+    destinations,
+    transfer_stats,
+    transfer_report,
     **kwargs
 ):
     """
     Upload a qcow2 image to a storage bucket in the current region.
+
+    With destinations the image is uploaded to the bucket in the
+    current region and all destination buckets at the same time.
     """
+    if destinations and transfer_engine == 'async':
+        raise click.UsageError(
+            'The async transfer engine does not support --destination. '
+            'Use the default sync engine to upload to multiple buckets.'
+        )
+
     process_shared_options(context.obj, kwargs)
     config_data = get_config(context.obj)
     logger = get_logger(config_data.log_level)
@@ -224,9 +422,7 @@ def upload(
             timeout=timeout
         )
 
-        keyword_args = {
-            'force_replace_image': force_replace_image
-        }
+        keyword_args = {'force_replace_image': force_replace_image}
 
         if page_size:
             keyword_args['page_size'] = page_size
@@ -237,10 +433,31 @@ def upload(
         if config_data.log_level != logging.ERROR:
             keyword_args['progress_callback'] = click_progress_callback
 
-        blob_name = aliyun_image.upload_image_tarball(
-            image_file,
-            **keyword_args
-        )
+        try:
+            if destinations:
+                blob_name = aliyun_image.upload_image_tarball_to_buckets(
+                    image_file,
+                    [(config_data.bucket_name, config_data.region)] +
+                    destinations,
+                    **keyword_args
+                )
+            else:
+                blob_name = aliyun_image.upload_image_tarball(
+                    image_file,
+                    transfer_engine=transfer_engine,
+                    max_concurrency=max_concurrency,
+                    **keyword_args
+                )
+        finally:
+            # Telemetry is only recorded for single bucket uploads, it
+            # is reported for failed uploads too
+            telemetry = aliyun_image.transfer_telemetry
+
+            if transfer_stats and telemetry:
+                click.echo(telemetry.format_summary(), err=True)
+
+            if transfer_report and telemetry:
+                telemetry.write_json(transfer_report)
 
     if config_data.log_level != logging.ERROR:
         echo_style(
@@ -331,6 +548,9 @@ def create(
         if nvme_support:
             keyword_args['nvme_support'] = nvme_support
 
+        if config_data.log_level != logging.ERROR:
+            keyword_args['progress_callback'] = click_image_progress_callback
+
         image_id = aliyun_image.create_compute_image(
             image_name,
             image_description,
@@ -401,6 +621,84 @@ def delete(context, image_name, force, regions, **kwargs):
             sys.exit(0)
 
 
+@click.command()
+@click.option(
+    '--regions',
+    help='A comma separated list of region ids to delete expired '
+         'images in. If no regions are provided expired images are '
+         'deleted in all available regions.'
+)
+@click.option(
+    '--max-workers',
+    type=click.IntRange(min=1),
+    default=10,
+    help='Maximum number of concurrent requests. Default is 10.'
+)
+@click.option(
+    '--dry-run',
+    is_flag=True,
+    help='Only list the images which would be deleted.'
+)
+@click.option(
+    '--force',
+    is_flag=True,
+    help='Forcibly deletes the custom images, regardless of '
+         'whether the images are being used by other instances.'
+)
+@add_options(shared_options)
+@click.pass_context
+def gc(context, regions, max_workers, dry_run, force, **kwargs):
+    """
+    Delete all compute images past their removal date.
+
+    The removal date is based on the "Removal date" tag
+    added when an image is deprecated. Images are deleted
+    the day after their removal date.
+    """
+    process_shared_options(context.obj, kwargs)
+    config_data = get_config(context.obj)
+    logger = get_logger(config_data.log_level)
+
+    with handle_errors(config_data.log_level, config_data.no_color):
+        aliyun_image = AliyunImage(
+            config_data.access_key,
+            config_data.access_secret,
+            config_data.region,
+            config_data.bucket_name,
+            log_level=config_data.log_level,
+            log_callback=logger
+        )
+
+        keyword_args = {
+            'max_workers': max_workers,
+            'dry_run': dry_run,
+            'force': force
+        }
+
+        if regions:
+            regions = regions.split(',')
+            keyword_args['regions'] = regions
+
+        if dry_run or click.confirm(
+            'Are you sure you want to delete all expired images'
+        ):
+            images = aliyun_image.delete_expired_images(**keyword_args)
+        else:
+            sys.exit(0)
+
+    if config_data.log_level != logging.ERROR:
+        echo_style(
+            json.dumps(images, indent=2),
+            config_data.no_color
+        )
+        action = 'Expired' if dry_run else 'Deleted'
+        echo_style(
+            f'{action} images: '
+            f'{sum(len(names) for names in images.values())}',
+            config_data.no_color
+        )
+
+
 @click.command()
 @click.option(
     '--image-name',
@@ -415,9 +713,59 @@ def delete(context, image_name, force, regions, **kwargs):
          'are provided the image will be copied to all '
          'available regions.'
 )
+@click.option(
+    '--strategy',
+    type=click.Choice(REPLICATION_STRATEGIES),
+    default='source',
+    help='The replication strategy. With source all copies come from '
+         'the current region. With tree regions that already have a '
+         'copy are used as the source for the nearest regions.'
+)
+@click.option(
+    '--topology',
+    type=click.Path(exists=True),
+    help='A YAML file with the region groups and/or estimated copy '
+         'times in seconds used by the tree strategy.'
+)
+@click.option(
+    '--max-concurrency',
+    type=click.IntRange(min=1),
+    default=10,
+    help='The maximum number of concurrent copies with the tree '
+         'strategy.'
+)
+@click.option(
+    '--simulate',
+    is_flag=True,
+    help='Compare the replication strategies against the simulated '
+         'copy times of the topology instead of copying the image.'
+)
+@click.option(
+    '--skip-existing',
+    is_flag=True,
+    help='Skip regions where an image with the same name already '
+         'exists and report the existing image id.'
+)
+@click.option(
+    '--force-replace-image',
+    is_flag=True,
+    help='Delete the image in the destination regions prior to '
+         'copying if it already exists.'
+)
 @add_options(shared_options)
 @click.pass_context
-def replicate(context, image_name, regions, **kwargs):
+def replicate(
+    context,
+    image_name,
+    regions,
+    strategy,
+    topology,
+    max_concurrency,
+    simulate,
+    skip_existing,
+    force_replace_image,
+    **kwargs
+):
     """
     Replicate a compute image to a set of regions.
 
@@ -438,13 +786,32 @@ def replicate(context, image_name, regions, **kwargs):
             log_callback=logger
         )
 
-        keyword_args = {}
+        if topology:
+            topology = load_region_topology(topology)
 
         if regions:
             regions = regions.split(',')
-            keyword_args['regions'] = regions
 
-        images = aliyun_image.replicate_image(image_name, **keyword_args)
+        if simulate:
+            images = {
+                name: simulate_replication(
+                    config_data.region,
+                    regions or aliyun_image.get_regions(),
+                    strategy=name,
+                    topology=topology,
+                    max_concurrency=max_concurrency
+                ) for name in REPLICATION_STRATEGIES
+            }
+        else:
+            images = aliyun_image.replicate_image(
+                image_name,
+                regions=regions,
+                strategy=strategy,
+                topology=topology,
+                max_concurrency=max_concurrency,
+                skip_existing=skip_existing,
+                force_replace_image=force_replace_image
+            )
 
     if config_data.log_level != logging.ERROR:
         echo_style(
@@ -735,13 +1102,391 @@ def share_permission(context, image_name, **kwargs):
     )
 
 
+@click.command()
+@click.option(
+    '--regions',
+    help='A comma separated list of region ids to crawl. If no '
+         'regions are provided all available regions are crawled.'
+)
+@click.option(
+    '--inventory-file',
+    type=click.Path(dir_okay=False),
+    help='Path to the local inventory database. Default: '
+         '<config-dir>/<profile>-inventory.db'
+)
+@click.option(
+    '--cached',
+    is_flag=True,
+    help='Query the local inventory without crawling regions.'
+)
+@click.option(
+    '--incremental',
+    is_flag=True,
+    help='Only list images created since the last crawl and recheck '
+         'the known images by id.'
+)
+@click.option(
+    '--max-workers',
+    type=click.IntRange(min=1),
+    default=10,
+    help='Number of regions to crawl in parallel. Default is 10.'
+)
+@click.option(
+    '--image-name',
+    type=click.STRING,
+    help='Name of the image. Glob style wildcards are supported.'
+)
+@click.option(
+    '--image-id',
+    type=click.STRING,
+    help='ID of the image.'
+)
+@click.option(
+    '--status',
+    type=click.Choice(AliyunImage.IMAGE_STATES),
+    help='The state of the image. By default the query '
+         'will include all states.'
+)
+@click.option(
+    '--tag',
+    type=click.STRING,
+    help='Filter images by tag. Either a tag key or KEY=VALUE.'
+)
+@click.option(
+    '--created-after',
+    type=click.STRING,
+    help='Only include images created at or after this ISO 8601 time.'
+)
+@click.option(
+    '--created-before',
+    type=click.STRING,
+    help='Only include images created before this ISO 8601 time.'
+)
+@add_options(shared_options)
+@click.pass_context
+def inventory(
+    context,
+    regions,
+    inventory_file,
+    cached,
+    incremental,
+    max_workers,
+    image_name,
+    image_id,
+    status,
+    tag,
+    created_after,
+    created_before,
+    **kwargs
+):
+    """
+    Crawl images in all regions into a local inventory and query it.
+
+    If no regions are provided all available regions are crawled.
+    """
+    process_shared_options(context.obj, kwargs)
+    config_data = get_config(context.obj)
+    logger = get_logger(config_data.log_level)
+
+    if not inventory_file:
+        inventory_file = os.path.join(
+            config_data.config_dir,
+            f'{config_data.profile}-inventory.db'
+        )
+
+    with handle_errors(config_data.log_level, config_data.no_color):
+        with ImageInventory(inventory_file) as image_inventory:
+            if not cached:
+                aliyun_image = AliyunImage(
+                    config_data.access_key,
+                    config_data.access_secret,
+                    config_data.region,
+                    config_data.bucket_name,
+                    log_level=config_data.log_level,
+                    log_callback=logger
+                )
+
+                keyword_args = {
+                    'max_workers': max_workers,
+                    'incremental': incremental
+                }
+
+                if regions:
+                    keyword_args['regions'] = regions.split(',')
+
+                aliyun_image.get_image_inventory(
+                    image_inventory,
+                    **keyword_args
+                )
+
+            tag_key = tag_value = None
+            if tag:
+                tag_key, _, tag_value = tag.partition('=')
+                tag_value = tag_value or None
+
+            images = image_inventory.query(
+                image_name=image_name,
+                image_id=image_id,
+                status=status,
+                tag_key=tag_key,
+                tag_value=tag_value,
+                created_after=created_after,
+                created_before=created_before
+            )
+
+    echo_style(
+        json.dumps(images, indent=2),
+        config_data.no_color
+    )
+
+
+@click.command()
+@click.option(
+    '--prefix',
+    type=click.STRING,
+    default='',
+    help='Only list blobs with names starting with prefix.'
+)
+@click.option(
+    '--older-than',
+    type=click.IntRange(min=0),
+    help='Only list blobs last modified more than this many days ago.'
+)
+@add_options(shared_options)
+@click.pass_context
+def list_blobs(context, prefix, older_than, **kwargs):
+    """
+    List blobs in the storage bucket.
+
+    One JSON object is printed per blob as the listing streams.
+    """
+    process_shared_options(context.obj, kwargs)
+    config_data = get_config(context.obj)
+    logger = get_logger(config_data.log_level)
+
+    with handle_errors(config_data.log_level, config_data.no_color):
+        aliyun_image = AliyunImage(
+            config_data.access_key,
+            config_data.access_secret,
+            config_data.region,
+            config_data.bucket_name,
+            log_level=config_data.log_level,
+            log_callback=logger
+        )
+
+        for blob in aliyun_image.list_storage_blobs(prefix, older_than):
+            echo_style(
+                json.dumps({
+                    'name': blob.key,
+                    'size': blob.size,
+                    'last_modified': blob.last_modified
+                }),
+                config_data.no_color
+            )
+
+
+@click.command()
+@click.option(
+    '--prefix',
+    type=click.STRING,
+    default='',
+    help='Only delete blobs with names starting with prefix.'
+)
+@click.option(
+    '--older-than',
+    type=click.IntRange(min=0),
+    help='Only delete blobs last modified more than this many days ago.'
+)
+@click.option(
+    '--max-workers',
+    type=click.IntRange(min=1),
+    default=4,
+    help='Number of delete batches (1000 blobs each) to run '
+         'concurrently. Default is 4.'
+)
+@click.option(
+    '--dry-run',
+    is_flag=True,
+    help='Only list the blobs which would be deleted.'
+)
+@add_options(shared_options)
+@click.pass_context
+def delete_blobs(
+    context,
+    prefix,
+    older_than,
+    max_workers,
+    dry_run,
+    **kwargs
+):
+    """
+    Delete blobs in the storage bucket in batches.
+
+    Blobs are selected by prefix and/or age.
+    """
+    process_shared_options(context.obj, kwargs)
+    config_data = get_config(context.obj)
+    logger = get_logger(config_data.log_level)
+
+    with handle_errors(config_data.log_level, config_data.no_color):
+        aliyun_image = AliyunImage(
+            config_data.access_key,
+            config_data.access_secret,
+            config_data.region,
+            config_data.bucket_name,
+            log_level=config_data.log_level,
+            log_callback=logger
+        )
+
+        blob_names = [
+            blob.key for blob in
+            aliyun_image.list_storage_blobs(prefix, older_than)
+        ]
+
+        if dry_run:
+            echo_style(
+                json.dumps(blob_names, indent=2),
+                config_data.no_color
+            )
+            sys.exit(0)
+
+        if not click.confirm(
+            f'Are you sure you want to delete {len(blob_names)} blobs'
+        ):
+            sys.exit(0)
+
+        keyword_args = {'max_workers': max_workers}
+
+        if config_data.log_level != logging.ERROR:
+            keyword_args['progress_callback'] = partial(
+                click_progress_callback,
+                label='Deleting blobs'
+            )
+
+        deleted = aliyun_image.delete_storage_blobs(
+            blob_names,
+            **keyword_args
+        )
+
+    if config_data.log_level != logging.ERROR:
+        echo_style(
+            f'Deleted {len(deleted)} of {len(blob_names)} blobs',
+            config_data.no_color
+        )
+
+
+@click.command()
+@click.option(
+    '--blob-name',
+    type=click.STRING,
+    required=True,
+    help='Name of the blob to copy from the configured bucket.'
+)
+@click.option(
+    '--target-bucket',
+    type=click.STRING,
+    required=True,
+    help='Bucket to copy the blob to.'
+)
+@click.option(
+    '--target-region',
+    type=click.STRING,
+    help='Region of the target bucket. Default is the current region.'
+)
+@click.option(
+    '--target-blob-name',
+    type=click.STRING,
+    help='Name of the copied blob. Default is the source blob name.'
+)
+@click.option(
+    '--part-size',
+    type=click.IntRange(min=100 * 1024),
+    help='Size of the copied parts. Default is 64MB, minimum is 100KB.'
+)
+@click.option(
+    '--max-workers',
+    type=click.IntRange(min=1),
+    default=8,
+    help='Number of parts copied concurrently. Default is 8.'
+)
+@click.option(
+    '--force-replace-image',
+    is_flag=True,
+    help='Delete the target blob if it already exists.'
+)
+@add_options(shared_options)
+@click.pass_context
+def copy_blob(
+    context,
+    blob_name,
+    target_bucket,
+    target_region,
+    target_blob_name,
+    part_size,
+    max_workers,
+    force_replace_image,
+    **kwargs
+):
+    """
+    Copy a blob from the configured bucket to another bucket.
+
+    Within a region the data is copied server side. An interrupted
+    copy resumes when the command is run again.
+    """
+    process_shared_options(context.obj, kwargs)
+    config_data = get_config(context.obj)
+    logger = get_logger(config_data.log_level)
+
+    with handle_errors(config_data.log_level, config_data.no_color):
+        aliyun_image = AliyunImage(
+            config_data.access_key,
+            config_data.access_secret,
+            config_data.region,
+            config_data.bucket_name,
+            log_level=config_data.log_level,
+            log_callback=logger
+        )
+
+        keyword_args = {
+            'target_region': target_region,
+            'target_blob_name': target_blob_name,
+            'part_size': part_size,
+            'max_workers': max_workers,
+            'force_replace_image': force_replace_image
+        }
+
+        if config_data.log_level != logging.ERROR:
+            keyword_args['progress_callback'] = partial(
+                click_progress_callback,
+                label='Copying blob'
+            )
+
+        target_blob_name = aliyun_image.copy_blob(
+            blob_name,
+            target_bucket,
+            **keyword_args
+        )
+
+    if config_data.log_level != logging.ERROR:
+        echo_style(
+            f'Blob copied to {target_bucket} as {target_blob_name}',
+            config_data.no_color
+        )
+
+
 image.add_command(activate)
+image.add_command(copy_blob)
 image.add_command(create)
 image.add_command(delete)
+image.add_command(delete_blobs)
 image.add_command(deprecate)
+image.add_command(gc)
 image.add_command(publish)
 image.add_command(replicate)
 image.add_command(upload)
 image.add_command(info)
+image.add_command(inventory)
+image.add_command(list_blobs)
 image.add_command(share_permission)
 main.add_command(image)
+main.add_command(serve)
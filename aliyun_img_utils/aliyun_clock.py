@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils clock module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+
+
+class SystemClock(object):
+    """Clock and sleeper used by the waiters based on the time module."""
+
+    def time(self):
+        """Return the current time in seconds since the epoch."""
+        return time.time()
+
+    def sleep(self, seconds):
+        """Block for the given number of seconds."""
+        time.sleep(seconds)
+
+
+class VirtualClock(object):
+    """
+    Clock where sleeping advances the time instantly.
+
+    Waiters using a virtual clock return as soon as the simulated
+    service reports the expected state, so a full simulated release
+    runs in milliseconds. Sleeping advances the time immediately which
+    suits waiters that run one at a time. The number of sleeps and the
+    total time slept are recorded for measuring polling strategies.
+    """
+
+    def __init__(self, start=0.0):
+        """Initialize clock at start seconds since the epoch."""
+        self.now = start
+        self.sleeps = 0
+        self.slept = 0.0
+        self._lock = threading.Lock()
+
+    def time(self):
+        """Return the virtual time in seconds since the epoch."""
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds):
+        """Advance the virtual time by the given number of seconds."""
+        self.advance(seconds)
+
+        with self._lock:
+            self.sleeps += 1
+            self.slept += seconds
+
+    def advance(self, seconds):
+        """Advance the virtual time without counting a sleep."""
+        with self._lock:
+            self.now += seconds
+
+
+system_clock = SystemClock()
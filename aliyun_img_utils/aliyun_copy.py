@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils blob copy module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import os
+
+from concurrent.futures import as_completed
+
+from aliyun_img_utils.aliyun_lazy import LazyModule
+from aliyun_img_utils.aliyun_retry import retry_call
+from aliyun_img_utils.aliyun_tracing import ContextThreadPoolExecutor
+from aliyun_img_utils.aliyun_utils import grow_storage_session
+
+oss2 = LazyModule('oss2')
+
+default_checkpoint_dir = os.path.expanduser(
+    '~/.cache/aliyun_img_utils/copies/'
+)
+
+
+def get_checkpoint_path(
+    checkpoint_dir,
+    source_bucket,
+    source_key,
+    target_bucket,
+    target_key
+):
+    """Return the checkpoint file path of a copy."""
+    name = hashlib.sha256(
+        '\n'.join(
+            [source_bucket, source_key, target_bucket, target_key]
+        ).encode()
+    ).hexdigest()
+    return os.path.join(checkpoint_dir, f'{name}.json')
+
+
+def load_checkpoint(path):
+    """Return the checkpoint of an interrupted copy or None."""
+    try:
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(path, checkpoint):
+    """Write the checkpoint of a copy."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+
+
+def remove_checkpoint(path):
+    """Remove the checkpoint of a finished copy."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def get_copied_parts(target_client, target_key, upload_id):
+    """Return the parts of the upload by part number."""
+    return {
+        part.part_number: oss2.models.PartInfo(
+            part.part_number,
+            part.etag,
+            size=part.size
+        ) for part in oss2.PartIterator(target_client, target_key, upload_id)
+    }
+
+
+def copy_blob(
+    source_client,
+    target_client,
+    source_key,
+    target_key=None,
+    part_size=64 * 1024 * 1024,
+    max_workers=8,
+    progress_callback=None,
+    server_side=True,
+    checkpoint_dir=None,
+    max_retries=2
+):
+    """
+    Copy a blob between buckets with concurrent multipart copies.
+
+    With server_side the parts are copied by OSS with UploadPartCopy
+    range requests and no data passes through this host. OSS only
+    supports this between buckets in the same region, otherwise each
+    range is read from the source and uploaded to the target.
+
+    Connection and server errors of a part are retried up to
+    max_retries times with backoff.
+
+    The upload id is kept in a checkpoint file until the copy is
+    complete. An interrupted copy of the same unchanged source object
+    resumes and only copies the missing parts.
+    """
+    target_key = target_key or source_key
+    checkpoint_path = get_checkpoint_path(
+        checkpoint_dir or default_checkpoint_dir,
+        source_client.bucket_name,
+        source_key,
+        target_client.bucket_name,
+        target_key
+    )
+
+    meta = source_client.head_object(source_key)
+    total_size = meta.content_length
+
+    if not total_size:
+        target_client.put_object(target_key, b'')
+        return target_key
+
+    part_size = oss2.determine_part_size(total_size, preferred_size=part_size)
+    source = {'etag': meta.etag, 'size': total_size, 'part_size': part_size}
+    checkpoint = load_checkpoint(checkpoint_path)
+    parts = {}
+
+    if checkpoint and checkpoint['source'] == source:
+        try:
+            parts = get_copied_parts(
+                target_client,
+                target_key,
+                checkpoint['upload_id']
+            )
+        except oss2.exceptions.NoSuchUpload:
+            checkpoint = None
+    else:
+        checkpoint = None
+
+    if not checkpoint:
+        checkpoint = {
+            'upload_id': target_client.init_multipart_upload(
+                target_key
+            ).upload_id,
+            'source': source
+        }
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    upload_id = checkpoint['upload_id']
+
+    def copy_range(part_number, start, end):
+        if server_side:
+            return target_client.upload_part_copy(
+                source_client.bucket_name,
+                source_key,
+                (start, end),
+                target_key,
+                upload_id,
+                part_number
+            )
+
+        data = source_client.get_object(
+            source_key,
+            byte_range=(start, end)
+        ).read()
+        return target_client.upload_part(
+            target_key,
+            upload_id,
+            part_number,
+            data
+        )
+
+    def copy_part(part_number, start, end):
+        result, _ = retry_call(
+            copy_range,
+            part_number,
+            start,
+            end,
+            max_retries=max_retries
+        )
+
+        return oss2.models.PartInfo(
+            part_number,
+            result.etag,
+            size=end - start + 1
+        )
+
+    ranges = [
+        (part_number, start, min(start + part_size, total_size) - 1)
+        for part_number, start in enumerate(
+            range(0, total_size, part_size),
+            start=1
+        )
+    ]
+
+    if progress_callback:
+        progress_callback(0, total_size)
+
+        for part in parts.values():
+            progress_callback(part.size, total_size)
+
+    grow_storage_session([source_client, target_client], max_workers)
+
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(copy_part, *part_range)
+            for part_range in ranges if part_range[0] not in parts
+        ]
+
+        for future in as_completed(futures):
+            part = future.result()
+            parts[part.part_number] = part
+
+            if progress_callback:
+                progress_callback(part.size, total_size)
+
+    if progress_callback:
+        progress_callback(part_size, total_size, done=True)
+
+    target_client.complete_multipart_upload(
+        target_key,
+        upload_id,
+        [parts[part_number] for part_number, start, end in ranges]
+    )
+    remove_checkpoint(checkpoint_path)
+
+    return target_key
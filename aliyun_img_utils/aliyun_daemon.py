@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils daemon module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextvars
+import io
+import itertools
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+import time
+
+import click
+
+from aliyun_img_utils import aliyun_utils
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_pool import ClientPool, set_client_pool
+
+# Commands which prompt for confirmation always run locally
+LOCAL_COMMANDS = ('delete', 'delete-blobs', 'gc')
+
+# Seconds to wait for the daemon to accept a connection
+CONNECT_TIMEOUT = 5
+
+# Options the daemon reads from the config file if they match
+CREDENTIAL_OPTIONS = {
+    '--access-key': 'access_key',
+    '--access-secret': 'access_secret'
+}
+
+
+def get_socket_path():
+    """
+    Return the daemon socket path or None.
+
+    The ALIYUN_IMG_UTILS_SOCKET environment variable overrides the
+    default path in the private user runtime directory. Without a
+    runtime directory (XDG_RUNTIME_DIR) there is no default path, a
+    shared directory such as /tmp would let other users take it.
+    """
+    if os.environ.get('ALIYUN_IMG_UTILS_SOCKET'):
+        return os.environ['ALIYUN_IMG_UTILS_SOCKET']
+
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if not runtime_dir:
+        return None
+
+    return os.path.join(runtime_dir, f'aliyun-img-utils-{os.getuid()}.sock')
+
+
+def is_trusted_socket(socket_path):
+    """
+    Return True if the socket can only be used by the current user.
+
+    The path has to be a socket owned by the user which no other user
+    can read or write (mode 0600).
+    """
+    try:
+        status = os.lstat(socket_path)
+    except OSError:
+        return False
+
+    return (
+        stat.S_ISSOCK(status.st_mode) and
+        status.st_uid == os.getuid() and
+        not status.st_mode & 0o077
+    )
+
+
+def check_peer(client):
+    """
+    Raise OSError if the daemon runs as another user.
+
+    Uses the SO_PEERCRED credentials where the platform provides them.
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return
+
+    credentials = client.getsockopt(
+        socket.SOL_SOCKET,
+        socket.SO_PEERCRED,
+        struct.calcsize('3i')
+    )
+    pid, uid, gid = struct.unpack('3i', credentials)
+
+    if uid != os.getuid():
+        raise OSError(f'Daemon socket is served by user {uid}')
+
+
+class ContextStream(io.TextIOBase):
+    """
+    Text stream which writes to the stream of the current context.
+
+    The daemon replaces stdin, stdout and stderr with context streams
+    so every job reads its own input and captures its own output,
+    including output of threads started with ContextThreadPoolExecutor.
+    Outside of a job the default stream is used.
+    """
+
+    def __init__(self, default):
+        """Initialize stream with the default stream."""
+        self.default = default
+        self._stream = contextvars.ContextVar('stream', default=None)
+
+    @property
+    def stream(self):
+        """The stream of the current context."""
+        return self._stream.get() or self.default
+
+    def redirect(self, stream):
+        """Use stream in the current context, return a reset token."""
+        return self._stream.set(stream)
+
+    def reset(self, token):
+        """Restore the stream set before redirect."""
+        self._stream.reset(token)
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, 'encoding', None) or 'utf-8'
+
+    @property
+    def errors(self):
+        return getattr(self.stream, 'errors', None) or 'strict'
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return self.stream.isatty()
+
+    def fileno(self):
+        return self.stream.fileno()
+
+    def read(self, size=-1):
+        return self.stream.read(size)
+
+    def readline(self, size=-1):
+        return self.stream.readline(size)
+
+    def write(self, text):
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Handle a single JSON request of a thin client."""
+
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        action = request.get('action', 'run')
+
+        if action == 'run':
+            response = self.server.run_job(
+                request['args'],
+                request.get('input')
+            )
+        elif action == 'status':
+            response = self.server.status()
+        elif action == 'shutdown':
+            response = {'stopping': True}
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            response = {'error': f'Unknown action: {action}'}
+
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+class AliyunDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Long running server which runs CLI commands as jobs.
+
+    Listens on a Unix socket (owner only). Each request runs the click
+    command with the given arguments and returns the exit code and
+    captured output. Every request runs in its own thread and context,
+    so concurrent jobs keep their own streams, progress bar, metrics
+    recorder, tracer and log level.
+
+    The daemon keeps a ClientPool of compute and bucket clients per
+    credentials and region, and caches parsed config files, so repeated
+    commands reuse warm clients and connections instead of creating and
+    validating new ones.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, command, socket_path=None):
+        """Initialize daemon for the click command."""
+        self.command = command
+        self.socket_path = socket_path or get_socket_path()
+        self.pool = ClientPool()
+        self.started = time.time()
+        self._jobs = itertools.count(1)
+        self._running = 0
+        self._lock = threading.Lock()
+        self._streams = None
+
+        if not self.socket_path:
+            raise AliyunException(
+                'No private runtime directory for the daemon socket.'
+            )
+
+        if os.path.exists(self.socket_path):
+            if is_running(self.socket_path):
+                raise AliyunException(
+                    f'A daemon is already listening on {self.socket_path}.'
+                )
+
+            os.unlink(self.socket_path)  # Stale socket
+
+        umask = os.umask(0o177)
+        try:
+            super().__init__(self.socket_path, DaemonRequestHandler)
+        finally:
+            os.umask(umask)
+
+    def activate(self):
+        """Install the job streams, client pool and config cache."""
+        self._streams = (sys.stdin, sys.stdout, sys.stderr)
+        sys.stdin, sys.stdout, sys.stderr = (
+            ContextStream(stream) for stream in self._streams
+        )
+        set_client_pool(self.pool)
+        aliyun_utils.config_cache = {}
+
+    def deactivate(self):
+        """Restore the process streams and disable the caches."""
+        if self._streams:
+            sys.stdin, sys.stdout, sys.stderr = self._streams
+            self._streams = None
+
+        set_client_pool(None)
+        aliyun_utils.config_cache = None
+
+    def server_close(self):
+        """Close the socket and remove the socket file."""
+        super().server_close()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def run_job(self, args, input_text=None):
+        """
+        Run the command with args and return the job result.
+
+        The job runs in a new context with its own streams, progress
+        bar, metrics recorder and tracer.
+        """
+        return contextvars.Context().run(self._run_job, args, input_text)
+
+    def _run_job(self, args, input_text):
+        job_id = next(self._jobs)
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        tokens = [
+            sys.stdin.redirect(io.StringIO(input_text or '')),
+            sys.stdout.redirect(stdout),
+            sys.stderr.redirect(stderr)
+        ]
+        aliyun_utils.progress_state.set({})
+        start = time.perf_counter()
+
+        with self._lock:
+            self._running += 1
+
+        try:
+            exit_code = run_command(self.command, args)
+        finally:
+            for stream, token in zip(
+                (sys.stdin, sys.stdout, sys.stderr),
+                tokens
+            ):
+                stream.reset(token)
+
+            with self._lock:
+                self._running -= 1
+
+        return {
+            'job': job_id,
+            'exit_code': exit_code,
+            'stdout': stdout.getvalue(),
+            'stderr': stderr.getvalue(),
+            'seconds': round(time.perf_counter() - start, 6)
+        }
+
+    def status(self):
+        """Return the daemon status."""
+        with self._lock:
+            running = self._running
+
+        return {
+            'pid': os.getpid(),
+            'uptime': round(time.time() - self.started, 3),
+            'running': running,
+            'pool': self.pool.stats()
+        }
+
+
+def run_command(command, args):
+    """Run the click command with args and return the exit code."""
+    try:
+        result = command.main(
+            args=list(args),
+            prog_name='aliyun-img-utils',
+            standalone_mode=False
+        )
+    except click.exceptions.Abort:
+        click.echo('Aborted!', err=True)
+        return 1
+    except click.ClickException as error:
+        error.show()
+        return error.exit_code
+    except SystemExit as error:
+        if error.code is None or isinstance(error.code, int):
+            return error.code or 0
+
+        click.echo(error.code, err=True)
+        return 1
+    except Exception as error:
+        click.echo(f'{type(error).__name__}: {error}', err=True)
+        return 1
+
+    return result if isinstance(result, int) else 0
+
+
+def send_request(
+    request,
+    socket_path=None,
+    timeout=None,
+    connect_timeout=CONNECT_TIMEOUT
+):
+    """
+    Send a request to the daemon and return the response.
+
+    The connection has to be accepted within connect_timeout seconds,
+    the response is awaited for timeout seconds (None waits until the
+    job finishes). Raise OSError if the daemon runs as another user.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(connect_timeout)
+        client.connect(socket_path or get_socket_path())
+        check_peer(client)
+        client.settimeout(timeout)
+        client.sendall(json.dumps(request).encode() + b'\n')
+
+        with client.makefile('rb') as response:
+            return json.loads(response.readline())
+
+
+def is_running(socket_path=None):
+    """Return True if a daemon accepts connections on the socket."""
+    try:
+        send_request({'action': 'status'}, socket_path, timeout=5)
+    except (OSError, ValueError, TypeError):
+        return False
+
+    return True
+
+
+def get_path_options(command):
+    """Return the option names of the command tree which take paths."""
+    names = set()
+
+    for param in command.params:
+        if isinstance(param, click.Option) and \
+                isinstance(param.type, click.Path):
+            names.update(param.opts)
+
+    for subcommand in getattr(command, 'commands', {}).values():
+        names.update(get_path_options(subcommand))
+
+    return names
+
+
+def get_absolute_args(command, args):
+    """Return args with relative path option values made absolute."""
+    names = get_path_options(command)
+    args = list(args)
+
+    for index, arg in enumerate(args):
+        if arg in names and index + 1 < len(args):
+            args[index + 1] = os.path.abspath(args[index + 1])
+        elif '=' in arg and arg.split('=', 1)[0] in names:
+            name, value = arg.split('=', 1)
+            args[index] = f'{name}={os.path.abspath(value)}'
+
+    return args
+
+
+def get_option_value(args, names):
+    """Return the value of the last option in args with one of names."""
+    value = None
+
+    for index, arg in enumerate(args):
+        if arg in names and index + 1 < len(args):
+            value = args[index + 1]
+        elif '=' in arg and arg.split('=', 1)[0] in names:
+            value = arg.split('=', 1)[1]
+
+    return value
+
+
+def strip_credentials(args):
+    """
+    Return args without the credential options set in the config file.
+
+    The daemon reads the same config file of the same user, so options
+    with the configured value don't have to be sent to it.
+    """
+    config_dir = get_option_value(args, ('-C', '--config-dir')) or \
+        aliyun_utils.default_config_dir
+    profile = get_option_value(args, ('--profile',)) or \
+        aliyun_utils.default_profile
+
+    try:
+        config = aliyun_utils.load_config_file(
+            os.path.join(config_dir, profile + '.yaml')
+        ) or {}
+    except Exception:
+        return args
+
+    stripped = []
+    skip = False
+
+    for index, arg in enumerate(args):
+        name, _, value = arg.partition('=')
+
+        if skip:
+            skip = False
+            continue
+        elif arg in CREDENTIAL_OPTIONS and index + 1 < len(args) and \
+                config.get(CREDENTIAL_OPTIONS[arg]) == args[index + 1]:
+            skip = True
+            continue
+        elif name in CREDENTIAL_OPTIONS and value and \
+                config.get(CREDENTIAL_OPTIONS[name]) == value:
+            continue
+
+        stripped.append(arg)
+
+    return stripped
+
+
+def forward_command(command, args, socket_path=None):
+    """
+    Run the image command args in the daemon if one is running.
+
+    Writes the output of the job and returns the exit code, or None
+    if the command should run locally. Commands are only forwarded to
+    a socket owned by and private to the current user, credentials
+    from the config file are left to the daemon. Set
+    ALIYUN_IMG_UTILS_NO_DAEMON to always run locally.
+    """
+    if os.environ.get('ALIYUN_IMG_UTILS_NO_DAEMON'):
+        return None
+
+    if len(args) < 2 or args[0] != 'image' or args[1] in LOCAL_COMMANDS:
+        return None
+
+    socket_path = socket_path or get_socket_path()
+    if not socket_path or not is_trusted_socket(socket_path):
+        return None
+
+    args = get_absolute_args(command, args)
+
+    if any(arg.partition('=')[0] in CREDENTIAL_OPTIONS for arg in args):
+        args = strip_credentials(args)
+
+    try:
+        response = send_request(
+            {'action': 'run', 'args': args},
+            socket_path
+        )
+    except (OSError, ValueError):
+        return None
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['exit_code']
+
+
+class DaemonClientGroup(click.Group):
+    """
+    Click group which forwards commands to a running daemon.
+
+    Only command line invocations (no explicit args) in standalone mode
+    are forwarded, the command runs locally if no daemon is available.
+    """
+
+    def main(self, args=None, standalone_mode=True, **kwargs):
+        if args is None and standalone_mode:
+            exit_code = forward_command(self, sys.argv[1:])
+
+            if exit_code is not None:
+                sys.exit(exit_code)
+
+        return super().main(
+            args=args,
+            standalone_mode=standalone_mode,
+            **kwargs
+        )
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils storage endpoint selection module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_lazy import LazyModule
+
+oss2 = LazyModule('oss2')
+
+module = sys.modules[__name__]
+
+# Value of transfer_acceleration which selects the endpoint by probing
+AUTO_ENDPOINT = 'auto'
+
+# Prefix of the temporary objects written by the throughput sample
+PROBE_PREFIX = '.aliyun-img-utils-probe-'
+
+# Selected endpoints by host and region
+endpoint_cache = {}
+endpoint_cache_file = os.path.expanduser(
+    '~/.cache/aliyun_img_utils/endpoints.json'
+)
+endpoint_cache_lock = threading.Lock()
+
+ProbeResult = namedtuple(
+    'ProbeResult',
+    ['endpoint', 'reachable', 'rtt', 'throughput', 'error']
+)
+
+
+def get_candidate_endpoints(region):
+    """
+    Return the accelerate, public and internal storage endpoints.
+
+    The internal endpoint is only reachable from inside Alibaba Cloud
+    where traffic to it is free and fast.
+    """
+    return [
+        'https://oss-accelerate.aliyuncs.com',
+        f'https://oss-{region}.aliyuncs.com',
+        f'https://oss-{region}-internal.aliyuncs.com'
+    ]
+
+
+def measure_rtt(endpoint, timeout=2, attempts=3):
+    """
+    Return the lowest round trip time of requests to the endpoint.
+
+    Anonymous requests are answered with an error document, any HTTP
+    response proves the endpoint is reachable.
+    """
+    url = urlparse(endpoint)
+
+    if url.scheme == 'https':
+        connection_class = http.client.HTTPSConnection
+    else:
+        connection_class = http.client.HTTPConnection
+
+    connection = connection_class(url.hostname, url.port, timeout=timeout)
+    times = []
+
+    try:
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            times.append(time.perf_counter() - start)
+    finally:
+        connection.close()
+
+    return min(times)
+
+
+def measure_throughput(
+    endpoint,
+    auth,
+    bucket_name,
+    sample_size=256 * 1024,
+    timeout=10
+):
+    """
+    Return the upload rate (bytes per second) of a sample object.
+
+    The sample is written to the bucket under a unique key, so
+    concurrent probes don't interfere, and deleted again. A small
+    sample such as the default 256 KiB mostly measures the request
+    latency of a PUT rather than the bandwidth of the endpoint.
+    """
+    bucket = oss2.Bucket(auth, endpoint, bucket_name, connect_timeout=timeout)
+    data = os.urandom(sample_size)
+    key = f'{PROBE_PREFIX}{uuid.uuid4().hex}'
+
+    start = time.perf_counter()
+    bucket.put_object(key, data)
+    seconds = time.perf_counter() - start
+
+    try:
+        bucket.delete_object(key)
+    except Exception:
+        pass  # Credentials without delete permission leave the sample
+
+    return sample_size / max(seconds, 1e-9)
+
+
+def probe_endpoint(
+    endpoint,
+    auth=None,
+    bucket_name=None,
+    timeout=2,
+    sample_size=256 * 1024
+):
+    """
+    Probe reachability, round trip time and throughput of endpoint.
+
+    The throughput sample is only taken with auth and bucket name. If
+    the sample fails, for example with read only credentials, the
+    endpoint is ranked by round trip time only.
+    """
+    try:
+        rtt = measure_rtt(endpoint, timeout)
+    except Exception as error:
+        return ProbeResult(endpoint, False, None, None, str(error))
+
+    throughput = None
+    error = None
+
+    if auth and bucket_name and sample_size:
+        try:
+            throughput = measure_throughput(
+                endpoint,
+                auth,
+                bucket_name,
+                sample_size,
+                timeout * 5
+            )
+        except Exception as sample_error:
+            error = f'Throughput sample failed: {sample_error}'
+
+    return ProbeResult(endpoint, True, rtt, throughput, error)
+
+
+def get_best_probe(results):
+    """
+    Return the fastest reachable probe result.
+
+    Sampled throughput ranks first and round trip time breaks ties.
+    """
+    reachable = [result for result in results if result.reachable]
+
+    if not reachable:
+        errors = '; '.join(
+            f'{result.endpoint}: {result.error}' for result in results
+        )
+        raise AliyunException(f'No reachable storage endpoint: {errors}')
+
+    return max(
+        reachable,
+        key=lambda result: (result.throughput or 0, -result.rtt)
+    )
+
+
+def load_endpoint_cache(path):
+    """Return the endpoint cache file contents or an empty cache."""
+    try:
+        with open(path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_endpoint_cache(path, cache):
+    """Write the endpoint cache file, errors are ignored."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'w') as cache_file:
+            json.dump(cache, cache_file, indent=2)
+    except OSError:
+        pass
+
+
+def select_storage_endpoint(
+    region,
+    auth=None,
+    bucket_name=None,
+    endpoints=None,
+    ttl=86400,
+    timeout=2,
+    sample_size=256 * 1024,
+    cache_file=None
+):
+    """
+    Return the fastest reachable storage endpoint for the region.
+
+    The candidate endpoints (by default accelerate, public and internal)
+    are probed in parallel. With auth and bucket name every probe
+    writes and deletes a temporary sample object in the bucket. The
+    winner is cached per host and region in memory and in the endpoint
+    cache file for ttl seconds.
+    """
+    endpoints = endpoints or get_candidate_endpoints(region)
+    cache_file = cache_file or module.endpoint_cache_file
+    key = f'{socket.gethostname()}/{region}'
+
+    with endpoint_cache_lock:
+        if key not in module.endpoint_cache:
+            module.endpoint_cache.update(load_endpoint_cache(cache_file))
+
+        entry = module.endpoint_cache.get(key)
+
+    if entry and entry['endpoint'] in endpoints and \
+            time.time() - entry['time'] < ttl:
+        return entry['endpoint']
+
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        results = list(executor.map(
+            lambda endpoint: probe_endpoint(
+                endpoint,
+                auth,
+                bucket_name,
+                timeout,
+                sample_size
+            ),
+            endpoints
+        ))
+
+    best = get_best_probe(results)
+
+    with endpoint_cache_lock:
+        module.endpoint_cache[key] = {
+            'endpoint': best.endpoint,
+            'time': time.time(),
+            'probes': [result._asdict() for result in results]
+        }
+        save_endpoint_cache(cache_file, module.endpoint_cache)
+
+    return best.endpoint
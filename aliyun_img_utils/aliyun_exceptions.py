@@ -35,3 +35,12 @@ class AliyunImageUploadException(AliyunImageException):
 
 class AliyunImageCreateException(AliyunImageException):
     """Exception for Aliyun image create processes."""
+
+
+class AliyunTransferException(AliyunException):
+    """Exception for failed storage transfer requests."""
+
+    def __init__(self, message, status=None):
+        """Initialize with the HTTP status, None if no response."""
+        super().__init__(message)
+        self.status = status
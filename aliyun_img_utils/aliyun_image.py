@@ -25,53 +25,72 @@ import logging
 import os
 import time
 
-import oss2
-
-from aliyunsdkcore.client import AcsClient
-from aliyunsdkecs.request.v20140526.ImportImageRequest import (
-    ImportImageRequest
-)
-from aliyunsdkecs.request.v20140526.DeleteImageRequest import (
-    DeleteImageRequest
-)
-from aliyunsdkecs.request.v20140526.DescribeImagesRequest import (
-    DescribeImagesRequest
-)
-from aliyunsdkecs.request.v20140526.DescribeRegionsRequest import (
-    DescribeRegionsRequest
-)
-from aliyunsdkecs.request.v20140526.CopyImageRequest import (
-    CopyImageRequest
-)
-from aliyunsdkecs.request.v20140526.DescribeImageSharePermissionRequest import (  # noqa
-    DescribeImageSharePermissionRequest
-)
-from aliyunsdkecs.request.v20140526.ModifyImageSharePermissionRequest import (
-    ModifyImageSharePermissionRequest
-)
-from aliyunsdkecs.request.v20140526.ModifyImageAttributeRequest import (
-    ModifyImageAttributeRequest
-)
-from aliyunsdkecs.request.v20140526.TagResourcesRequest import (
-    TagResourcesRequest
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    as_completed,
+    wait as wait_on_futures
 )
+from functools import partial
 
+from aliyun_img_utils.aliyun_clock import system_clock
+from aliyun_img_utils.aliyun_copy import copy_blob as copy_storage_blob
+from aliyun_img_utils.aliyun_endpoints import (
+    AUTO_ENDPOINT,
+    select_storage_endpoint
+)
 from aliyun_img_utils.aliyun_exceptions import (
     AliyunException,
     AliyunImageException,
     AliyunImageUploadException,
     AliyunImageCreateException
 )
+from aliyun_img_utils.aliyun_lazy import LazyModule
+from aliyun_img_utils.aliyun_metrics import (
+    InstrumentedBucket,
+    InstrumentedClient,
+    MetricsRecorder,
+    get_default_recorder
+)
+from aliyun_img_utils.aliyun_operations import (
+    ImageOperation,
+    ImageOperationPoller,
+    ProgressEstimator,
+    get_image_progress,
+    get_operation_poller
+)
+from aliyun_img_utils.aliyun_pool import get_client_pool
+from aliyun_img_utils.aliyun_replication import ReplicationPlanner
+from aliyun_img_utils.aliyun_telemetry import TransferTelemetry
+from aliyun_img_utils.aliyun_tracing import (
+    ContextThreadPoolExecutor,
+    get_default_tracer,
+    trace_methods,
+    trace_span
+)
 from aliyun_img_utils.aliyun_utils import (
+    get_ecs_request,
     get_storage_auth,
     get_storage_bucket_client,
+    is_bucket_validated,
+    set_bucket_validated,
+    get_storage_endpoint,
     put_blob,
+    put_blob_fanout,
     get_todays_date,
     get_future_date,
+    get_image_tags,
     handle_http_errors
 )
 
+# SDK modules are imported on first use to keep the CLI startup fast
+oss2 = LazyModule('oss2')
+sdk_client = LazyModule('aliyunsdkcore.client')
+
+# The async transfer engine loads asyncio, only import it when used
+aliyun_transfer = LazyModule('aliyun_img_utils.aliyun_transfer')
+
 
+@trace_methods
 class AliyunImage(object):
     """
     Provides methods for handling compute images in Alibaba (Aliyun).
@@ -104,20 +123,53 @@ class AliyunImage(object):
         log_callback=None,
         transfer_acceleration=True,
         timeout=180,
-        deprecation_period=6
+        deprecation_period=6,
+        clock=None,
+        compute_endpoint=None,
+        storage_endpoint=None,
+        metrics=None,
+        tracer=None,
+        storage_pool_size=None
     ):
-        """Initialize class and setup logging."""
+        """
+        Initialize class and setup logging.
+
+        The clock provides time and sleep for all waiters. By default
+        the system clock is used. The compute (host:port) and storage
+        (url) endpoints override the Aliyun endpoints, for example to
+        use a local FakeAliyunServer. With transfer_acceleration set
+        to auto the fastest reachable storage endpoint is probed.
+
+        All SDK calls and waiter sleeps are recorded in the metrics
+        recorder. By default the module level recorder is used if set,
+        otherwise the image gets its own recorder.
+
+        With a tracer (by default the module level tracer if set) spans
+        are recorded for all public methods, regions and waiter sleeps.
+
+        Bucket clients share one oss2 session per process, its
+        connection pool is grown to storage_pool_size if requested.
+        """
         self.access_key = access_key
         self.access_secret = access_secret
         self.transfer_acceleration = transfer_acceleration
         self.timeout = timeout
         self.deprecation_period = deprecation_period
+        self.clock = clock or system_clock
+        self.compute_endpoint = compute_endpoint
+        self.storage_endpoint = storage_endpoint
+        self.metrics = metrics or get_default_recorder() or MetricsRecorder()
+        self.tracer = tracer or get_default_tracer()
+        self.storage_pool_size = storage_pool_size
+        self.transfer_telemetry = None
         self._region = region
         self._bucket_name = bucket_name
         self._bucket_client = None
         self._compute_client = None
+        self._region_clients = {}
         self._deprecation_date = None
         self._deletion_date = None
+        self.operation_poller = None
 
         if log_callback:
             self.log = log_callback
@@ -130,29 +182,34 @@ class AliyunImage(object):
         except AttributeError:
             self.log_level = self.log.logger.level  # LoggerAdapter
 
-    def image_tarball_exists(self, blob_name):
-        """Return True if image exists in the configured bucket."""
+    def image_tarball_exists(self, blob_name, bucket_client=None):
+        """
+        Return True if image exists in the bucket.
+
+        By default the configured bucket is checked.
+        """
         try:
-            self.bucket_client.get_object_meta(blob_name)
+            (bucket_client or self.bucket_client).get_object_meta(blob_name)
         except oss2.exceptions.NoSuchKey:
             return False
 
         return True
 
-    def wait_on_blob(self, blob_name):
+    def wait_on_blob(self, blob_name, bucket_client=None):
         """
         Wait for the storage blob to show up in bucket.
 
-        If it doesn't show up in 5 mintues raise exception.
+        By default the configured bucket is checked. If it doesn't
+        show up in 5 mintues raise exception.
         """
-        start = time.time()
+        start = self.clock.time()
         end = start + 300
 
-        while time.time() < end:
-            exists = self.image_tarball_exists(blob_name)
+        while self.clock.time() < end:
+            exists = self.image_tarball_exists(blob_name, bucket_client)
 
             if not exists:
-                time.sleep(10)
+                self._sleep(10, 'wait_on_blob')
             else:
                 return
 
@@ -173,19 +230,114 @@ class AliyunImage(object):
 
         return True
 
+    def list_storage_blobs(self, prefix='', older_than=None):
+        """
+        Yield blobs in the configured bucket matching prefix.
+
+        Streams the listing 1000 blobs per request. If older_than
+        (in days) is provided only blobs last modified before then
+        are yielded.
+        """
+        cutoff = None
+        if older_than is not None:
+            # Blob times are set by OSS, compare with the wall clock
+            cutoff = time.time() - older_than * 86400
+
+        try:
+            for blob in oss2.ObjectIterator(
+                self.bucket_client,
+                prefix=prefix,
+                max_keys=1000
+            ):
+                if cutoff is None or blob.last_modified < cutoff:
+                    yield blob
+        except oss2.exceptions.OssError as error:
+            raise AliyunImageException(
+                f'Unable to list blobs: {error}'
+            )
+
+    def delete_storage_blobs(
+        self,
+        blob_names,
+        max_workers=4,
+        progress_callback=None
+    ):
+        """
+        Delete blobs from the configured bucket in batches.
+
+        Uses multi-object delete with up to 1000 blobs per request
+        and runs the batches concurrently. Returns a list of the
+        deleted blob names.
+        """
+        blob_names = list(blob_names)
+        batches = [
+            blob_names[index:index + 1000]
+            for index in range(0, len(blob_names), 1000)
+        ]
+        bucket_client = self.bucket_client
+
+        if progress_callback:
+            progress_callback(0, len(blob_names))
+
+        deleted = []
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    bucket_client.batch_delete_objects,
+                    batch
+                ): batch for batch in batches
+            }
+
+            for future in as_completed(futures):
+                batch = futures[future]
+
+                try:
+                    result = future.result()
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to delete batch of {len(batch)} '
+                        f'blobs: {error}'
+                    )
+                    continue
+
+                deleted.extend(result.deleted_keys)
+
+                if progress_callback:
+                    progress_callback(len(batch), len(blob_names))
+
+        if progress_callback:
+            progress_callback(0, len(blob_names), done=True)
+
+        self.log.debug(
+            f'{len(deleted)} of {len(blob_names)} blobs deleted '
+            f'from {self.bucket_name}'
+        )
+
+        return deleted
+
     def upload_image_tarball(
         self,
         image_file,
         page_size=None,
         progress_callback=None,
         blob_name=None,
-        force_replace_image=False
+        force_replace_image=False,
+        transfer_engine='sync',
+        max_concurrency=8,
+        telemetry=None
     ):
         """
         Upload image tarball to the configured bucket.
 
         Uses multipart upload and will generate blob name
         based on image file path if a name is not provided.
+
+        The async transfer engine uploads up to max_concurrency
+        parts concurrently from an event loop.
+
+        Per part timings are recorded to telemetry, a new
+        TransferTelemetry by default, which is available as
+        transfer_telemetry after the upload.
         """
         if not blob_name:
             blob_name = image_file.rsplit(os.sep, maxsplit=1)[-1]
@@ -198,7 +350,8 @@ class AliyunImage(object):
         elif self.image_tarball_exists(blob_name) and force_replace_image:
             self.delete_storage_blob(blob_name)
 
-        kwargs = {}
+        self.transfer_telemetry = telemetry or TransferTelemetry()
+        kwargs = {'telemetry': self.transfer_telemetry}
 
         if page_size:
             kwargs['page_size'] = page_size
@@ -207,7 +360,20 @@ class AliyunImage(object):
             kwargs['progress_callback'] = progress_callback
 
         try:
-            put_blob(self.bucket_client, blob_name, image_file, **kwargs)
+            if transfer_engine == 'async':
+                aliyun_transfer.put_blob_async(
+                    get_storage_auth(self.access_key, self.access_secret),
+                    self.bucket_name,
+                    self.get_storage_endpoint(),
+                    blob_name,
+                    image_file,
+                    region=self.region,
+                    max_concurrency=max_concurrency,
+                    connect_timeout=self.timeout,
+                    **kwargs
+                )
+            else:
+                put_blob(self.bucket_client, blob_name, image_file, **kwargs)
         except FileNotFoundError:
             raise AliyunImageUploadException(
                 f'Image file {image_file} not found. Ensure the path to'
@@ -232,6 +398,160 @@ class AliyunImage(object):
 
         return blob_name
 
+    def upload_image_tarball_to_buckets(
+        self,
+        image_file,
+        destinations,
+        page_size=None,
+        progress_callback=None,
+        blob_name=None,
+        force_replace_image=False,
+        buffer_parts=4
+    ):
+        """
+        Upload image tarball to multiple buckets with a single read.
+
+        Destinations is a list of (bucket name, region) tuples. Each
+        part of the image file is read once and uploaded to all buckets
+        concurrently, holding at most buffer_parts parts in memory.
+
+        A failed destination does not stop the uploads to the others,
+        the failures are raised once all uploads finished. Like a
+        single upload each bucket is waited on until the blob shows up.
+        """
+        if not blob_name:
+            blob_name = image_file.rsplit(os.sep, maxsplit=1)[-1]
+
+        bucket_clients = []
+
+        for bucket_name, region in destinations:
+            client = self.get_bucket_client(bucket_name, region)
+
+            if client.object_exists(blob_name):
+                if not force_replace_image:
+                    raise AliyunImageUploadException(
+                        f'Image {blob_name} already exists in {bucket_name}. '
+                        f'To replace an existing image use '
+                        f'force_replace_image option.'
+                    )
+
+                client.delete_object(blob_name)
+
+            bucket_clients.append(client)
+
+        kwargs = {'buffer_parts': buffer_parts}
+
+        if page_size:
+            kwargs['page_size'] = page_size
+
+        if progress_callback:
+            kwargs['progress_callback'] = progress_callback
+
+        try:
+            errors = put_blob_fanout(
+                bucket_clients,
+                blob_name,
+                image_file,
+                **kwargs
+            )
+        except FileNotFoundError:
+            raise AliyunImageUploadException(
+                f'Image file {image_file} not found. Ensure the path to'
+                f' the file is correct.'
+            )
+
+        failures = []
+        for (bucket_name, region), client, error in zip(
+            destinations,
+            bucket_clients,
+            errors
+        ):
+            if not error:
+                try:
+                    self.wait_on_blob(blob_name, client)
+                except AliyunException as wait_error:
+                    error = wait_error
+
+            if isinstance(error, oss2.exceptions.ServerError):
+                error = error.details.get('Message', error)
+
+            if error:
+                failures.append(f'{bucket_name} ({region}): {error}')
+
+        if failures:
+            raise AliyunImageUploadException(
+                'Unable to upload image to ' + '; '.join(failures)
+            )
+
+        return blob_name
+
+    def copy_blob(
+        self,
+        blob_name,
+        target_bucket,
+        target_region=None,
+        target_blob_name=None,
+        part_size=None,
+        max_workers=8,
+        progress_callback=None,
+        force_replace_image=False
+    ):
+        """
+        Copy blob from the configured bucket to the target bucket.
+
+        Within a region the parts are copied server side with
+        concurrent UploadPartCopy requests. For a target bucket in
+        another region each part is read and uploaded through this
+        host. An interrupted copy resumes with the missing parts.
+        """
+        target_region = target_region or self.region
+        target_blob_name = target_blob_name or blob_name
+        target_client = self.get_bucket_client(target_bucket, target_region)
+
+        if target_client.object_exists(target_blob_name):
+            if not force_replace_image:
+                raise AliyunImageException(
+                    f'Blob {target_blob_name} already exists in '
+                    f'{target_bucket}. To replace an existing blob use '
+                    f'force_replace_image option.'
+                )
+
+            target_client.delete_object(target_blob_name)
+
+        kwargs = {
+            'max_workers': max_workers,
+            'server_side': target_region == self.region
+        }
+
+        if part_size:
+            kwargs['part_size'] = part_size
+
+        if progress_callback:
+            kwargs['progress_callback'] = progress_callback
+
+        try:
+            copy_storage_blob(
+                self.bucket_client,
+                target_client,
+                blob_name,
+                target_blob_name,
+                **kwargs
+            )
+        except oss2.exceptions.NoSuchKey:
+            raise AliyunImageException(
+                f'Blob {blob_name} not found in {self.bucket_name}.'
+            )
+        except oss2.exceptions.ServerError as error:
+            raise AliyunImageException(
+                f'Unable to copy blob: {str(error.details["Message"])}'
+            )
+        except Exception as error:
+            raise AliyunImageException(
+                f'Unable to copy blob: {str(error)}'
+            )
+
+        return target_blob_name
+
     def delete_compute_image(
         self,
         image_name,
@@ -246,26 +566,34 @@ class AliyunImage(object):
         except AliyunImageException:
             return False
 
-        request = DeleteImageRequest()
-        request.set_accept_format('json')
-        request.set_ImageId(image['ImageId'])
+        self._delete_image(image['ImageId'], force=force)
+        self.wait_on_compute_image_delete(image['ImageId'])
+        self.log.info(f'{image["ImageId"]} deleted in {self.region}')
+
+        return True
+
+    def _delete_image(self, image_id, force=False, region=None):
+        """
+        Send the delete request for image id without waiting.
+
+        If region is not provided the current region is used.
+        """
+        request = get_ecs_request('DeleteImage')
+        request.set_ImageId(image_id)
 
         if force:
             request.set_Force(force)
 
         try:
             with handle_http_errors():
-                self.compute_client.do_action_with_exception(request)
+                self._get_compute_client(
+                    region
+                ).do_action_with_exception(request)
         except Exception as error:
             raise AliyunImageException(
                 f'Unable to delete image: {error}.'
             )
 
-        self.wait_on_compute_image_delete(image['ImageId'])
-        self.log.info(f'{image["ImageId"]} deleted in {self.region}')
-
-        return True
-
     def delete_compute_image_in_regions(
         self,
         image_name,
@@ -283,29 +611,157 @@ class AliyunImage(object):
         for region in regions:
             self.region = region
 
-            try:
-                self.delete_compute_image(
-                    image_name,
-                    force=force
-                )
-            except Exception as error:
-                self.log.error(
-                    f'Failed to delete {image_name} in {self.region}: '
-                    f'{error}.'
-                )
+            with trace_span(self.tracer, region, 'region', region=region):
+                try:
+                    self.delete_compute_image(
+                        image_name,
+                        force=force
+                    )
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to delete {image_name} in {self.region}: '
+                        f'{error}.'
+                    )
+
+    def get_expired_images(self, regions=None, max_workers=10):
+        """
+        Return images past their removal date in all regions.
+
+        Only images with a "Removal date" tag are listed. Regions are
+        listed in parallel and the tag value is compared with today's
+        date, images are kept on their removal date. If a region list
+        is not provided use all available regions. Returns a dictionary
+        mapping region to a list of expired images.
+        """
+        if not regions:
+            regions = self.get_regions()
+
+        today = get_todays_date()
+        expired = {}
+
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.get_compute_images,
+                    region,
+                    tags=[{'Key': 'Removal date'}]
+                ): region for region in regions
+            }
+
+            for future in as_completed(futures):
+                region = futures[future]
+
+                try:
+                    images = future.result()
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to list images in {region}: {error}'
+                    )
+                    continue
+
+                expired[region] = []
+                for image in images:
+                    removal_date = get_image_tags(image).get('Removal date')
+
+                    if removal_date and removal_date < today:
+                        expired[region].append(image)
+
+        return expired
+
+    def delete_expired_images(
+        self,
+        regions=None,
+        max_workers=10,
+        dry_run=False,
+        force=False
+    ):
+        """
+        Delete all images past their removal date in all regions.
+
+        Delete requests are sent concurrently with at most max_workers
+        requests in flight. Each region then waits on all of its deleted
+        images with a single batched poll. If a region list is not provided
+        use all available regions. Returns a dictionary mapping region to
+        a list of deleted image names. With dry run no images are deleted
+        and the images which would be deleted are returned.
+        """
+        expired = self.get_expired_images(regions, max_workers=max_workers)
+
+        if dry_run:
+            return {
+                region: [image['ImageName'] for image in images]
+                for region, images in expired.items()
+            }
+
+        deleted = {region: [] for region in expired}
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for region, images in expired.items():
+                for image in images:
+                    future = executor.submit(
+                        self._delete_image,
+                        image['ImageId'],
+                        force=force,
+                        region=region
+                    )
+                    futures[future] = (region, image)
+
+            for future in as_completed(futures):
+                region, image = futures[future]
+
+                try:
+                    future.result()
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to delete {image["ImageName"]} in '
+                        f'{region}: {error}'
+                    )
+                    continue
+
+                deleted[region].append(image)
+
+            futures = {
+                executor.submit(
+                    self.wait_on_compute_images_delete,
+                    [image['ImageId'] for image in images],
+                    region=region
+                ): region for region, images in deleted.items() if images
+            }
+
+            for future in as_completed(futures):
+                region = futures[future]
+
+                try:
+                    future.result()
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to wait on image deletion in '
+                        f'{region}: {error}'
+                    )
+
+        for region, images in deleted.items():
+            for image in images:
+                self.log.info(f'{image["ImageId"]} deleted in {region}')
+
+        return {
+            region: [image['ImageName'] for image in images]
+            for region, images in deleted.items()
+        }
 
     def get_compute_image(
         self,
         image_name=None,
         image_id=None,
-        status=None
+        status=None,
+        region=None
     ):
         """
         Return compute image by name and/or id.
 
         If image is not found raise exception. Name and ID are both
         indices in Aliyun so there should always only be one image
-        in the result set.
+        in the result set. If region is not provided the current
+        region is used.
         """
         if not image_name and not image_id:
             raise AliyunImageException(
@@ -315,9 +771,8 @@ class AliyunImage(object):
         if not status:
             status = ','.join(self.IMAGE_STATES)
 
-        request = DescribeImagesRequest()
+        request = get_ecs_request('DescribeImages')
         request.set_Status(status)
-        request.set_accept_format('json')
 
         if image_name:
             request.set_ImageName(image_name)
@@ -328,7 +783,9 @@ class AliyunImage(object):
         try:
             with handle_http_errors():
                 response = json.loads(
-                    self.compute_client.do_action_with_exception(request)
+                    self._get_compute_client(
+                        region
+                    ).do_action_with_exception(request)
                 )
         except Exception as error:
             raise AliyunImageException(
@@ -344,6 +801,165 @@ class AliyunImage(object):
 
         return image
 
+    def get_compute_images(
+        self,
+        region=None,
+        status=None,
+        image_ids=None,
+        tags=None,
+        filters=None,
+        image_name=None
+    ):
+        """
+        Return a list of all self owned compute images in region.
+
+        Pages through DescribeImages 100 images at a time. If region
+        is not provided the current region is used.
+        """
+        client = self._get_compute_client(region)
+
+        if not status:
+            status = ','.join(self.IMAGE_STATES)
+
+        images = []
+        page_number = 1
+
+        while True:
+            request = get_ecs_request('DescribeImages')
+            request.set_Status(status)
+            request.set_ImageOwnerAlias('self')
+            request.set_PageSize(100)
+            request.set_PageNumber(page_number)
+
+            if image_ids:
+                request.set_ImageId(','.join(image_ids))
+
+            if image_name:
+                request.set_ImageName(image_name)
+
+            if tags:
+                request.set_Tags(tags)
+
+            if filters:
+                request.set_Filters(filters)
+
+            try:
+                with handle_http_errors():
+                    response = json.loads(
+                        client.do_action_with_exception(request)
+                    )
+            except Exception as error:
+                raise AliyunImageException(
+                    f'Unable to list images: {error}.'
+                )
+
+            page = response.get('Images', {}).get('Image', [])
+            images.extend(page)
+
+            if len(page) < 100 or len(images) >= response.get('TotalCount', 0):
+                break
+
+            page_number += 1
+
+        return images
+
+    def get_image_inventory(
+        self,
+        inventory,
+        regions=None,
+        max_workers=10,
+        incremental=False
+    ):
+        """
+        Crawl all self owned images in regions into the inventory.
+
+        Regions are listed in parallel and each region is updated
+        in the inventory as it completes. If a region list is not
+        provided use all available regions.
+
+        With incremental the regions already in the inventory only
+        list images created since the region high water mark and
+        recheck all known images by id, so status changes and deleted
+        images are picked up.
+        Returns a dictionary mapping region to the number of images
+        listed.
+        """
+        if not regions:
+            regions = self.get_regions()
+
+        marks = {}
+        recheck_ids = {}
+        if incremental:
+            for region in regions:
+                marks[region] = inventory.get_high_water_mark(region)
+                recheck_ids[region] = inventory.get_image_ids(region)
+
+        counts = {}
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._crawl_region,
+                    region,
+                    marks.get(region),
+                    recheck_ids.get(region)
+                ): region for region in regions
+            }
+
+            for future in as_completed(futures):
+                region = futures[future]
+
+                try:
+                    images, removed_ids = future.result()
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to list images in {region}: {error}'
+                    )
+                    continue
+
+                if marks.get(region):
+                    inventory.update_region(region, images, removed_ids)
+                else:
+                    inventory.replace_region(region, images)
+
+                counts[region] = len(images)
+                self.log.debug(f'{len(images)} images found in {region}')
+
+        return counts
+
+    def _crawl_region(self, region, high_water_mark=None, recheck_ids=None):
+        """
+        Return a tuple of images and removed image ids for region.
+
+        Without a high water mark all images are listed. Otherwise only
+        images created since the mark (at minute resolution) are listed
+        and the recheck image ids are described again in batches of 100.
+        Rechecked image ids that no longer exist are returned as removed.
+        """
+        if not high_water_mark:
+            return self.get_compute_images(region), []
+
+        images = self.get_compute_images(
+            region,
+            filters=[{
+                'Key': 'CreationStartTime',
+                'Value': high_water_mark[:16] + 'Z'
+            }]
+        )
+
+        removed_ids = []
+        recheck_ids = recheck_ids or []
+        for index in range(0, len(recheck_ids), 100):
+            batch = recheck_ids[index:index + 100]
+            rechecked = self.get_compute_images(region, image_ids=batch)
+            found = set(image['ImageId'] for image in rechecked)
+
+            images.extend(rechecked)
+            removed_ids.extend(
+                image_id for image_id in batch if image_id not in found
+            )
+
+        return images, removed_ids
+
     def image_exists(self, image_name):
         """Return True if image exists, false otherwise."""
         try:
@@ -359,56 +975,128 @@ class AliyunImage(object):
 
         If it still exists after 5 minutes raise exception.
         """
-        start = time.time()
+        start = self.clock.time()
         end = start + 300
 
-        while time.time() < end:
+        while self.clock.time() < end:
             try:
                 self.get_compute_image(image_id=image_id)
             except AliyunImageException:
                 return
             else:
-                time.sleep(10)
+                self._sleep(10, 'wait_on_compute_image_delete')
 
         raise AliyunImageException(
             'Image not deleted within 5 minutes.'
         )
 
-    def wait_on_compute_image(self, image_id, timeout=3600):
+    def wait_on_compute_images_delete(self, image_ids, region=None):
+        """
+        Wait for all compute images in region to be deleted.
+
+        The images are described in batches of 100 ids per poll. If any
+        still exist after 5 minutes raise exception.
+        """
+        start = self.clock.time()
+        end = start + 300
+        remaining = list(image_ids)
+
+        while self.clock.time() < end:
+            found = set()
+            for index in range(0, len(remaining), 100):
+                images = self.get_compute_images(
+                    region,
+                    image_ids=remaining[index:index + 100]
+                )
+                found.update(image['ImageId'] for image in images)
+
+            remaining = [
+                image_id for image_id in remaining if image_id in found
+            ]
+
+            if not remaining:
+                return
+
+            self._sleep(10, 'wait_on_compute_images_delete')
+
+        raise AliyunImageException(
+            f'Images not deleted within 5 minutes: {", ".join(remaining)}'
+        )
+
+    def is_image_available(self, image):
+        """
+        Return True if the image is available or False if processing.
+
+        Raise exception if the image is in any other state.
+        """
+        status = image.get('Status', 'unknown')
+
+        if status in self.IMAGE_BROKEN_STATES:
+            raise AliyunImageException(
+                f'Image in a broken state: {status}'
+            )
+        elif status in self.IMAGE_PROCESSING_STATES:
+            return False
+        elif status == 'Available':
+            return True
+        elif status == 'Deprecated':
+            raise AliyunImageException(
+                'Image status is "Deprecated" and '
+                'expected to be "Available"'
+            )
+        else:
+            raise AliyunImageException(
+                f'Image in an unknown state: {status}'
+            )
+
+    def wait_on_compute_image(
+        self,
+        image_id,
+        timeout=3600,
+        progress_callback=None,
+        not_found_timeout=60
+    ):
         """
         Wait for the compute image to show up in region.
 
-        If it doesn't show up in 30 mintues raise exception.
+        The poll interval follows the estimated time remaining based
+        on the image progress. The progress callback is called with
+        the progress (0-100) and the estimated seconds remaining (or
+        None) after every poll. If the image is not found within
+        not_found_timeout seconds or not available within timeout
+        seconds raise exception.
         """
-        start = time.time()
+        estimator = ProgressEstimator()
+        start = self.clock.time()
         end = start + timeout
 
-        while time.time() < end:
-            image = {}
+        while self.clock.time() < end:
             try:
                 image = self.get_compute_image(image_id=image_id)
             except AliyunImageException:
-                time.sleep(30)
+                if self.clock.time() - start >= not_found_timeout:
+                    raise
 
-            status = image.get('Status', 'unknown')
+                # Image is not visible yet
+                image = {'Status': 'Waiting'}
 
-            if status in self.IMAGE_BROKEN_STATES:
-                raise AliyunImageException(
-                    f'Image in a broken state: {status}'
+            now = self.clock.time()
+            estimator.update(now, get_image_progress(image))
+            available = self.is_image_available(image)
+
+            if progress_callback:
+                progress_callback(
+                    100 if available else estimator.progress,
+                    0 if available else estimator.eta(now)
                 )
-            elif status in self.IMAGE_PROCESSING_STATES:
-                time.sleep(30)
-            elif status == 'Available':
+
+            if available:
                 return
-            elif status == 'Deprecated':
-                raise AliyunImageException(
-                    'Image status is "Deprecated" and '
-                    'expected to be "Available"'
-                )
-            else:
-                raise AliyunImageException(
-                    f'Image in an unknown state: {status}'
-                )
+
+            self._sleep(
+                min(estimator.next_interval(now), max(end - now, 0)),
+                'wait_on_compute_image'
+            )
 
         raise AliyunImageException(
             f'Image not available within {timeout} seconds.'
@@ -425,19 +1113,87 @@ class AliyunImage(object):
         disk_image_size=20,
         force_replace_image=False,
         timeout=3600,
-        nvme_support=False
+        nvme_support=False,
+        wait=True,
+        progress_callback=None
     ):
         """
         Create compute image in current region from storage blob.
 
         If image exists and force replace is True delete the existing
-        image before re-creating.
+        image before re-creating. The progress callback is passed to
+        wait_on_compute_image.
+
+        If wait is False an ImageOperation handle is returned as soon
+        as the import has started instead of the image id.
         """
         if force_replace_image and self.image_exists(image_name):
             self.delete_compute_image(image_name)
 
-        request = ImportImageRequest()
-        request.set_accept_format('json')
+        image_id = self.import_compute_image(
+            image_name,
+            image_description,
+            blob_name,
+            platform,
+            os_type=os_type,
+            arch=arch,
+            disk_image_size=disk_image_size,
+            nvme_support=nvme_support
+        )
+
+        if not wait:
+            return self.start_operation(image_id, timeout=timeout)
+
+        # Image creation is async so wait until image shows up
+        self.wait_on_compute_image(
+            image_id,
+            timeout=timeout,
+            progress_callback=progress_callback
+        )
+
+        return image_id
+
+    def start_operation(self, image_id, region=None, timeout=3600):
+        """
+        Return an ImageOperation handle for the image id in region.
+
+        The operation is polled by the shared background poller (or
+        a poller on the image clock if it isn't the system clock)
+        until the image is available. If region is not provided
+        the current region is used.
+        """
+        operation = ImageOperation(
+            self,
+            image_id,
+            region or self.region,
+            timeout=timeout
+        )
+        if not self.operation_poller and self.clock is not system_clock:
+            # The shared poller sleeps on the system clock
+            self.operation_poller = ImageOperationPoller(clock=self.clock)
+
+        poller = self.operation_poller or get_operation_poller()
+        poller.add(operation)
+
+        return operation
+
+    def import_compute_image(
+        self,
+        image_name,
+        image_description,
+        blob_name,
+        platform,
+        os_type='linux',
+        arch='x86_64',
+        disk_image_size=20,
+        nvme_support=False
+    ):
+        """
+        Start the compute image import in current region from storage blob.
+
+        Returns the image id without waiting for the image.
+        """
+        request = get_ecs_request('ImportImage')
         request.set_DiskDeviceMappings(
             [
                 {
@@ -464,19 +1220,32 @@ class AliyunImage(object):
                 f'Unable to create image: {error}.'
             )
 
-        # Image creation is async so wait until image shows up
-        self.wait_on_compute_image(response['ImageId'], timeout=timeout)
-
         return response['ImageId']
 
-    def copy_compute_image(self, source_image_name, destination_region):
+    def copy_compute_image(
+        self,
+        source_image_name,
+        destination_region,
+        wait=None,
+        timeout=3600,
+        source_region=None
+    ):
         """
         Copy compute image to specified region.
+
+        By default the new image id is returned without waiting. If
+        wait is True wait for the copy to become available and return
+        the id. If wait is False return an ImageOperation handle.
+
+        If source region is not provided the image is copied from
+        the current region.
         """
-        image = self.get_compute_image(image_name=source_image_name)
+        image = self.get_compute_image(
+            image_name=source_image_name,
+            region=source_region
+        )
 
-        request = CopyImageRequest()
-        request.set_accept_format('json')
+        request = get_ecs_request('CopyImage')
         request.set_ImageId(image['ImageId'])
         request.set_DestinationImageName(source_image_name)
         request.set_DestinationDescription(image['Description'])
@@ -485,7 +1254,9 @@ class AliyunImage(object):
         try:
             with handle_http_errors():
                 response = json.loads(
-                    self.compute_client.do_action_with_exception(request)
+                    self._get_compute_client(
+                        source_region
+                    ).do_action_with_exception(request)
                 )
         except Exception as error:
             raise AliyunImageException(
@@ -494,25 +1265,129 @@ class AliyunImage(object):
 
         self.log.info(f'{response["ImageId"]} created in {destination_region}')
 
-        return response['ImageId']
+        if wait is None:
+            return response['ImageId']
+
+        operation = self.start_operation(
+            response['ImageId'],
+            region=destination_region,
+            timeout=timeout
+        )
 
-    def replicate_image(self, source_image_name, regions=None):
+        if wait:
+            return operation.result()
+
+        return operation
+
+    def replicate_image(
+        self,
+        source_image_name,
+        regions=None,
+        scheduler=None,
+        priority=0,
+        strategy='source',
+        topology=None,
+        max_concurrency=10,
+        skip_existing=False,
+        force_replace_image=False
+    ):
         """
         Copy the compute image based on image name to all regions.
 
         If a region list is not provided use all available regions.
+
+        If an ImageJobScheduler is provided the copies are queued as
+        jobs with the given priority. Each job holds its slot until the
+        copy is available so this blocks until all copies have finished.
+
+        With the tree strategy regions that already have an available
+        copy are used as the source for further copies. The nearest
+        source is chosen from the RegionTopology and the topology is
+        updated with the measured copy times. At most max_concurrency
+        copies run at once and this blocks until all copies finish.
+
+        With skip existing or force replace image all destination
+        regions are first checked concurrently for an image with the
+        same name. Skip existing reports the id of an existing image
+        instead of copying. Force replace image deletes the existing
+        image before copying.
         """
+        if skip_existing and force_replace_image:
+            raise AliyunImageException(
+                'Skip existing and force replace image are exclusive.'
+            )
+
         if not regions:
             regions = self.get_regions()
 
+        regions = [region for region in regions if region != self.region]
         images = {}
-        for region in regions:
-            if region == self.region:
-                continue
 
+        if skip_existing or force_replace_image:
+            existing = self.find_images_in_regions(
+                source_image_name,
+                regions,
+                max_workers=max_concurrency
+            )
+
+            for region in regions:
+                if region not in existing:
+                    # Lookup failed so copying could create a duplicate
+                    images[region] = None
+                elif existing[region] and skip_existing:
+                    self.log.info(
+                        f'{existing[region]["ImageId"]} already exists '
+                        f'in {region}'
+                    )
+                    images[region] = existing[region]['ImageId']
+
+            if force_replace_image:
+                deleted = self._delete_images_in_regions({
+                    region: image['ImageId']
+                    for region, image in existing.items() if image
+                }, max_workers=max_concurrency)
+                images.update({
+                    region: None for region, success in deleted.items()
+                    if not success
+                })
+
+            regions = [region for region in regions if region not in images]
+
+        if strategy != 'source':
+            images.update(self._replicate_tree(
+                source_image_name,
+                regions,
+                ReplicationPlanner(strategy, topology),
+                max_concurrency,
+                scheduler=scheduler,
+                priority=priority
+            ))
+            return images
+
+        futures = {}
+        if scheduler:
+            futures = {
+                region: scheduler.submit(
+                    region,
+                    self.copy_compute_image,
+                    source_image_name,
+                    region,
+                    wait=True,
+                    group=source_image_name,
+                    priority=priority
+                ) for region in regions
+            }
+
+        for region in regions:
             image_id = None
             try:
-                image_id = self.copy_compute_image(source_image_name, region)
+                if scheduler:
+                    image_id = futures[region].result()
+                else:
+                    image_id = self.copy_compute_image(
+                        source_image_name,
+                        region
+                    )
                 images[region] = image_id
             except Exception as error:
                 self.log.error(
@@ -523,14 +1398,176 @@ class AliyunImage(object):
 
         return images
 
+    def find_images_in_regions(
+        self,
+        image_name,
+        regions=None,
+        max_workers=10
+    ):
+        """
+        Look up the image by name in all regions concurrently.
+
+        Returns a dictionary mapping region to the image with exactly
+        the name (or None if it does not exist). Regions where the
+        lookup fails are logged and left out of the result.
+        """
+        if not regions:
+            regions = self.get_regions()
+
+        images = {}
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.get_compute_images,
+                    region,
+                    image_name=image_name
+                ): region for region in regions
+            }
+
+            for future in as_completed(futures):
+                region = futures[future]
+
+                try:
+                    result = future.result()
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to find {image_name} in {region}: {error}'
+                    )
+                    continue
+
+                # The ImageName filter also matches similar names
+                matches = [
+                    image for image in result
+                    if image['ImageName'] == image_name
+                ]
+                images[region] = matches[0] if matches else None
+
+        return images
+
+    def _delete_images_in_regions(self, image_ids, max_workers=10):
+        """
+        Delete the image ids (region to id) concurrently and wait.
+
+        Returns a dictionary mapping region to True if the image
+        was deleted.
+        """
+        def delete(region, image_id):
+            with trace_span(self.tracer, region, 'region', region=region):
+                self._delete_image(image_id, region=region)
+                self.wait_on_compute_images_delete([image_id], region=region)
+
+            self.log.info(f'{image_id} deleted in {region}')
+
+        deleted = {}
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(delete, region, image_id): region
+                for region, image_id in image_ids.items()
+            }
+
+            for future in as_completed(futures):
+                region = futures[future]
+
+                try:
+                    future.result()
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to delete {image_ids[region]} in '
+                        f'{region}: {error}'
+                    )
+                    deleted[region] = False
+                else:
+                    deleted[region] = True
+
+        return deleted
+
+    def _replicate_tree(
+        self,
+        source_image_name,
+        regions,
+        planner,
+        max_concurrency,
+        scheduler=None,
+        priority=0
+    ):
+        """
+        Copy the image to regions in the order chosen by the planner.
+
+        Returns a dictionary mapping region to image id (or None
+        on failure).
+        """
+        ready = [self.region]
+        pending = list(regions)
+        running = {}
+        images = {}
+
+        executor = ContextThreadPoolExecutor(max_workers=max_concurrency)
+
+        with executor:
+            submit = executor.submit
+            if scheduler:
+                submit = partial(
+                    scheduler.submit,
+                    group=source_image_name,
+                    priority=priority
+                )
+
+            while pending or running:
+                for source, region in planner.next_copies(
+                    ready,
+                    [copy[1] for copy in running.values()],
+                    pending,
+                    max_concurrency - len(running)
+                ):
+                    pending.remove(region)
+                    self.log.debug(
+                        f'Copying {source_image_name} from {source} '
+                        f'to {region}'
+                    )
+                    args = (
+                        self.copy_compute_image,
+                        source_image_name,
+                        region
+                    )
+                    if scheduler:
+                        args = (region,) + args
+
+                    future = submit(*args, wait=True, source_region=source)
+                    running[future] = (source, region, self.clock.time())
+
+                done, not_done = wait_on_futures(
+                    running,
+                    return_when=FIRST_COMPLETED
+                )
+
+                for future in done:
+                    source, region, start = running.pop(future)
+
+                    try:
+                        images[region] = future.result()
+                    except Exception as error:
+                        self.log.error(
+                            f'Failed to copy {source_image_name} '
+                            f'to {region}: {error}'
+                        )
+                        images[region] = None
+                    else:
+                        ready.append(region)
+                        planner.topology.record(
+                            source,
+                            region,
+                            self.clock.time() - start
+                        )
+
+        return images
+
     def describe_share_permission(self, source_image_name):
         """
         Describe the images share permissions in current region.
         """
         image = self.get_compute_image(image_name=source_image_name)
 
-        request = DescribeImageSharePermissionRequest()
-        request.set_accept_format('json')
+        request = get_ecs_request('DescribeImageSharePermission')
         request.set_ImageId(image['ImageId'])
 
         try:
@@ -551,8 +1588,7 @@ class AliyunImage(object):
         """
         image = self.get_compute_image(image_name=source_image_name)
 
-        request = ModifyImageSharePermissionRequest()
-        request.set_accept_format('json')
+        request = get_ecs_request('ModifyImageSharePermission')
         request.set_ImageId(image['ImageId'])
         request.set_LaunchPermission(launch_permission)
 
@@ -583,13 +1619,14 @@ class AliyunImage(object):
         for region in regions:
             self.region = region
 
-            try:
-                self.publish_image(source_image_name, launch_permission)
-            except Exception as error:
-                self.log.error(
-                    f'Failed to publish {source_image_name} '
-                    f'in {self.region}: {error}'
-                )
+            with trace_span(self.tracer, region, 'region', region=region):
+                try:
+                    self.publish_image(source_image_name, launch_permission)
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to publish {source_image_name} '
+                        f'in {self.region}: {error}'
+                    )
 
     def generate_deprecation_tags(self, replacement_image=None):
         """
@@ -645,16 +1682,17 @@ class AliyunImage(object):
         for region in regions:
             self.region = region
 
-            try:
-                self.deprecate_image(
-                    source_image_name,
-                    replacement_image
-                )
-            except Exception as error:
-                self.log.error(
-                    f'Failed to deprecate {source_image_name} '
-                    f'in {self.region}: {error}'
-                )
+            with trace_span(self.tracer, region, 'region', region=region):
+                try:
+                    self.deprecate_image(
+                        source_image_name,
+                        replacement_image
+                    )
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to deprecate {source_image_name} '
+                        f'in {self.region}: {error}'
+                    )
 
     def activate_image(self, source_image_name):
         """
@@ -667,8 +1705,7 @@ class AliyunImage(object):
             status='Deprecated'
         )
 
-        request = ModifyImageAttributeRequest()
-        request.set_accept_format('json')
+        request = get_ecs_request('ModifyImageAttribute')
         request.set_ImageId(image['ImageId'])
         request.set_Status('Available')
 
@@ -694,20 +1731,20 @@ class AliyunImage(object):
         for region in regions:
             self.region = region
 
-            try:
-                self.activate_image(source_image_name)
-            except Exception as error:
-                self.log.error(
-                    f'Failed to activate {source_image_name} in '
-                    f'{self.region}: {error}.'
-                )
+            with trace_span(self.tracer, region, 'region', region=region):
+                try:
+                    self.activate_image(source_image_name)
+                except Exception as error:
+                    self.log.error(
+                        f'Failed to activate {source_image_name} in '
+                        f'{self.region}: {error}.'
+                    )
 
     def add_image_tags(self, image_id, tags):
         """
         Add the list of tags to the image.
         """
-        request = TagResourcesRequest()
-        request.set_accept_format('json')
+        request = get_ecs_request('TagResources')
         request.set_ResourceType('image')
         request.set_ResourceIds([image_id])
         request.set_Tags(tags)
@@ -736,35 +1773,122 @@ class AliyunImage(object):
             )
 
         if not self._bucket_client:
-            auth = get_storage_auth(self.access_key, self.access_secret)
-            self._bucket_client = get_storage_bucket_client(
-                auth,
-                self.bucket_name,
-                self.region,
-                self.transfer_acceleration,
-                self.timeout
-            )
-
-            try:
-                self._bucket_client.get_bucket_info()  # Force eager auth
-            except oss2.exceptions.ServerError as error:
-                raise AliyunException(
-                    f'Unable to get bucket client: '
-                    f'{str(error.details["Message"])}'
-                )
-            except oss2.exceptions.RequestError:
-                raise AliyunException(
-                    'Unable to get bucket client: Failed to establish a new '
-                    'connection. Ensure the bucket name and region are '
-                    'correct.'
-                )
-            except Exception as error:
-                raise AliyunException(
-                    f'Unable to get bucket client: {str(error)}'
+            pool = get_client_pool()
+
+            if pool:
+                bucket = pool.get(
+                    (
+                        'oss',
+                        self.access_key,
+                        self.access_secret,
+                        self.bucket_name,
+                        self.region,
+                        self.transfer_acceleration,
+                        self.storage_endpoint,
+                        self.timeout
+                    ),
+                    self._new_bucket_client
                 )
+            else:
+                bucket = self._new_bucket_client()
+
+            self._bucket_client = InstrumentedBucket(
+                bucket,
+                self.metrics,
+                self.region
+            )
 
         return self._bucket_client
 
+    def get_storage_endpoint(self, region=None, bucket_name=None):
+        """
+        Return the storage endpoint url for the region.
+
+        Defaults to the current region and bucket. With
+        transfer_acceleration set to auto the accelerate, public
+        and internal endpoints are probed and the fastest reachable
+        endpoint is used (cached per host and region).
+        """
+        region = region or self.region
+
+        if self.storage_endpoint:
+            return self.storage_endpoint
+
+        if self.transfer_acceleration == AUTO_ENDPOINT:
+            endpoint = select_storage_endpoint(
+                region,
+                get_storage_auth(self.access_key, self.access_secret),
+                bucket_name or self.bucket_name
+            )
+            self.log.debug(f'Selected storage endpoint: {endpoint}')
+            return endpoint
+
+        return get_storage_endpoint(region, self.transfer_acceleration)
+
+    def get_bucket_client(self, bucket_name, region):
+        """Return a new client for a bucket in the region."""
+        return InstrumentedBucket(
+            get_storage_bucket_client(
+                get_storage_auth(self.access_key, self.access_secret),
+                bucket_name,
+                region,
+                self.transfer_acceleration,
+                self.timeout,
+                endpoint=self.get_storage_endpoint(region, bucket_name),
+                pool_size=self.storage_pool_size
+            ),
+            self.metrics,
+            region
+        )
+
+    def _new_bucket_client(self):
+        """
+        Return a new bucket client after validating the auth.
+
+        The auth is only validated once per credentials, bucket and
+        endpoint in the process.
+        """
+        auth = get_storage_auth(self.access_key, self.access_secret)
+        bucket = get_storage_bucket_client(
+            auth,
+            self.bucket_name,
+            self.region,
+            self.transfer_acceleration,
+            self.timeout,
+            endpoint=self.get_storage_endpoint(),
+            pool_size=self.storage_pool_size
+        )
+        auth_key = (self.access_key, self.access_secret)
+
+        if is_bucket_validated(auth_key, self.bucket_name, bucket.endpoint):
+            return bucket
+
+        try:
+            # Force eager auth
+            InstrumentedBucket(
+                bucket,
+                self.metrics,
+                self.region
+            ).get_bucket_info()
+        except oss2.exceptions.ServerError as error:
+            raise AliyunException(
+                f'Unable to get bucket client: '
+                f'{str(error.details["Message"])}'
+            )
+        except oss2.exceptions.RequestError:
+            raise AliyunException(
+                'Unable to get bucket client: Failed to establish a new '
+                'connection. Ensure the bucket name and region are '
+                'correct.'
+            )
+        except Exception as error:
+            raise AliyunException(
+                f'Unable to get bucket client: {str(error)}'
+            )
+
+        set_bucket_validated(auth_key, self.bucket_name, bucket.endpoint)
+        return bucket
+
     @property
     def compute_client(self):
         """
@@ -774,23 +1898,107 @@ class AliyunImage(object):
         """
         if not self._compute_client:
             try:
-                self._compute_client = AcsClient(
+                self._compute_client = self._new_compute_client(self.region)
+            except Exception as error:
+                raise AliyunException(
+                    f'Unable to get compute client: {error}'
+                )
+
+        return self._compute_client
+
+    def _new_compute_client(self, region):
+        """
+        Return a compute client using the endpoint override.
+
+        If a client pool is set the SDK client is shared with other
+        images using the same credentials, region and endpoint.
+        """
+        pool = get_client_pool()
+
+        if pool:
+            client = pool.get(
+                (
+                    'ecs',
                     self.access_key,
                     self.access_secret,
-                    self.region,
-                    connect_timeout=self.timeout
+                    region,
+                    self.compute_endpoint,
+                    self.timeout
+                ),
+                partial(self._new_acs_client, region)
+            )
+        else:
+            client = self._new_acs_client(region)
+
+        return InstrumentedClient(client, self.metrics, region)
+
+    def _new_acs_client(self, region):
+        """Return a new SDK client for region."""
+        client = sdk_client.AcsClient(
+            self.access_key,
+            self.access_secret,
+            region,
+            connect_timeout=self.timeout
+        )
+
+        if self.compute_endpoint:
+            client.add_endpoint(region, 'Ecs', self.compute_endpoint)
+
+        return client
+
+    def _get_compute_client(self, region=None):
+        """
+        Return a compute client for region.
+
+        The shared compute client is used for the current region. Other
+        regions get a dedicated client so requests can run concurrently.
+        """
+        if not region or region == self.region:
+            return self.compute_client
+
+        if region not in self._region_clients:
+            try:
+                self._region_clients[region] = self._new_compute_client(
+                    region
                 )
             except Exception as error:
                 raise AliyunException(
                     f'Unable to get compute client: {error}'
                 )
 
-        return self._compute_client
+        return self._region_clients[region]
+
+    def add_call_hook(self, hook):
+        """
+        Call hook with a CallRecord for every SDK call and waiter sleep.
+
+        The record has the kind (ecs, oss or sleep), action, region,
+        start time, duration, retries, outcome and error code.
+        """
+        self.metrics.add_hook(hook)
+
+    def _sleep(self, seconds, waiter):
+        """Sleep on the clock and record the sleep of the waiter."""
+        self.metrics.record(
+            'sleep',
+            waiter,
+            self.region,
+            self.clock.time(),
+            seconds
+        )
+
+        with trace_span(
+            self.tracer,
+            'sleep',
+            'waiter',
+            waiter=waiter,
+            seconds=seconds
+        ):
+            self.clock.sleep(seconds)
 
     def get_regions(self):
         """Return a list of available region ids."""
-        request = DescribeRegionsRequest()
-        request.set_accept_format('json')
+        request = get_ecs_request('DescribeRegions')
 
         try:
             response = json.loads(
@@ -0,0 +1,584 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun asyncio image class module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import contextvars
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from aliyun_img_utils.aliyun_exceptions import AliyunImageException
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_metrics import (
+    MetricsRecorder,
+    get_default_recorder
+)
+from aliyun_img_utils.aliyun_operations import (
+    ProgressEstimator,
+    get_image_progress
+)
+from aliyun_img_utils.aliyun_tracing import get_default_tracer, trace_span
+
+
+class AsyncAliyunImage(object):
+    """
+    Provides coroutines for handling compute images in Alibaba (Aliyun).
+
+    The SDK requests are blocking so they run in a thread pool bounded
+    by max_concurrency. Waiters sleep on the event loop and never hold
+    a thread between polls. Every coroutine accepts a region and uses
+    a dedicated AliyunImage instance per region, so requests in many
+    regions can run at the same time.
+    """
+
+    def __init__(
+        self,
+        access_key,
+        access_secret,
+        region,
+        bucket_name=None,
+        log_level=logging.INFO,
+        log_callback=None,
+        transfer_acceleration=True,
+        timeout=180,
+        deprecation_period=6,
+        max_concurrency=8,
+        compute_endpoint=None,
+        storage_endpoint=None,
+        metrics=None,
+        tracer=None
+    ):
+        """Initialize class and setup logging."""
+        self.access_key = access_key
+        self.access_secret = access_secret
+        self.region = region
+        self.bucket_name = bucket_name
+        self.log_level = log_level
+        self.transfer_acceleration = transfer_acceleration
+        self.timeout = timeout
+        self.deprecation_period = deprecation_period
+        self.max_concurrency = max_concurrency
+        self.compute_endpoint = compute_endpoint
+        self.storage_endpoint = storage_endpoint
+        self.metrics = metrics or get_default_recorder() or MetricsRecorder()
+        self.tracer = tracer or get_default_tracer()
+        self._images = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+        if log_callback:
+            self.log = log_callback
+        else:
+            self.log = logging.getLogger('aliyun-img-utils')
+            self.log.setLevel(log_level)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shutdown the request thread pool."""
+        self._executor.shutdown(wait=False)
+
+    def get_image(self, region=None):
+        """
+        Return the AliyunImage instance for region.
+
+        If region is not provided the default region is used.
+        """
+        region = region or self.region
+
+        if region not in self._images:
+            self._images[region] = AliyunImage(
+                self.access_key,
+                self.access_secret,
+                region,
+                bucket_name=self.bucket_name,
+                log_level=self.log_level,
+                log_callback=self.log,
+                transfer_acceleration=self.transfer_acceleration,
+                timeout=self.timeout,
+                deprecation_period=self.deprecation_period,
+                compute_endpoint=self.compute_endpoint,
+                storage_endpoint=self.storage_endpoint,
+                metrics=self.metrics,
+                tracer=self.tracer
+            )
+
+        return self._images[region]
+
+    async def _run(self, func, *args, **kwargs):
+        """
+        Run the blocking function in the request thread pool.
+
+        The function runs in a copy of the current context so it
+        keeps the tracing span of the calling task.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(contextvars.copy_context().run, func, *args, **kwargs)
+        )
+
+    async def _in_regions(self, coroutine, regions, action, name):
+        """
+        Run the coroutine function for all regions concurrently.
+
+        Failures are logged per region. Returns a dictionary
+        mapping region to result (or None on failure).
+        """
+        if not regions:
+            regions = await self.get_regions()
+
+        async def run_in_region(region):
+            with trace_span(
+                self.tracer,
+                f'{action} {region}',
+                'region',
+                region=region
+            ):
+                return await coroutine(region)
+
+        results = await asyncio.gather(
+            *[run_in_region(region) for region in regions],
+            return_exceptions=True
+        )
+
+        images = {}
+        for region, result in zip(regions, results):
+            if isinstance(result, Exception):
+                self.log.error(
+                    f'Failed to {action} {name} in {region}: {result}'
+                )
+                result = None
+
+            images[region] = result
+
+        return images
+
+    async def get_regions(self):
+        """Return a list of available region ids."""
+        return await self._run(self.get_image().get_regions)
+
+    async def get_compute_image(
+        self,
+        image_name=None,
+        image_id=None,
+        status=None,
+        region=None
+    ):
+        """Return compute image by name and/or id in region."""
+        return await self._run(
+            self.get_image(region).get_compute_image,
+            image_name=image_name,
+            image_id=image_id,
+            status=status
+        )
+
+    async def get_compute_images(self, region=None, **kwargs):
+        """Return a list of all self owned compute images in region."""
+        return await self._run(
+            self.get_image(region).get_compute_images,
+            **kwargs
+        )
+
+    async def image_exists(self, image_name, region=None):
+        """Return True if image exists in region, false otherwise."""
+        return await self._run(
+            self.get_image(region).image_exists,
+            image_name
+        )
+
+    async def image_tarball_exists(self, blob_name):
+        """Return True if image exists in the configured bucket."""
+        return await self._run(
+            self.get_image().image_tarball_exists,
+            blob_name
+        )
+
+    async def wait_on_blob(self, blob_name):
+        """
+        Wait for the storage blob to show up in bucket.
+
+        If it doesn't show up in 5 mintues raise exception.
+        """
+        loop = asyncio.get_running_loop()
+        end = loop.time() + 300
+
+        while loop.time() < end:
+            if await self.image_tarball_exists(blob_name):
+                return
+
+            await asyncio.sleep(10)
+
+        raise AliyunImageException(
+            'Blob not available within 5 minutes.'
+        )
+
+    async def upload_image_tarball(self, image_file, **kwargs):
+        """
+        Upload image tarball to the configured bucket.
+
+        The upload occupies a single thread from the pool.
+        """
+        return await self._run(
+            self.get_image().upload_image_tarball,
+            image_file,
+            **kwargs
+        )
+
+    async def delete_storage_blob(self, blob_name):
+        """Delete blob if it exists in the configured bucket."""
+        return await self._run(
+            self.get_image().delete_storage_blob,
+            blob_name
+        )
+
+    async def wait_on_compute_image(
+        self,
+        image_id,
+        timeout=3600,
+        region=None,
+        progress_callback=None,
+        not_found_timeout=60
+    ):
+        """
+        Wait for the compute image to become available in region.
+
+        An image that is not visible yet is treated as processing
+        for up to not_found_timeout seconds.
+        The poll interval follows the estimated time remaining and
+        the progress callback is called with the progress and the
+        estimated seconds remaining after every poll. If it doesn't
+        become available within timeout raise exception.
+        """
+        image = self.get_image(region)
+        estimator = ProgressEstimator()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        end = start + timeout
+
+        while loop.time() < end:
+            try:
+                data = await self.get_compute_image(
+                    image_id=image_id,
+                    region=region
+                )
+            except AliyunImageException:
+                if loop.time() - start >= not_found_timeout:
+                    raise
+
+                data = {'Status': 'Waiting'}
+
+            now = loop.time()
+            estimator.update(now, get_image_progress(data))
+            available = image.is_image_available(data)
+
+            if progress_callback:
+                progress_callback(
+                    100 if available else estimator.progress,
+                    0 if available else estimator.eta(now)
+                )
+
+            if available:
+                return
+
+            await asyncio.sleep(
+                min(estimator.next_interval(now), max(end - now, 0))
+            )
+
+        raise AliyunImageException(
+            f'Image not available within {timeout} seconds.'
+        )
+
+    async def wait_on_compute_image_delete(self, image_id, region=None):
+        """
+        Wait for compute image to be deleted in region.
+
+        If it still exists after 5 minutes raise exception.
+        """
+        loop = asyncio.get_running_loop()
+        end = loop.time() + 300
+
+        while loop.time() < end:
+            try:
+                await self.get_compute_image(image_id=image_id, region=region)
+            except AliyunImageException:
+                return
+
+            await asyncio.sleep(10)
+
+        raise AliyunImageException(
+            'Image not deleted within 5 minutes.'
+        )
+
+    async def create_compute_image(
+        self,
+        image_name,
+        image_description,
+        blob_name,
+        platform,
+        force_replace_image=False,
+        timeout=3600,
+        region=None,
+        **kwargs
+    ):
+        """
+        Create compute image in region from storage blob.
+
+        If image exists and force replace is True delete the existing
+        image before re-creating. Extra keyword arguments are passed
+        to AliyunImage.import_compute_image.
+        """
+        if force_replace_image and await self.image_exists(
+            image_name,
+            region=region
+        ):
+            await self.delete_compute_image(image_name, region=region)
+
+        image_id = await self._run(
+            self.get_image(region).import_compute_image,
+            image_name,
+            image_description,
+            blob_name,
+            platform,
+            **kwargs
+        )
+
+        await self.wait_on_compute_image(
+            image_id,
+            timeout=timeout,
+            region=region
+        )
+
+        return image_id
+
+    async def delete_compute_image(self, image_name, force=False, region=None):
+        """
+        Delete compute image in region and wait for the deletion.
+
+        Returns False if the image does not exist.
+        """
+        try:
+            image = await self.get_compute_image(
+                image_name=image_name,
+                region=region
+            )
+        except AliyunImageException:
+            return False
+
+        await self._run(
+            self.get_image(region)._delete_image,
+            image['ImageId'],
+            force=force
+        )
+        await self.wait_on_compute_image_delete(
+            image['ImageId'],
+            region=region
+        )
+        self.log.info(
+            f'{image["ImageId"]} deleted in {region or self.region}'
+        )
+
+        return True
+
+    async def delete_compute_image_in_regions(
+        self,
+        image_name,
+        force=False,
+        regions=None
+    ):
+        """
+        Delete the compute image based on image name in all regions.
+
+        If a region list is not provided use all available regions.
+        """
+        return await self._in_regions(
+            partial(self.delete_compute_image, image_name, force),
+            regions,
+            'delete',
+            image_name
+        )
+
+    async def copy_compute_image(
+        self,
+        source_image_name,
+        destination_region,
+        wait=False,
+        timeout=3600
+    ):
+        """
+        Copy compute image from the default region to destination region.
+
+        If wait is True wait for the copy to become available.
+        """
+        image_id = await self._run(
+            self.get_image().copy_compute_image,
+            source_image_name,
+            destination_region
+        )
+
+        if wait:
+            await self.wait_on_compute_image(
+                image_id,
+                timeout=timeout,
+                region=destination_region
+            )
+
+        return image_id
+
+    async def replicate_image(
+        self,
+        source_image_name,
+        regions=None,
+        wait=False,
+        timeout=3600
+    ):
+        """
+        Copy the compute image based on image name to all regions.
+
+        Copies run concurrently. If a region list is not provided use
+        all available regions. Returns a dictionary mapping region to
+        image id (or None on failure).
+        """
+        if not regions:
+            regions = await self.get_regions()
+
+        regions = [region for region in regions if region != self.region]
+
+        return await self._in_regions(
+            partial(self._copy_to_region, source_image_name, wait, timeout),
+            regions,
+            'copy',
+            source_image_name
+        )
+
+    async def _copy_to_region(self, source_image_name, wait, timeout, region):
+        return await self.copy_compute_image(
+            source_image_name,
+            region,
+            wait=wait,
+            timeout=timeout
+        )
+
+    async def publish_image(
+        self,
+        source_image_name,
+        launch_permission,
+        region=None
+    ):
+        """Publish compute image in region."""
+        await self._run(
+            self.get_image(region).publish_image,
+            source_image_name,
+            launch_permission
+        )
+
+    async def publish_image_to_regions(
+        self,
+        source_image_name,
+        launch_permission,
+        regions=None
+    ):
+        """
+        Publish the compute image based on image name in all regions.
+
+        If a region list is not provided use all available regions.
+        """
+        return await self._in_regions(
+            partial(self.publish_image, source_image_name, launch_permission),
+            regions,
+            'publish',
+            source_image_name
+        )
+
+    async def deprecate_image(
+        self,
+        source_image_name,
+        replacement_image=None,
+        region=None
+    ):
+        """Deprecate compute image in region."""
+        await self._run(
+            self.get_image(region).deprecate_image,
+            source_image_name,
+            replacement_image
+        )
+
+    async def deprecate_image_in_regions(
+        self,
+        source_image_name,
+        regions=None,
+        replacement_image=None
+    ):
+        """
+        Deprecate the compute image based on image name in all regions.
+
+        If a region list is not provided use all available regions.
+        """
+        return await self._in_regions(
+            partial(
+                self.deprecate_image,
+                source_image_name,
+                replacement_image
+            ),
+            regions,
+            'deprecate',
+            source_image_name
+        )
+
+    async def activate_image(self, source_image_name, region=None):
+        """Activate compute image in region."""
+        await self._run(
+            self.get_image(region).activate_image,
+            source_image_name
+        )
+
+    async def activate_image_in_regions(self, source_image_name, regions=None):
+        """
+        Activate compute image in all regions.
+
+        If a region list is not provided use all available regions.
+        """
+        return await self._in_regions(
+            partial(self.activate_image, source_image_name),
+            regions,
+            'activate',
+            source_image_name
+        )
+
+    async def describe_share_permission(self, source_image_name, region=None):
+        """Describe the images share permissions in region."""
+        return await self._run(
+            self.get_image(region).describe_share_permission,
+            source_image_name
+        )
+
+    async def add_image_tags(self, image_id, tags, region=None):
+        """Add the list of tags to the image in region."""
+        await self._run(
+            self.get_image(region).add_image_tags,
+            image_id,
+            tags
+        )
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image inventory module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import sqlite3
+
+from datetime import datetime, timezone
+
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_utils import get_image_tags
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    region TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    image_name TEXT,
+    status TEXT,
+    creation_time TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (region, image_id)
+);
+CREATE INDEX IF NOT EXISTS images_image_id ON images (image_id);
+CREATE INDEX IF NOT EXISTS images_image_name ON images (image_name);
+CREATE INDEX IF NOT EXISTS images_status ON images (status);
+CREATE INDEX IF NOT EXISTS images_creation_time ON images (creation_time);
+
+CREATE TABLE IF NOT EXISTS tags (
+    region TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (region, image_id, key)
+);
+CREATE INDEX IF NOT EXISTS tags_key_value ON tags (key, value);
+
+CREATE TABLE IF NOT EXISTS regions (
+    region TEXT PRIMARY KEY,
+    refreshed_at TEXT,
+    high_water_mark TEXT
+);
+"""
+
+
+class ImageInventory(object):
+    """
+    Local indexed store of compute images across regions.
+
+    Images are stored in a SQLite database with indices on name,
+    ID, status, creation time and tags. Queries never hit the API.
+    """
+
+    def __init__(self, path=':memory:'):
+        """Open (and if required create) the inventory database."""
+        self.path = path
+
+        if path != ':memory:':
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+
+        try:
+            self.connection = sqlite3.connect(path)
+            self.connection.executescript(SCHEMA)
+        except sqlite3.Error as error:
+            raise AliyunException(
+                f'Unable to open image inventory {path}: {error}'
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the inventory database."""
+        self.connection.close()
+
+    def _insert_images(self, region, images):
+        """Insert or replace images and their tags for the region."""
+        for image in images:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    region,
+                    image['ImageId'],
+                    image.get('ImageName'),
+                    image.get('Status'),
+                    image.get('CreationTime'),
+                    json.dumps(image)
+                )
+            )
+            self.connection.execute(
+                'DELETE FROM tags WHERE region = ? AND image_id = ?',
+                (region, image['ImageId'])
+            )
+            self.connection.executemany(
+                'INSERT INTO tags VALUES (?, ?, ?, ?)',
+                [
+                    (region, image['ImageId'], key, value)
+                    for key, value in get_image_tags(image).items()
+                ]
+            )
+
+    def _set_refreshed(self, region):
+        """
+        Record the time the region was last refreshed.
+
+        The high water mark is the newest image creation time
+        stored for the region.
+        """
+        high_water_mark = self.connection.execute(
+            'SELECT MAX(creation_time) FROM images WHERE region = ?',
+            (region,)
+        ).fetchone()[0]
+
+        self.connection.execute(
+            'INSERT OR REPLACE INTO regions VALUES (?, ?, ?)',
+            (
+                region,
+                datetime.now(timezone.utc).isoformat(),
+                high_water_mark
+            )
+        )
+
+    def replace_region(self, region, images):
+        """
+        Replace all images in the region with the provided images.
+
+        Used after a full crawl of the region.
+        """
+        with self.connection:
+            self.connection.execute(
+                'DELETE FROM images WHERE region = ?', (region,)
+            )
+            self.connection.execute(
+                'DELETE FROM tags WHERE region = ?', (region,)
+            )
+            self._insert_images(region, images)
+            self._set_refreshed(region)
+
+    def update_region(self, region, images, removed_image_ids=None):
+        """
+        Insert or replace images and remove deleted images in region.
+
+        Used after an incremental refresh of the region.
+        """
+        with self.connection:
+            for image_id in removed_image_ids or []:
+                self.connection.execute(
+                    'DELETE FROM images WHERE region = ? AND image_id = ?',
+                    (region, image_id)
+                )
+                self.connection.execute(
+                    'DELETE FROM tags WHERE region = ? AND image_id = ?',
+                    (region, image_id)
+                )
+
+            self._insert_images(region, images)
+            self._set_refreshed(region)
+
+    def get_high_water_mark(self, region):
+        """
+        Return the newest image creation time crawled in region.
+
+        None is returned if the region has never been crawled.
+        """
+        row = self.connection.execute(
+            'SELECT refreshed_at, high_water_mark FROM regions '
+            'WHERE region = ?',
+            (region,)
+        ).fetchone()
+
+        if not row:
+            return None
+
+        # A crawled region without images uses the epoch as mark
+        return row[1] or '1970-01-01T00:00:00Z'
+
+    def get_image_ids(self, region, statuses=None):
+        """
+        Return a list of image ids in region with any of the statuses.
+
+        Without statuses all image ids in region are returned.
+        """
+        if statuses is None:
+            cursor = self.connection.execute(
+                'SELECT image_id FROM images WHERE region = ?',
+                (region,)
+            )
+        else:
+            cursor = self.connection.execute(
+                f'SELECT image_id FROM images WHERE region = ? AND '
+                f'status IN ({", ".join("?" * len(statuses))})',
+                [region, *statuses]
+            )
+
+        return [row[0] for row in cursor]
+
+    def get_regions(self):
+        """Return a dictionary of region ids to last refresh time."""
+        cursor = self.connection.execute(
+            'SELECT region, refreshed_at FROM regions ORDER BY region'
+        )
+        return dict(cursor.fetchall())
+
+    def query(
+        self,
+        image_name=None,
+        image_id=None,
+        status=None,
+        region=None,
+        tag_key=None,
+        tag_value=None,
+        created_after=None,
+        created_before=None
+    ):
+        """
+        Return a list of images matching all provided filters.
+
+        The image name may contain glob style wildcards. Creation
+        times are compared as ISO 8601 strings. Each image dictionary
+        has a RegionId key added with the region it was found in.
+        """
+        clauses = []
+        params = []
+
+        if image_name:
+            clauses.append('images.image_name GLOB ?')
+            params.append(image_name)
+
+        if image_id:
+            clauses.append('images.image_id = ?')
+            params.append(image_id)
+
+        if status:
+            statuses = status.split(',')
+            clauses.append(
+                f'images.status IN ({", ".join("?" * len(statuses))})'
+            )
+            params.extend(statuses)
+
+        if region:
+            clauses.append('images.region = ?')
+            params.append(region)
+
+        if created_after:
+            clauses.append('images.creation_time >= ?')
+            params.append(created_after)
+
+        if created_before:
+            clauses.append('images.creation_time < ?')
+            params.append(created_before)
+
+        if tag_key:
+            tag_clause = (
+                'EXISTS (SELECT 1 FROM tags WHERE '
+                'tags.region = images.region AND '
+                'tags.image_id = images.image_id AND tags.key = ?'
+            )
+            params.append(tag_key)
+
+            if tag_value is not None:
+                tag_clause += ' AND tags.value = ?'
+                params.append(tag_value)
+
+            clauses.append(tag_clause + ')')
+
+        statement = 'SELECT region, data FROM images'
+
+        if clauses:
+            statement += ' WHERE ' + ' AND '.join(clauses)
+
+        statement += ' ORDER BY images.creation_time DESC, images.region'
+
+        images = []
+        for image_region, data in self.connection.execute(statement, params):
+            image = json.loads(data)
+            image['RegionId'] = image_region
+            images.append(image)
+
+        return images
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils lazy import module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import importlib
+
+
+class LazyModule(object):
+    """
+    Proxy for a module which is imported on first attribute access.
+
+    The SDK modules take a large part of the CLI startup time. Using
+    a proxy at module level keeps the call sites (oss2.Bucket) while
+    only code paths which use the SDK pay for importing it.
+    """
+
+    def __init__(self, name):
+        """Initialize proxy for the module name."""
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        """Import and return the module."""
+        if self._module is None:
+            self.__dict__['_module'] = importlib.import_module(self._name)
+
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        return f'<lazy module {self._name!r}>'
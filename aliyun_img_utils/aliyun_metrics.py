@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils API call metrics module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextvars
+import json
+import logging
+import math
+import threading
+import time
+
+from collections import defaultdict, deque, namedtuple
+
+# Recorder shared by new images in the current context
+default_recorder = contextvars.ContextVar(
+    'aliyun_img_utils_recorder',
+    default=None
+)
+
+CallRecord = namedtuple(
+    'CallRecord',
+    [
+        'kind',
+        'action',
+        'region',
+        'start',
+        'duration',
+        'retries',
+        'outcome',
+        'error'
+    ]
+)
+
+# Bucket methods recorded by InstrumentedBucket and their OSS API name
+OSS_ACTIONS = {
+    'get_bucket_info': 'GetBucketInfo',
+    'list_objects': 'ListObjects',
+    'batch_delete_objects': 'DeleteMultipleObjects',
+    'put_object': 'PutObject',
+    'get_object': 'GetObject',
+    'head_object': 'HeadObject',
+    'get_object_meta': 'GetObjectMeta',
+    'delete_object': 'DeleteObject',
+    'init_multipart_upload': 'InitiateMultipartUpload',
+    'upload_part': 'UploadPart',
+    'upload_part_copy': 'UploadPartCopy',
+    'list_parts': 'ListParts',
+    'complete_multipart_upload': 'CompleteMultipartUpload',
+    'abort_multipart_upload': 'AbortMultipartUpload'
+}
+
+
+def percentile(values, percent):
+    """Return the linear interpolated percentile of values."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+
+    return ordered[lower] + (
+        ordered[upper] - ordered[lower]
+    ) * (position - lower)
+
+
+def get_error_code(error):
+    """Return the API error code of an SDK exception or its class name."""
+    for attribute in ('error_code', 'code'):
+        code = getattr(error, attribute, None)
+        if isinstance(code, str) and code:
+            return code
+
+    return type(error).__name__
+
+
+def summarize_durations(durations):
+    """Return count, total and percentiles of durations in seconds."""
+    return {
+        'count': len(durations),
+        'total': round(sum(durations), 6),
+        'p50': round(percentile(durations, 50), 6),
+        'p95': round(percentile(durations, 95), 6),
+        'p99': round(percentile(durations, 99), 6),
+        'max': round(max(durations, default=0.0), 6)
+    }
+
+
+class MetricsRecorder(object):
+    """
+    Thread safe recorder of SDK calls and waiter sleeps.
+
+    Every record is a CallRecord with kind (ecs, oss or sleep), action
+    name, region, start time, duration in seconds, retries, outcome
+    (success or error) and error code. Hooks are called with each new
+    record. At most max_records are kept for the summary.
+    """
+
+    def __init__(self, max_records=100000):
+        """Initialize recorder."""
+        self.records = deque(maxlen=max_records)
+        self.hooks = []
+        self._lock = threading.Lock()
+        self.log = logging.getLogger('aliyun-img-utils')
+
+    def add_hook(self, hook):
+        """Call hook with every new CallRecord."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Stop calling hook with new records."""
+        self.hooks.remove(hook)
+
+    def record(
+        self,
+        kind,
+        action,
+        region,
+        start,
+        duration,
+        retries=0,
+        error=None
+    ):
+        """Add a record and call the hooks."""
+        record = CallRecord(
+            kind,
+            action,
+            region,
+            start,
+            duration,
+            retries,
+            'error' if error else 'success',
+            get_error_code(error) if error else None
+        )
+
+        with self._lock:
+            self.records.append(record)
+
+        for hook in list(self.hooks):
+            try:
+                hook(record)
+            except Exception as hook_error:
+                # Metrics must never break the instrumented call
+                self.log.warning(f'Metrics hook failed: {hook_error}')
+
+        return record
+
+    def summary(self):
+        """
+        Return the aggregated summary of the records.
+
+        SDK calls are summarized per action and per region with call,
+        error and retry counts and the p50, p95 and p99 durations.
+        Sleeps are summarized per waiter.
+        """
+        with self._lock:
+            records = list(self.records)
+
+        groups = {
+            'actions': defaultdict(list),
+            'regions': defaultdict(list),
+            'sleeps': defaultdict(list)
+        }
+
+        for record in records:
+            if record.kind == 'sleep':
+                groups['sleeps'][record.action].append(record)
+            else:
+                groups['actions'][record.action].append(record)
+                groups['regions'][record.region or 'global'].append(record)
+
+        summary = {}
+        for name, group in groups.items():
+            summary[name] = {}
+
+            for key, items in sorted(group.items()):
+                data = summarize_durations([item.duration for item in items])
+
+                if name != 'sleeps':
+                    data['errors'] = sum(
+                        1 for item in items if item.outcome == 'error'
+                    )
+                    data['retries'] = sum(item.retries for item in items)
+
+                summary[name][key] = data
+
+        return summary
+
+    def to_dict(self):
+        """Return the records and summary as a JSON serializable dict."""
+        with self._lock:
+            records = [record._asdict() for record in self.records]
+
+        return {'records': records, 'summary': self.summary()}
+
+    def write_json(self, path):
+        """Write the records and summary as JSON to path."""
+        with open(path, 'w') as metrics_file:
+            json.dump(self.to_dict(), metrics_file, indent=2)
+
+    def format_summary(self):
+        """Return the summary as a text table."""
+        summary = self.summary()
+        lines = []
+
+        for name, title in (('actions', 'Action'), ('regions', 'Region')):
+            lines.append(
+                f'{title:<30} {"Calls":>6} {"Errors":>6} {"Retries":>7} '
+                f'{"p50":>8} {"p95":>8} {"p99":>8} {"Total":>9}'
+            )
+
+            for key, data in summary[name].items():
+                lines.append(
+                    f'{key:<30} {data["count"]:>6} {data["errors"]:>6} '
+                    f'{data["retries"]:>7} {data["p50"]:>8.3f} '
+                    f'{data["p95"]:>8.3f} {data["p99"]:>8.3f} '
+                    f'{data["total"]:>9.3f}'
+                )
+
+            lines.append('')
+
+        if summary['sleeps']:
+            lines.append(f'{"Waiter":<30} {"Sleeps":>6} {"Total":>9}')
+
+            for key, data in summary['sleeps'].items():
+                lines.append(
+                    f'{key:<30} {data["count"]:>6} {data["total"]:>9.3f}'
+                )
+
+        return '\n'.join(lines).rstrip()
+
+
+class InstrumentedClient(object):
+    """
+    Proxy for an AcsClient recording every request.
+
+    Retries are the additional attempts made by the SDK retry policy.
+    """
+
+    def __init__(self, client, recorder, region=None):
+        """Initialize proxy for client in region."""
+        self.client = client
+        self.recorder = recorder
+        self.region = region
+        self._attempts = vars(client).get('_aliyun_attempts')
+
+        if self._attempts is not None:
+            # Client is shared and already counts attempts
+            return
+
+        self._attempts = threading.local()
+        single_request = getattr(client, '_handle_single_request', None)
+
+        if single_request:
+            attempts = self._attempts
+
+            # Count the attempts of the SDK retry loop
+            def handle_single_request(*args, **kwargs):
+                attempts.count += 1
+                return single_request(*args, **kwargs)
+
+            client._handle_single_request = handle_single_request
+            client._aliyun_attempts = attempts
+
+    def do_action_with_exception(self, request):
+        """Send the request and record the call."""
+        self._attempts.count = 0
+        error = None
+        start = time.time()
+        started = time.perf_counter()
+
+        try:
+            return self.client.do_action_with_exception(request)
+        except Exception as exception:
+            error = exception
+            raise
+        finally:
+            self.recorder.record(
+                'ecs',
+                request.get_action_name(),
+                self.region,
+                start,
+                time.perf_counter() - started,
+                retries=max(getattr(self._attempts, 'count', 0) - 1, 0),
+                error=error
+            )
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+class InstrumentedBucket(object):
+    """Proxy for an oss2 Bucket recording every OSS request."""
+
+    def __init__(self, bucket, recorder, region=None):
+        """Initialize proxy for bucket in region."""
+        self.bucket = bucket
+        self.recorder = recorder
+        self.region = region
+
+    def __getattr__(self, name):
+        attribute = getattr(self.bucket, name)
+
+        if name not in OSS_ACTIONS:
+            return attribute
+
+        def call(*args, **kwargs):
+            error = None
+            start = time.time()
+            started = time.perf_counter()
+
+            try:
+                return attribute(*args, **kwargs)
+            except Exception as exception:
+                error = exception
+                raise
+            finally:
+                self.recorder.record(
+                    'oss',
+                    OSS_ACTIONS[name],
+                    self.region,
+                    start,
+                    time.perf_counter() - started,
+                    error=error
+                )
+
+        return call
+
+
+def get_default_recorder():
+    """Return the recorder of the current context or None."""
+    return default_recorder.get()
+
+
+def set_default_recorder(recorder):
+    """
+    Set the recorder shared by new images in the current context.
+
+    Every daemon job runs in its own context so concurrent jobs
+    record to their own recorder.
+    """
+    default_recorder.set(recorder)
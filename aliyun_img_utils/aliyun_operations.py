@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image operations module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import sys
+import threading
+
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError
+
+from aliyun_img_utils.aliyun_clock import system_clock
+from aliyun_img_utils.aliyun_exceptions import AliyunImageException
+
+module = sys.modules[__name__]
+
+operation_poller = None
+operation_poller_lock = threading.Lock()
+log = logging.getLogger('aliyun-img-utils')
+
+
+def get_image_progress(image):
+    """Return the DescribeImages progress of the image as an int (0-100)."""
+    try:
+        return int(str(image.get('Progress') or 0).rstrip('%'))
+    except ValueError:
+        return 0
+
+
+class ProgressEstimator(object):
+    """
+    Estimate the completion time of an image from its progress.
+
+    The rate is measured from the first poll up to now, so while the
+    progress stalls the estimate grows and polls back off. The next
+    poll interval is a fraction of the estimated time remaining, so
+    polls are rare early on and frequent near completion. Until a rate
+    is known the default interval is used.
+    """
+
+    def __init__(
+        self,
+        min_interval=5,
+        max_interval=60,
+        default_interval=30,
+        fraction=0.5
+    ):
+        """Initialize estimator with poll intervals in seconds."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.fraction = fraction
+        self.samples = []
+
+    @property
+    def progress(self):
+        """Return the latest progress."""
+        return self.samples[-1][1] if self.samples else 0
+
+    def update(self, now, progress):
+        """Record the progress polled at time now."""
+        if not self.samples or progress != self.samples[-1][1]:
+            self.samples.append((now, progress))
+
+    def eta(self, now):
+        """Return the estimated seconds remaining or None if unknown."""
+        if len(self.samples) < 2:
+            return None
+
+        first_time, first_progress = self.samples[0]
+        last_time, last_progress = self.samples[-1]
+        now = max(now, last_time)
+
+        if last_progress <= first_progress or last_time <= first_time:
+            return None
+
+        # Rate up to now so stalled progress slows the estimate down
+        rate = (last_progress - first_progress) / (now - first_time)
+
+        return (100 - last_progress) / rate
+
+    def next_interval(self, now):
+        """Return the seconds to sleep before the next poll."""
+        eta = self.eta(now)
+
+        if eta is None:
+            return self.default_interval
+
+        return min(
+            self.max_interval,
+            max(self.min_interval, eta * self.fraction)
+        )
+
+
+class ImageOperation(object):
+    """
+    Handle for an image import or copy that is still in progress.
+
+    The operation is completed by an ImageOperationPoller once the
+    image becomes available, fails or the timeout expires.
+    """
+
+    def __init__(self, image, image_id, region, timeout=3600):
+        """Initialize operation for image id in region."""
+        self.image = image
+        self.image_id = image_id
+        self.region = region
+        self.deadline = image.clock.time() + timeout
+        self.timeout = timeout
+        self._status = 'Waiting'
+        self._progress = 0
+        self._future = Future()
+
+    def __repr__(self):
+        return (
+            f'ImageOperation(image_id={self.image_id!r}, '
+            f'region={self.region!r}, status={self._status!r})'
+        )
+
+    def status(self):
+        """Return the last polled image status."""
+        return self._status
+
+    def progress(self):
+        """Return the last polled image progress (0-100)."""
+        return self._progress
+
+    def done(self):
+        """Return True if the operation has finished."""
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """
+        Return the image id once the image is available.
+
+        Raise exception if the operation failed or the result is
+        not available within timeout seconds.
+        """
+        try:
+            return self._future.result(timeout)
+        except TimeoutError:
+            raise AliyunImageException(
+                f'Image {self.image_id} not available within '
+                f'{timeout} seconds.'
+            )
+
+    def exception(self, timeout=None):
+        """Return the exception of a failed operation or None."""
+        try:
+            return self._future.exception(timeout)
+        except TimeoutError:
+            raise AliyunImageException(
+                f'Image {self.image_id} not finished within '
+                f'{timeout} seconds.'
+            )
+
+    def add_done_callback(self, callback):
+        """
+        Call callback with the operation once it has finished.
+
+        If the operation has already finished the callback is
+        called immediately.
+        """
+        self._future.add_done_callback(lambda future: callback(self))
+
+    def _update(self, image_data):
+        """Update the operation with the polled image data."""
+        self._status = image_data.get('Status', self._status)
+        self._progress = get_image_progress(image_data) or self._progress
+
+        try:
+            available = self.image.is_image_available(image_data)
+        except AliyunImageException as error:
+            self._future.set_exception(error)
+            return
+
+        if available:
+            self._future.set_result(self.image_id)
+        elif self.image.clock.time() >= self.deadline:
+            self._future.set_exception(
+                AliyunImageException(
+                    f'Image not available within {self.timeout} seconds.'
+                )
+            )
+
+
+class ImageOperationPoller(object):
+    """
+    Background poller shared by image operations.
+
+    All pending operations in a region are polled together with one
+    DescribeImages request per 100 image ids. The polling thread is
+    started when an operation is added and exits once no operations
+    are pending. It sleeps between polls on the clock, so with a
+    VirtualClock simulated operations finish without real waits.
+    """
+
+    def __init__(self, interval=30, clock=None):
+        """Initialize poller with the interval in seconds between polls."""
+        self.interval = interval
+        self.clock = clock or system_clock
+        self._operations = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, operation):
+        """Add the operation and start the polling thread if required."""
+        with self._lock:
+            self._operations.append(operation)
+
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='aliyun-image-operation-poller',
+                    daemon=True
+                )
+                self._thread.start()
+
+    def pending(self):
+        """Return a list of the pending operations."""
+        with self._lock:
+            return list(self._operations)
+
+    def poll(self):
+        """Poll all pending operations once."""
+        groups = defaultdict(list)
+        for operation in self.pending():
+            groups[(id(operation.image), operation.region)].append(operation)
+
+        for operations in groups.values():
+            image = operations[0].image
+            region = operations[0].region
+            image_ids = [operation.image_id for operation in operations]
+
+            try:
+                images = {}
+                for index in range(0, len(image_ids), 100):
+                    for data in image.get_compute_images(
+                        region,
+                        image_ids=image_ids[index:index + 100]
+                    ):
+                        images[data['ImageId']] = data
+            except Exception as error:
+                log.warning(f'Failed to poll images in {region}: {error}')
+                images = {}
+
+            for operation in operations:
+                # Images that are not visible yet are still waiting
+                operation._update(
+                    images.get(operation.image_id, {'Status': 'Waiting'})
+                )
+
+        with self._lock:
+            self._operations = [
+                operation for operation in self._operations
+                if not operation.done()
+            ]
+
+    def _run(self):
+        """Poll until there are no pending operations."""
+        while True:
+            self.poll()
+
+            with self._lock:
+                if not self._operations:
+                    self._thread = None
+                    return
+
+            self.clock.sleep(self.interval)
+
+
+def get_operation_poller():
+    """Return the module level operation poller shared by all images."""
+    with operation_poller_lock:
+        if not module.operation_poller:
+            module.operation_poller = ImageOperationPoller()
+
+        return module.operation_poller
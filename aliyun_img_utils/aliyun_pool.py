@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils client pool module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import threading
+
+module = sys.modules[__name__]
+default_pool = None
+
+
+class ClientPool(object):
+    """
+    Thread safe cache of SDK clients shared by AliyunImage instances.
+
+    Clients are keyed by kind, credentials, region or bucket and
+    endpoint. A long running process (aliyun-img-utils serve) keeps the
+    clients and their connections warm between commands instead of
+    creating and validating new clients for every image instance.
+    """
+
+    def __init__(self):
+        """Initialize empty pool."""
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, factory):
+        """
+        Return the pooled client for key.
+
+        The factory is called without the lock held to create the
+        client on a miss. If it raises nothing is pooled.
+        """
+        with self._lock:
+            if key in self._clients:
+                self.hits += 1
+                return self._clients[key]
+
+        client = factory()
+
+        with self._lock:
+            self.misses += 1
+            return self._clients.setdefault(key, client)
+
+    def clear(self):
+        """Remove all pooled clients."""
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self):
+        """Return a dictionary of client count, hits and misses."""
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def get_client_pool():
+    """Return the module level client pool or None."""
+    return module.default_pool
+
+
+def set_client_pool(pool):
+    """Set the module level client pool used by new images."""
+    module.default_pool = pool
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils command profiling module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import sys
+import threading
+
+from aliyun_img_utils.aliyun_lazy import LazyModule
+
+# Profilers are only imported when profiling is requested
+cProfile = LazyModule('cProfile')
+pstats = LazyModule('pstats')
+tracemalloc = LazyModule('tracemalloc')
+
+
+class CommandProfiler(object):
+    """
+    CPU and memory profiler for a CLI command.
+
+    The CPU profile is recorded with cProfile in the thread which
+    starts the profiler and in every thread started while profiling,
+    for example the workers of the region and blob thread pools. The
+    profiles of all threads are merged and written as a pstats file
+    which can be loaded with pstats or snakeviz. Memory allocations of
+    all threads are traced with tracemalloc and the top allocations by
+    line are written as a text report. Stop returns a short summary of
+    the top hot spots of both.
+    """
+
+    def __init__(self, cpu_file=None, mem_file=None, top=10, frames=10):
+        """Initialize profiler for the requested report files."""
+        self.cpu_file = cpu_file
+        self.mem_file = mem_file
+        self.top = top
+        self.frames = frames
+        self._profile = None
+        self._stats = None
+        self._thread_profiles = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the requested profilers."""
+        if self.mem_file:
+            tracemalloc.start(self.frames)
+
+        if self.cpu_file:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            threading.setprofile(self._start_thread_profile)
+
+    def _start_thread_profile(self, frame, event, arg):
+        """Profile a new thread, called on its first profile event."""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+
+        try:
+            profile.enable()
+        except ValueError:
+            return  # Only one profiler may be active (Python 3.12+)
+
+        with self._lock:
+            self._thread_profiles.append(profile)
+
+    def stop(self):
+        """Stop profiling, write the reports and return the summary."""
+        summary = []
+
+        if self._profile:
+            threading.setprofile(None)
+            self._profile.disable()
+
+            with self._lock:
+                profiles = [self._profile] + self._thread_profiles
+                self._thread_profiles = []
+
+            self._stats = pstats.Stats(*profiles)
+            self._stats.dump_stats(self.cpu_file)
+            summary.append(self.get_cpu_summary())
+            self._profile = None
+
+        if self.mem_file and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            report = get_memory_report(snapshot, peak, self.top * 5)
+            with open(self.mem_file, 'w') as mem_file:
+                mem_file.write(report)
+
+            summary.append(
+                f'Memory report written to {self.mem_file}\n' +
+                get_memory_report(snapshot, peak, self.top)
+            )
+
+        return '\n\n'.join(summary)
+
+    def get_cpu_summary(self):
+        """Return the top functions by own time of the CPU profile."""
+        stream = io.StringIO()
+        self._stats.stream = stream
+        self._stats.sort_stats('tottime').print_stats(self.top)
+
+        # Skip the header lines printed before the totals
+        lines = stream.getvalue().strip().splitlines()
+        start = next(
+            (index for index, line in enumerate(lines)
+             if 'function calls' in line),
+            0
+        )
+        return (
+            f'CPU profile written to {self.cpu_file}\n' +
+            '\n'.join(line.rstrip() for line in lines[start:])
+        )
+
+
+def get_memory_report(snapshot, peak, top):
+    """Return the top allocations by line of a tracemalloc snapshot."""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+    ])
+    statistics = snapshot.statistics('lineno')
+    total = sum(stat.size for stat in statistics)
+
+    lines = [
+        f'Peak traced memory: {peak / 1024 / 1024:.1f} MiB, '
+        f'allocated at exit: {total / 1024 / 1024:.1f} MiB',
+        f'Top {top} allocations by line:'
+    ]
+
+    for stat in statistics[:top]:
+        frame = stat.traceback[0]
+        lines.append(
+            f'{stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  '
+            f'{frame.filename}:{frame.lineno}'
+        )
+
+    return '\n'.join(lines)
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image replication strategies module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import heapq
+
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_lazy import LazyModule
+
+yaml = LazyModule('yaml')
+
+REPLICATION_STRATEGIES = ('source', 'tree')
+
+
+def get_region_group(region):
+    """
+    Return the geographic group of the region id.
+
+    For example cn-beijing is in group cn and eu-central-1 in group eu.
+    """
+    return region.split('-', maxsplit=1)[0]
+
+
+class RegionTopology(object):
+    """
+    Estimated copy time in seconds between regions.
+
+    The estimate is taken from (in order) the measured copy times,
+    the explicit costs or the region groups. Copies within a group
+    take same_group seconds and copies across groups cross_group.
+    """
+
+    def __init__(
+        self,
+        groups=None,
+        costs=None,
+        same_group=600,
+        cross_group=3600
+    ):
+        """Initialize topology with optional group and cost overrides."""
+        self.groups = groups or {}
+        self.costs = costs or {}
+        self.same_group = same_group
+        self.cross_group = cross_group
+        self.measured = {}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Return a topology from a configuration dictionary.
+
+        The dictionary has optional groups (region to group name),
+        costs (source region to destination region to seconds),
+        same_group and cross_group keys.
+        """
+        return cls(
+            groups=data.get('groups'),
+            costs=data.get('costs'),
+            same_group=data.get('same_group', 600),
+            cross_group=data.get('cross_group', 3600)
+        )
+
+    def get_group(self, region):
+        """Return the configured or derived group of the region."""
+        return self.groups.get(region) or get_region_group(region)
+
+    def cost(self, source, destination):
+        """Return the estimated seconds to copy source to destination."""
+        if (source, destination) in self.measured:
+            return self.measured[(source, destination)]
+
+        try:
+            return self.costs[source][destination]
+        except KeyError:
+            pass
+
+        if self.get_group(source) == self.get_group(destination):
+            return self.same_group
+
+        return self.cross_group
+
+    def record(self, source, destination, seconds):
+        """Record a measured copy time in seconds."""
+        previous = self.measured.get((source, destination))
+
+        if previous is None:
+            self.measured[(source, destination)] = seconds
+        else:
+            # Smooth repeated measurements
+            self.measured[(source, destination)] = (previous + seconds) / 2
+
+
+def load_region_topology(path):
+    """
+    Return a RegionTopology from a YAML (or JSON) file.
+
+    See RegionTopology.from_dict for the expected keys.
+    """
+    try:
+        with open(path) as topology_file:
+            data = yaml.safe_load(topology_file) or {}
+    except Exception as error:
+        raise AliyunException(
+            f'Unable to load region topology {path}: {error}'
+        )
+
+    return RegionTopology.from_dict(data)
+
+
+class ReplicationPlanner(object):
+    """
+    Choose the source region for each copy in a replication.
+
+    With the source strategy every copy comes from the source region.
+    With the tree strategy a copy may come from any region that already
+    has an available copy. A copy is only started if no region still
+    being copied to is strictly closer to the destination, otherwise it
+    waits so the rollout fans out like a tree.
+    """
+
+    def __init__(self, strategy='tree', topology=None):
+        """Initialize planner with strategy and topology."""
+        if strategy not in REPLICATION_STRATEGIES:
+            raise AliyunException(
+                f'Unknown replication strategy: {strategy}. Expected one '
+                f'of {", ".join(REPLICATION_STRATEGIES)}.'
+            )
+
+        self.strategy = strategy
+        self.topology = topology or RegionTopology()
+
+    def next_copies(self, ready, running, pending, free_slots):
+        """
+        Return a list of (source, destination) copies to start now.
+
+        Ready is the ordered list of regions with an available image
+        (the first is the original source), running the regions being
+        copied to and pending the regions still to copy to.
+        """
+        copies = []
+        pending = list(pending)
+        running = list(running)
+
+        while pending and len(copies) < free_slots:
+            best = None
+
+            for destination in pending:
+                if self.strategy == 'source':
+                    sources = ready[:1]
+                else:
+                    sources = ready
+
+                source = min(
+                    sources,
+                    key=lambda region: self.topology.cost(region, destination)
+                )
+                cost = self.topology.cost(source, destination)
+
+                if self.strategy == 'tree' and any(
+                    self.topology.cost(region, destination) < cost
+                    for region in running
+                ):
+                    continue
+
+                if best is None or cost < best[2]:
+                    best = (source, destination, cost)
+
+            if best is None:
+                break
+
+            copies.append(best[:2])
+            pending.remove(best[1])
+            running.append(best[1])
+
+        return copies
+
+
+def simulate_replication(
+    source,
+    regions,
+    strategy='tree',
+    topology=None,
+    copy_time=None,
+    max_concurrency=10
+):
+    """
+    Simulate a replication against a copy latency model.
+
+    The copy time function returns the seconds a copy from source
+    region to destination region takes. By default the topology
+    estimates are used as the latency model. Returns a dictionary
+    with the total time and the list of simulated copies.
+    """
+    planner = ReplicationPlanner(strategy, topology)
+    copy_time = copy_time or planner.topology.cost
+    ready = [source]
+    pending = [region for region in regions if region != source]
+    running = {}
+    events = []
+    copies = []
+    now = 0.0
+
+    while pending or running:
+        for copy_source, destination in planner.next_copies(
+            ready,
+            running,
+            pending,
+            max_concurrency - len(running)
+        ):
+            pending.remove(destination)
+            duration = copy_time(copy_source, destination)
+            running[destination] = (copy_source, now)
+            heapq.heappush(events, (now + duration, destination))
+
+        now, destination = heapq.heappop(events)
+        copy_source, start = running.pop(destination)
+        ready.append(destination)
+        copies.append({
+            'source': copy_source,
+            'destination': destination,
+            'start': start,
+            'end': now
+        })
+
+    return {
+        'strategy': strategy,
+        'total_time': now,
+        'copies': copies
+    }
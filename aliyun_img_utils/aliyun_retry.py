@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils storage request retry module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import time
+
+from aliyun_img_utils.aliyun_exceptions import AliyunTransferException
+from aliyun_img_utils.aliyun_lazy import LazyModule
+
+asyncio = LazyModule('asyncio')
+oss2 = LazyModule('oss2')
+
+# Initial and maximum delay in seconds between attempts
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 20
+
+
+def is_retryable_error(error):
+    """
+    Return True if the storage request may succeed when retried.
+
+    Connection failures and server side (5xx) errors are transient.
+    Client errors such as AccessDenied or NoSuchUpload are not.
+    """
+    if isinstance(error, oss2.exceptions.RequestError):
+        return True
+
+    if isinstance(error, oss2.exceptions.OssError):
+        return error.status >= 500
+
+    if isinstance(error, AliyunTransferException):
+        return error.status is None or error.status >= 500
+
+    return False
+
+
+def get_backoff(retries, backoff=DEFAULT_BACKOFF):
+    """Return the jittered exponential delay before the next attempt."""
+    delay = min(MAX_BACKOFF, backoff * 2 ** retries)
+    return random.uniform(delay / 2, delay)
+
+
+def retry_call(func, *args, max_retries=2, backoff=DEFAULT_BACKOFF):
+    """
+    Call func with args, retry retryable errors up to max_retries times.
+
+    Returns the result and the number of retries.
+    """
+    retries = 0
+
+    while True:
+        try:
+            return func(*args), retries
+        except Exception as error:
+            if retries >= max_retries or not is_retryable_error(error):
+                raise
+
+        time.sleep(get_backoff(retries, backoff))
+        retries += 1
+
+
+async def retry_call_async(
+    func,
+    *args,
+    max_retries=2,
+    backoff=DEFAULT_BACKOFF
+):
+    """Await func with args, retry like retry_call."""
+    retries = 0
+
+    while True:
+        try:
+            return await func(*args), retries
+        except Exception as error:
+            if retries >= max_retries or not is_retryable_error(error):
+                raise
+
+        await asyncio.sleep(get_backoff(retries, backoff))
+        retries += 1
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image job scheduler module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextvars
+import itertools
+import threading
+
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+
+
+class ImageJob(object):
+    """
+    A queued image job.
+
+    The job runs in a copy of the context it was submitted from so
+    context variables such as the current tracing span are kept.
+    """
+
+    def __init__(self, func, region, group, priority, sequence):
+        self.func = func
+        self.context = contextvars.copy_context()
+        self.region = region
+        self.group = group
+        self.priority = priority
+        self.sequence = sequence
+        self.future = Future()
+
+
+class ImageJobScheduler(object):
+    """
+    Quota aware scheduler for concurrent image import and copy jobs.
+
+    A job holds a slot in its region and in the account for as long
+    as it runs, so a job should only return once the image is
+    available (for example copy_compute_image with wait=True).
+
+    Queued jobs are dispatched as soon as both the region and the
+    account have a free slot. Higher priority jobs go first. Jobs with
+    the same priority are shared fairly between groups (images) by
+    dispatching the group with the fewest running jobs, then in
+    submission order.
+    """
+
+    def __init__(
+        self,
+        max_per_region=3,
+        max_per_account=10,
+        region_limits=None
+    ):
+        """
+        Initialize scheduler with concurrency caps.
+
+        The region limits dictionary overrides max_per_region
+        for specific regions.
+        """
+        self.max_per_region = max_per_region
+        self.max_per_account = max_per_account
+        self.region_limits = region_limits or {}
+        self._pending = []
+        self._running_regions = defaultdict(int)
+        self._running_groups = defaultdict(int)
+        self._running = 0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_per_account,
+            thread_name_prefix='aliyun-image-job'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, region, func, *args, group=None, priority=0, **kwargs):
+        """
+        Queue func(*args, **kwargs) as a job in region.
+
+        Returns a future for the job result.
+        """
+        job = ImageJob(
+            partial(func, *args, **kwargs),
+            region,
+            group,
+            priority,
+            next(self._sequence)
+        )
+
+        with self._lock:
+            if self._shutdown:
+                raise AliyunException(
+                    'Unable to submit job: scheduler is shut down.'
+                )
+
+            self._pending.append(job)
+            self._dispatch()
+
+        return job.future
+
+    def get_region_limit(self, region):
+        """Return the concurrency cap for region."""
+        return self.region_limits.get(region, self.max_per_region)
+
+    def stats(self):
+        """Return a dictionary of pending and running job counts."""
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'running': self._running,
+                'regions': {
+                    region: count
+                    for region, count in self._running_regions.items()
+                    if count
+                }
+            }
+
+    def _dispatch(self):
+        """
+        Start queued jobs while slots are free.
+
+        Must be called with the lock held.
+        """
+        while self._pending and self._running < self.max_per_account:
+            eligible = [
+                job for job in self._pending
+                if self._running_regions[job.region] <
+                self.get_region_limit(job.region)
+            ]
+
+            if not eligible:
+                return
+
+            job = min(
+                eligible,
+                key=lambda job: (
+                    -job.priority,
+                    self._running_groups[job.group],
+                    job.sequence
+                )
+            )
+            self._pending.remove(job)
+            self._running += 1
+            self._running_regions[job.region] += 1
+            self._running_groups[job.group] += 1
+            self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        """Run the job and dispatch queued jobs once it finishes."""
+        if job.future.set_running_or_notify_cancel():
+            try:
+                result = job.context.run(job.func)
+            except BaseException as error:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+        with self._lock:
+            self._running -= 1
+            self._running_regions[job.region] -= 1
+            self._running_groups[job.group] -= 1
+            self._dispatch()
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting jobs.
+
+        If wait is True block until all queued and running
+        jobs have finished.
+        """
+        with self._lock:
+            self._shutdown = True
+            futures = [job.future for job in self._pending]
+
+        if wait:
+            for future in futures:
+                try:
+                    future.exception()
+                except Exception:
+                    pass
+
+        self._executor.shutdown(wait=wait)
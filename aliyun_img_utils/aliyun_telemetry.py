@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils OSS transfer telemetry module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import threading
+import time
+
+from collections import namedtuple
+
+from aliyun_img_utils.aliyun_metrics import summarize_durations
+
+MB = 1024 * 1024
+
+# Upper bounds of the histogram buckets, the last bucket is unbounded
+THROUGHPUT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)  # MB/s
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)  # seconds
+RETRY_BUCKETS = (0, 1, 2, 5)  # retries per part
+
+PartRecord = namedtuple(
+    'PartRecord',
+    [
+        'part_number',
+        'offset',
+        'size',
+        'start',
+        'end',
+        'read_seconds',
+        'retries',
+        'endpoint'
+    ]
+)
+
+TransferProgress = namedtuple(
+    'TransferProgress',
+    [
+        'bytes_done',
+        'total_size',
+        'parts_done',
+        'elapsed',
+        'throughput',
+        'eta'
+    ]
+)
+
+
+def get_histogram(values, buckets):
+    """Return the count of values per bucket upper bound."""
+    counts = [0] * (len(buckets) + 1)
+
+    for value in values:
+        index = 0
+        while index < len(buckets) and value > buckets[index]:
+            index += 1
+        counts[index] += 1
+
+    bounds = [str(bucket) for bucket in buckets] + ['inf']
+    return [
+        {'le': bound, 'count': count}
+        for bound, count in zip(bounds, counts)
+    ]
+
+
+class TransferTelemetry(object):
+    """
+    Per part telemetry of a multipart transfer.
+
+    The transfer engines record every part with start and end time of
+    the part upload, bytes, the time spent reading the part from disk,
+    retries and the endpoint. Listeners are called with a
+    TransferProgress after every part with the moving throughput
+    (bytes/s over the last window seconds) and the ETA in seconds.
+
+    Comparing the read throughput with the part throughput shows if a
+    slow transfer is bound by the local disk or the network path to
+    the endpoint.
+    """
+
+    def __init__(self, window=10):
+        """Initialize telemetry with a throughput window in seconds."""
+        self.window = window
+        self.parts = []
+        self.listeners = []
+        self.total_size = 0
+        self.endpoint = None
+        self.start_time = None
+        self.end_time = None
+        self._lock = threading.Lock()
+        self.log = logging.getLogger('aliyun-img-utils')
+
+    def add_listener(self, listener):
+        """Call listener with a TransferProgress after every part."""
+        self.listeners.append(listener)
+
+    def start(self, total_size, endpoint=None):
+        """Start a transfer of total_size bytes to endpoint."""
+        with self._lock:
+            self.parts = []
+            self.total_size = total_size
+            self.endpoint = endpoint
+            self.start_time = time.time()
+            self.end_time = None
+
+        self._notify()
+
+    def record_part(
+        self,
+        part_number,
+        offset,
+        size,
+        start,
+        end,
+        read_seconds=0.0,
+        retries=0
+    ):
+        """Record a transferred part and notify the listeners."""
+        part = PartRecord(
+            part_number,
+            offset,
+            size,
+            start,
+            end,
+            read_seconds,
+            retries,
+            self.endpoint
+        )
+
+        with self._lock:
+            self.parts.append(part)
+
+        self._notify()
+        return part
+
+    def finish(self):
+        """Mark the transfer as finished."""
+        self.end_time = time.time()
+        self._notify()
+
+    def progress(self):
+        """Return the current TransferProgress."""
+        now = self.end_time or time.time()
+
+        with self._lock:
+            parts = list(self.parts)
+
+        bytes_done = sum(part.size for part in parts)
+        elapsed = now - self.start_time if self.start_time else 0.0
+
+        # Moving throughput of the parts finished in the window
+        window_start = max(now - self.window, self.start_time or now)
+        recent = sum(part.size for part in parts if part.end >= window_start)
+        span = now - window_start
+        throughput = recent / span if span > 0 else 0.0
+
+        remaining = self.total_size - bytes_done
+        if remaining <= 0:
+            eta = 0.0
+        elif throughput:
+            eta = remaining / throughput
+        else:
+            eta = None
+
+        return TransferProgress(
+            bytes_done,
+            self.total_size,
+            len(parts),
+            elapsed,
+            throughput,
+            eta
+        )
+
+    def _notify(self):
+        """Call the listeners with the current progress."""
+        if not self.listeners:
+            return
+
+        progress = self.progress()
+
+        for listener in list(self.listeners):
+            try:
+                listener(progress)
+            except Exception as error:
+                # Telemetry must never break the transfer
+                self.log.warning(f'Transfer listener failed: {error}')
+
+    def summary(self):
+        """
+        Return the aggregated summary of the transfer.
+
+        Includes the overall and disk read throughput in MB/s, the
+        p50/p95/p99 of part duration and throughput and histograms of
+        both and of the retries per part.
+        """
+        with self._lock:
+            parts = sorted(self.parts, key=lambda part: part.part_number)
+
+        durations = [part.end - part.start for part in parts]
+        throughputs = [
+            part.size / MB / duration if duration > 0 else 0.0
+            for part, duration in zip(parts, durations)
+        ]
+        transferred = sum(part.size for part in parts)
+        read_seconds = sum(part.read_seconds for part in parts)
+
+        end_time = self.end_time or time.time()
+        elapsed = end_time - self.start_time if self.start_time else 0.0
+        part_throughput = summarize_durations(throughputs)
+        del part_throughput['total']
+
+        return {
+            'endpoint': self.endpoint,
+            'total_size': self.total_size,
+            'bytes': transferred,
+            'parts': len(parts),
+            'retries': sum(part.retries for part in parts),
+            'seconds': round(elapsed, 6),
+            'throughput': round(
+                transferred / MB / elapsed if elapsed > 0 else 0.0,
+                3
+            ),
+            'read_seconds': round(read_seconds, 6),
+            'read_throughput': round(
+                transferred / MB / read_seconds if read_seconds > 0
+                else 0.0,
+                3
+            ),
+            'part_seconds': summarize_durations(durations),
+            'part_throughput': part_throughput,
+            'histograms': {
+                'part_seconds': get_histogram(durations, LATENCY_BUCKETS),
+                'part_throughput': get_histogram(
+                    throughputs,
+                    THROUGHPUT_BUCKETS
+                ),
+                'part_retries': get_histogram(
+                    [part.retries for part in parts],
+                    RETRY_BUCKETS
+                )
+            }
+        }
+
+    def to_dict(self):
+        """Return the parts and summary as a JSON serializable dict."""
+        with self._lock:
+            parts = [part._asdict() for part in self.parts]
+
+        return {'parts': parts, 'summary': self.summary()}
+
+    def write_json(self, path):
+        """Write the parts and summary as JSON to path."""
+        with open(path, 'w') as telemetry_file:
+            json.dump(self.to_dict(), telemetry_file, indent=2)
+
+    def format_summary(self):
+        """Return the summary with text histograms."""
+        summary = self.summary()
+        lines = [
+            f'Endpoint: {summary["endpoint"]}',
+            f'Transferred: {summary["bytes"] / MB:.1f} MB in '
+            f'{summary["parts"]} parts ({summary["retries"]} retries) '
+            f'in {summary["seconds"]:.1f}s',
+            f'Throughput: {summary["throughput"]:.1f} MB/s, disk read: '
+            f'{summary["read_throughput"]:.1f} MB/s',
+            f'Part seconds: p50 {summary["part_seconds"]["p50"]:.3f} '
+            f'p95 {summary["part_seconds"]["p95"]:.3f} '
+            f'p99 {summary["part_seconds"]["p99"]:.3f}'
+        ]
+
+        for name, title in (
+            ('part_throughput', 'Part MB/s'),
+            ('part_seconds', 'Part seconds'),
+            ('part_retries', 'Part retries')
+        ):
+            histogram = summary['histograms'][name]
+            largest = max(bucket['count'] for bucket in histogram) or 1
+            lines.append('')
+            lines.append(f'{title:<14} {"Parts":>6}')
+
+            for bucket in histogram:
+                bar = '#' * round(bucket['count'] * 40 / largest)
+                lines.append(
+                    f'<= {bucket["le"]:<11} {bucket["count"]:>6} {bar}'
+                )
+
+        return '\n'.join(lines)
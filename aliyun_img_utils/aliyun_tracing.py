@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils tracing module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+# Tracer shared by new images in the current context
+default_tracer = contextvars.ContextVar(
+    'aliyun_img_utils_tracer',
+    default=None
+)
+
+# Id of the innermost open span in the current thread or task
+current_span = contextvars.ContextVar('aliyun_img_utils_span', default=None)
+
+
+class Tracer(object):
+    """
+    Thread safe recorder of nested timing spans.
+
+    Spans are exported in the Chrome trace event format which can be
+    loaded in chrome://tracing or https://ui.perfetto.dev. Each span
+    records the id of its parent span from the current context so the
+    nesting is kept across threads started with
+    ContextThreadPoolExecutor.
+    """
+
+    def __init__(self):
+        """Initialize tracer."""
+        self.events = []
+        self.pid = os.getpid()
+        self.start = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category='aliyun', **args):
+        """Record the time spent in the with block as a span."""
+        parent_id = current_span.get()
+        span_id = next(self._ids)
+        token = current_span.set(span_id)
+        start = time.perf_counter()
+        error = None
+
+        try:
+            yield span_id
+        except BaseException as exception:
+            error = exception
+            raise
+        finally:
+            end = time.perf_counter()
+            current_span.reset(token)
+
+            args = dict(args, span_id=span_id, parent_id=parent_id)
+            if error:
+                args['error'] = type(error).__name__
+
+            thread = threading.current_thread()
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - self.start) * 1000000, 3),
+                'dur': round((end - start) * 1000000, 3),
+                'pid': self.pid,
+                'tid': thread.ident,
+                'args': args
+            }
+
+            with self._lock:
+                self.events.append(event)
+                self._threads[thread.ident] = thread.name
+
+    def to_dict(self):
+        """Return the spans as a Chrome trace dict."""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+
+        metadata = [
+            {
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': self.pid,
+                'tid': tid,
+                'args': {'name': name}
+            } for tid, name in threads.items()
+        ]
+
+        return {
+            'traceEvents': metadata + sorted(
+                events,
+                key=lambda event: event['ts']
+            ),
+            'displayTimeUnit': 'ms'
+        }
+
+    def write_json(self, path):
+        """Write the spans as a Chrome trace JSON file to path."""
+        with open(path, 'w') as trace_file:
+            json.dump(self.to_dict(), trace_file)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool which runs submitted calls in the caller context."""
+
+    def submit(self, fn, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
+
+
+def trace_span(tracer, name, category='aliyun', **args):
+    """Return a span of tracer or a no-op context if tracer is None."""
+    if tracer:
+        return tracer.span(name, category, **args)
+
+    return nullcontext()
+
+
+def get_span_args(signature, args, kwargs):
+    """Return the arguments of simple types for the span args."""
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        return {}
+
+    return {
+        name: value for name, value in bound.arguments.items()
+        if name != 'self' and isinstance(value, (str, int, float, bool))
+    }
+
+
+def traced(method):
+    """Record a span for every call of method when a tracer is set."""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        tracer = getattr(self, 'tracer', None)
+
+        if not tracer:
+            return method(self, *args, **kwargs)
+
+        with tracer.span(
+            f'{type(self).__name__}.{method.__name__}',
+            'method',
+            **get_span_args(signature, (self,) + args, kwargs)
+        ):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def trace_methods(cls):
+    """
+    Class decorator which traces all public methods of the class.
+
+    Generator methods are left untraced, a span around the call would
+    end before the caller iterates over the results.
+    """
+    for name, value in list(vars(cls).items()):
+        if not name.startswith('_') and inspect.isfunction(value) and \
+                not inspect.isgeneratorfunction(value):
+            setattr(cls, name, traced(value))
+
+    return cls
+
+
+def get_default_tracer():
+    """Return the tracer of the current context or None."""
+    return default_tracer.get()
+
+
+def set_default_tracer(tracer):
+    """Set the tracer shared by new images in the current context."""
+    default_tracer.set(tracer)
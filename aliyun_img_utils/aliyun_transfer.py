@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+
+"""Aliyun image utils asyncio storage transfer module."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import time
+
+from urllib.parse import quote
+from xml.etree import ElementTree
+
+from aliyun_img_utils.aliyun_exceptions import (
+    AliyunException,
+    AliyunTransferException
+)
+from aliyun_img_utils.aliyun_lazy import LazyModule
+from aliyun_img_utils.aliyun_retry import retry_call_async
+
+oss2 = LazyModule('oss2')
+
+# Seconds a presigned request url is valid, requests are sent right away
+SIGN_EXPIRES = 900
+
+
+class AsyncTransferEngine(object):
+    """
+    Asyncio OSS transfer engine for multipart uploads and ranged downloads.
+
+    Requests are presigned with the public oss2 Bucket.sign_url for the
+    provided oss2 auth (V1 Auth or V4 AuthV4) and sent with an aiohttp
+    client session. Part transfers run
+    as coroutines with at most max_concurrency parts in flight, so
+    memory use is bounded by max_concurrency * part size.
+
+    aiohttp is an optional dependency (pip install aliyun-img-utils[async]).
+    """
+
+    def __init__(
+        self,
+        auth,
+        bucket_name,
+        endpoint,
+        region=None,
+        max_concurrency=8,
+        connect_timeout=180,
+        session=None
+    ):
+        """Initialize the engine. The session is created lazily."""
+        self.auth = auth
+        self.bucket_name = bucket_name
+        self.endpoint = endpoint
+        self.region = region
+        self.max_concurrency = max_concurrency
+        self.connect_timeout = connect_timeout
+        self._session = session
+        self._bucket = oss2.Bucket(auth, endpoint, bucket_name, region=region)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close the client session."""
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self):
+        """Lazy aiohttp client session property."""
+        if not self._session:
+            try:
+                import aiohttp
+            except ImportError:
+                raise AliyunException(
+                    'The async transfer engine requires aiohttp. Install '
+                    'it with: pip install aliyun-img-utils[async]'
+                )
+
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.connect_timeout
+                )
+            )
+
+        return self._session
+
+    def sign(self, method, key, params=None, headers=None):
+        """
+        Return the presigned url for the request.
+
+        The url includes params and is signed for headers, which have
+        to be sent unchanged. Signing is delegated to oss2 so both V1
+        and V4 signatures are supported.
+        """
+        # V4 signing adds its query parameters to the params it gets
+        return self._bucket.sign_url(
+            method,
+            key,
+            SIGN_EXPIRES,
+            headers=dict(headers or {}),
+            params=dict(params or {}),
+            slash_safe=True
+        )
+
+    async def request(
+        self,
+        method,
+        key,
+        params=None,
+        headers=None,
+        data=None
+    ):
+        """
+        Send a signed request and return the response headers and body.
+
+        Raise exception if the request fails or returns an error status.
+        """
+        headers = dict(headers or {})
+
+        # The content type is signed so it can't be left to the client
+        if data is not None:
+            headers.setdefault('Content-Type', 'application/octet-stream')
+
+        url = self.sign(method, key, params, headers)
+
+        try:
+            async with self.session.request(
+                method,
+                url,
+                headers=headers,
+                data=data
+            ) as response:
+                body = await response.read()
+                status = response.status
+                response_headers = response.headers
+        except AliyunException:
+            raise
+        except Exception as error:
+            raise AliyunTransferException(
+                f'Failed to establish a new connection: {error}'
+            )
+
+        if status >= 300:
+            message = status
+            try:
+                message = ElementTree.fromstring(body).findtext('Message')
+            except ElementTree.ParseError:
+                pass
+
+            raise AliyunTransferException(
+                f'{method} {key} failed with status {status}: {message}',
+                status
+            )
+
+        return response_headers, body
+
+    async def init_multipart_upload(self, key):
+        """Start a multipart upload and return the upload id."""
+        headers, body = await self.request('POST', key, {'uploads': ''})
+        return ElementTree.fromstring(body).findtext('UploadId')
+
+    async def upload_part(self, key, upload_id, part_number, data):
+        """Upload a single part and return the part etag."""
+        headers, body = await self.request(
+            'PUT',
+            key,
+            {'partNumber': str(part_number), 'uploadId': upload_id},
+            data=data
+        )
+        return headers['ETag'].strip('"')
+
+    async def upload_part_copy(
+        self,
+        source_bucket,
+        source_key,
+        byte_range,
+        key,
+        upload_id,
+        part_number
+    ):
+        """
+        Copy a byte range of the source object as a part.
+
+        The byte range is a tuple of the first and last byte (inclusive).
+        Returns the part etag.
+        """
+        headers, body = await self.request(
+            'PUT',
+            key,
+            {'partNumber': str(part_number), 'uploadId': upload_id},
+            headers={
+                'x-oss-copy-source':
+                    f'/{source_bucket}/{quote(source_key, safe="")}',
+                'x-oss-copy-source-range':
+                    f'bytes={byte_range[0]}-{byte_range[1]}'
+            }
+        )
+        return ElementTree.fromstring(body).findtext('ETag').strip('"')
+
+    async def complete_multipart_upload(self, key, upload_id, parts):
+        """
+        Complete the multipart upload.
+
+        Parts is a list of oss2.models.PartInfo.
+        """
+        parts = sorted(parts, key=lambda part: part.part_number)
+        data = oss2.xml_utils.to_complete_upload_request(parts)
+        await self.request('POST', key, {'uploadId': upload_id}, data=data)
+
+    async def abort_multipart_upload(self, key, upload_id):
+        """Abort the multipart upload."""
+        await self.request('DELETE', key, {'uploadId': upload_id})
+
+    async def get_object_size(self, key):
+        """Return the size in bytes of the object."""
+        headers, body = await self.request('HEAD', key)
+        return int(headers['Content-Length'])
+
+    async def get_range(self, key, start, end):
+        """Return bytes start to end (inclusive) of the object."""
+        headers, body = await self.request(
+            'GET',
+            key,
+            headers={'Range': f'bytes={start}-{end}'}
+        )
+        return body
+
+    async def put_blob(
+        self,
+        blob_name,
+        image_file,
+        page_size=10 * 1024 * 1024,
+        progress_callback=None,
+        telemetry=None,
+        max_retries=2
+    ):
+        """
+        Upload blob to bucket using concurrent multipart upload.
+
+        Uses the same progress callback, telemetry and retry contract
+        as put_blob.
+        """
+        total_size = os.path.getsize(image_file)
+        part_size = oss2.determine_part_size(
+            total_size,
+            preferred_size=page_size
+        )
+        upload_id = await self.init_multipart_upload(blob_name)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        if telemetry:
+            telemetry.start(total_size, self.endpoint)
+
+        if progress_callback:
+            progress_callback(0, total_size)
+
+        async def upload(part_number, offset, size):
+            async with semaphore:
+                read_start = time.perf_counter()
+                data = await loop.run_in_executor(
+                    None,
+                    read_part,
+                    image_file,
+                    offset,
+                    size
+                )
+                read_seconds = time.perf_counter() - read_start
+
+                start = time.time()
+                etag, retries = await retry_call_async(
+                    self.upload_part,
+                    blob_name,
+                    upload_id,
+                    part_number,
+                    data,
+                    max_retries=max_retries
+                )
+
+            if telemetry:
+                telemetry.record_part(
+                    part_number,
+                    offset,
+                    size,
+                    start,
+                    time.time(),
+                    read_seconds=read_seconds,
+                    retries=retries
+                )
+
+            if progress_callback:
+                progress_callback(size, total_size)
+
+            return oss2.models.PartInfo(part_number, etag, size=size)
+
+        tasks = [
+            asyncio.ensure_future(
+                upload(index + 1, offset, min(part_size, total_size - offset))
+            )
+            for index, offset in enumerate(range(0, total_size, part_size))
+        ]
+
+        try:
+            parts = await asyncio.gather(*tasks)
+            await self.complete_multipart_upload(blob_name, upload_id, parts)
+        except BaseException:
+            # Parts still in flight would recreate the aborted upload
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.abort_multipart_upload(blob_name, upload_id)
+            raise
+        finally:
+            if telemetry:
+                telemetry.finish()
+
+        if progress_callback:
+            progress_callback(part_size, total_size, done=True)
+
+    async def get_blob(
+        self,
+        blob_name,
+        file_path,
+        page_size=10 * 1024 * 1024,
+        progress_callback=None
+    ):
+        """
+        Download blob from bucket to file using concurrent ranged GETs.
+
+        Uses the same progress callback contract as put_blob.
+        """
+        total_size = await self.get_object_size(blob_name)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        with open(file_path, 'wb') as file_obj:
+            file_obj.truncate(total_size)
+
+        if progress_callback:
+            progress_callback(0, total_size)
+
+        async def download(offset, size):
+            async with semaphore:
+                data = await self.get_range(
+                    blob_name,
+                    offset,
+                    offset + size - 1
+                )
+                await loop.run_in_executor(
+                    None,
+                    write_part,
+                    file_path,
+                    offset,
+                    data
+                )
+
+            if progress_callback:
+                progress_callback(size, total_size)
+
+        await asyncio.gather(*[
+            download(offset, min(page_size, total_size - offset))
+            for offset in range(0, total_size, page_size)
+        ])
+
+        if progress_callback:
+            progress_callback(page_size, total_size, done=True)
+
+
+def put_blob_async(
+    auth,
+    bucket_name,
+    endpoint,
+    blob_name,
+    image_file,
+    region=None,
+    max_concurrency=8,
+    connect_timeout=180,
+    **kwargs
+):
+    """
+    Upload blob to bucket with the async transfer engine.
+
+    Runs a new event loop until the upload finishes. Keyword
+    arguments are passed to AsyncTransferEngine.put_blob.
+    """
+    async def upload():
+        async with AsyncTransferEngine(
+            auth,
+            bucket_name,
+            endpoint,
+            region=region,
+            max_concurrency=max_concurrency,
+            connect_timeout=connect_timeout
+        ) as engine:
+            await engine.put_blob(blob_name, image_file, **kwargs)
+
+    asyncio.run(upload())
+
+
+def read_part(file_path, offset, size):
+    """Return size bytes of the file starting at offset."""
+    with open(file_path, 'rb') as file_obj:
+        file_obj.seek(offset)
+        return file_obj.read(size)
+
+
+def write_part(file_path, offset, data):
+    """Write data to the file starting at offset."""
+    with open(file_path, 'r+b') as file_obj:
+        file_obj.seek(offset)
+        file_obj.write(data)
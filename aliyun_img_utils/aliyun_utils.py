@@ -20,33 +20,53 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import contextvars
+import importlib
 import logging
 import os
 import sys
-import yaml
+import threading
+import time
 
 import click
-import oss2
 
-from collections import namedtuple, ChainMap
+from collections import deque, namedtuple, ChainMap
+from concurrent.futures import wait as wait_on_futures
 from contextlib import contextmanager
 from datetime import date
-from dateutil.relativedelta import relativedelta
 
-from aliyunsdkcore.client import AcsClient
-from aliyunsdkcore.acs_exception.exceptions import ClientException
-from aliyunsdkecs.request.v20140526.ImportKeyPairRequest import (
-    ImportKeyPairRequest
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_lazy import LazyModule
+from aliyun_img_utils.aliyun_metrics import (
+    MetricsRecorder,
+    set_default_recorder
 )
-from aliyunsdkecs.request.v20140526.DeleteKeyPairsRequest import (
-    DeleteKeyPairsRequest
+from aliyun_img_utils.aliyun_retry import retry_call
+from aliyun_img_utils.aliyun_tracing import (
+    ContextThreadPoolExecutor,
+    Tracer,
+    set_default_tracer
 )
 
-from aliyun_img_utils.aliyun_exceptions import AliyunException
+# SDK modules are imported on first use to keep the CLI startup fast
+oss2 = LazyModule('oss2')
+yaml = LazyModule('yaml')
+sdk_client = LazyModule('aliyunsdkcore.client')
+sdk_exceptions = LazyModule('aliyunsdkcore.acs_exception.exceptions')
 
 
 module = sys.modules[__name__]
 
+# Parsed config files by path, enabled by aliyun-img-utils serve
+config_cache = None
+
+# oss2 session shared by all bucket clients and its connection pool size
+storage_session = None
+storage_pool_size = 0
+storage_lock = threading.Lock()
+
+# Credentials, bucket and endpoint of bucket clients with validated auth
+validated_buckets = set()
 default_config_dir = os.path.expanduser('~/.config/aliyun_img_utils/')
 default_profile = 'default'
 
@@ -66,7 +86,12 @@ aliyun_img_utils_config = namedtuple(
     sorted(defaults)
 )
 
-progress_bar = None
+# Progress bar state of the command, daemon jobs set their own state.
+# Worker threads and tasks share the state of the context they copy.
+progress_state = contextvars.ContextVar(
+    'aliyun_img_utils_progress',
+    default={}
+)
 
 
 def get_config(cli_context):
@@ -83,8 +108,7 @@ def get_config(cli_context):
     config_file_path = os.path.join(config_dir, profile + '.yaml')
 
     try:
-        with open(config_file_path) as config_file:
-            config_values = yaml.safe_load(config_file)
+        config_values = load_config_file(config_file_path)
     except FileNotFoundError:
         echo_style(
             f'Config file: {config_file_path} not found. Using default '
@@ -101,6 +125,33 @@ def get_config(cli_context):
     return aliyun_img_utils_config(**data)
 
 
+def load_config_file(config_file_path):
+    """
+    Return the parsed YAML config file.
+
+    If the module level config cache is enabled (a dictionary) the
+    parsed file is reused until its modification time or size change.
+    """
+    cache = module.config_cache
+
+    if cache is None:
+        with open(config_file_path) as config_file:
+            return yaml.safe_load(config_file)
+
+    stat = os.stat(config_file_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = cache.get(config_file_path)
+
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with open(config_file_path) as config_file:
+        config_values = yaml.safe_load(config_file)
+
+    cache[config_file_path] = (version, config_values)
+    return config_values
+
+
 def echo_style(message, no_color, fg='yellow'):
     """
     Echo stylized output to terminal depending on no_color.
@@ -130,41 +181,113 @@ def handle_errors(log_level, no_color):
         sys.exit(1)
 
 
-def click_progress_callback(read_size, total_size, done=False):
+def click_progress_callback(
+    read_size,
+    total_size,
+    done=False,
+    label='Uploading image'
+):
     """
-    Update the module level progress bar with image upload progress.
+    Update the progress bar of the command with image upload progress.
 
     If upload has finished flush stdout with render_finish.
     """
-    if done and module.progress_bar:
-        module.progress_bar.render_finish()
-        module.progress_bar = None
+    state = progress_state.get()
+
+    if done and state.get('bar'):
+        state.pop('bar').render_finish()
         return
 
-    if not module.progress_bar:
-        module.progress_bar = click.progressbar(
+    if not state.get('bar'):
+        state['bar'] = click.progressbar(
             length=total_size,
-            label='Uploading image'
+            label=label
+        )
+
+    state['bar'].update(read_size)
+
+
+def click_image_progress_callback(progress, eta, label='Creating image'):
+    """
+    Update the progress bar of the command with image progress (0-100).
+
+    The estimated seconds remaining (eta) are shown after the bar.
+    Once the image reaches 100 flush stdout with render_finish.
+    """
+    state = progress_state.get()
+
+    if not state.get('bar'):
+        state['bar'] = click.progressbar(
+            length=100,
+            label=label,
+            show_eta=False,
+            item_show_func=format_eta
         )
 
-    module.progress_bar.update(read_size)
+    bar = state['bar']
+    bar.update(max(progress - bar.pos, 0), current_item=eta)
+
+    if progress >= 100:
+        state.pop('bar').render_finish()
+
+
+def format_eta(eta):
+    """Return the remaining seconds as text, None while unknown."""
+    if eta is None:
+        return None
+
+    minutes, seconds = divmod(int(round(eta)), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours:
+        return f'{hours}h {minutes:02d}m remaining'
+    elif minutes:
+        return f'{minutes}m {seconds:02d}s remaining'
+
+    return f'{seconds}s remaining'
 
 
 def get_logger(log_level):
     """
-    Return new console logger at provided log level.
+    Return console logger at provided log level.
+
+    Every level has its own child logger which propagates to the
+    console handler of the parent logger. Concurrent commands of
+    aliyun-img-utils serve with different log levels do not change
+    each other's level, and the handler is only added once so repeated
+    commands do not duplicate output.
     """
-    logger = logging.getLogger('aliyun_img_utils')
-    logger.setLevel(log_level)
+    parent = logging.getLogger('aliyun_img_utils')
 
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-    console_handler.setFormatter(logging.Formatter('%(message)s'))
+    if not parent.handlers:
+        parent.addHandler(ConsoleHandler())
 
-    logger.addHandler(console_handler)
+    logger = parent.getChild(logging.getLevelName(log_level).lower())
+    logger.setLevel(log_level)
     return logger
 
 
+class ConsoleHandler(logging.StreamHandler):
+    """
+    Log handler which writes messages to the current sys.stderr.
+
+    The daemon replaces sys.stderr with a stream per job.
+    """
+
+    def __init__(self):
+        """Initialize handler with the message only format."""
+        super().__init__()
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, stream):
+        pass
+
+
 def process_shared_options(context_obj, kwargs):
     """
     Update context with values for shared options.
@@ -178,81 +301,350 @@ def process_shared_options(context_obj, kwargs):
     context_obj['access_secret'] = kwargs['access_secret']
     context_obj['bucket_name'] = kwargs['bucket_name']
 
+    if kwargs.get('timings') or kwargs.get('metrics_file'):
+        setup_metrics(kwargs.get('timings'), kwargs.get('metrics_file'))
+
+    if kwargs.get('trace_file'):
+        setup_tracing(kwargs['trace_file'])
+
+
+def setup_metrics(timings, metrics_file=None):
+    """
+    Record the API calls of the current command.
+
+    When the click context closes the summary is echoed to stderr if
+    timings is set and the records are written to metrics_file.
+    """
+    recorder = MetricsRecorder()
+    set_default_recorder(recorder)
+
+    def report():
+        set_default_recorder(None)
+
+        if timings:
+            click.echo(recorder.format_summary(), err=True)
+
+        if metrics_file:
+            recorder.write_json(metrics_file)
+
+    click.get_current_context().call_on_close(report)
+    return recorder
+
+
+def setup_tracing(trace_file):
+    """
+    Trace the current command.
+
+    The trace is written to trace_file when the click context closes.
+    """
+    tracer = Tracer()
+    set_default_tracer(tracer)
+
+    def write_trace():
+        set_default_tracer(None)
+        tracer.write_json(trace_file)
+
+    click.get_current_context().call_on_close(write_trace)
+    return tracer
+
 
 def get_storage_auth(access_key, access_secret):
     """Get Aliyun Auth object."""
     return oss2.Auth(access_key, access_secret)
 
 
+def get_storage_endpoint(region, transfer_acceleration=True):
+    """Return the storage endpoint url for the region."""
+    if transfer_acceleration:
+        location = 'accelerate'
+    else:
+        location = region
+
+    return f'https://oss-{location}.aliyuncs.com'
+
+
+def get_storage_session(pool_size=None):
+    """
+    Return the oss2 session shared by all bucket clients.
+
+    The session is replaced by a larger one if pool_size exceeds the
+    connection pool size of the current session. Bucket clients of the
+    old session keep using it.
+    """
+    pool_size = pool_size or oss2.defaults.connection_pool_size
+
+    with storage_lock:
+        if module.storage_session is None or \
+                pool_size > module.storage_pool_size:
+            module.storage_session = oss2.Session(pool_size=pool_size)
+            module.storage_pool_size = pool_size
+
+        return module.storage_session
+
+
+def grow_storage_session(bucket_clients, pool_size):
+    """
+    Grow the shared session of bucket clients to pool_size connections.
+
+    Bucket clients of the shared session are moved to the grown session
+    so pool_size concurrent requests don't wait for a connection.
+    Clients with their own session are left unchanged.
+    """
+    shared = module.storage_session
+    session = get_storage_session(pool_size)
+
+    for client in bucket_clients:
+        if shared is not None and getattr(client, 'session', None) is shared:
+            client.session = session
+
+
 def get_storage_bucket_client(
     auth,
     bucket_name,
     region,
     transfer_acceleration=True,
-    connect_timeout=180
+    connect_timeout=180,
+    endpoint=None,
+    pool_size=None
 ):
-    """Get authenticated storage bucket client."""
-    if transfer_acceleration:
-        location = 'accelerate'
-    else:
-        location = region
+    """
+    Get authenticated storage bucket client.
 
-    endpoint = f'https://oss-{location}.aliyuncs.com'
+    The endpoint url overrides the regional storage endpoint. All
+    clients share the connection pool of the storage session.
+    """
     return oss2.Bucket(
         auth,
-        endpoint,
+        endpoint or get_storage_endpoint(region, transfer_acceleration),
         bucket_name,
-        connect_timeout=connect_timeout
+        connect_timeout=connect_timeout,
+        session=get_storage_session(pool_size)
     )
 
 
+def is_bucket_validated(auth_key, bucket_name, endpoint):
+    """Return True if auth for the bucket and endpoint was validated."""
+    return (auth_key, bucket_name, endpoint) in module.validated_buckets
+
+
+def set_bucket_validated(auth_key, bucket_name, endpoint):
+    """Cache a successful auth validation for the bucket and endpoint."""
+    module.validated_buckets.add((auth_key, bucket_name, endpoint))
+
+
 def put_blob(
     bucket_client,
     blob_name,
     image_file,
     page_size=10 * 1024 * 1024,
-    progress_callback=None
+    progress_callback=None,
+    telemetry=None,
+    max_retries=2
 ):
-    """Upload blob to bucket using multipart uploader."""
+    """
+    Upload blob to bucket using multipart uploader.
+
+    One part at a time is read into memory. Connection and server
+    errors of a part are retried up to max_retries times with backoff.
+    Part timings are recorded to the optional TransferTelemetry.
+    """
     total_size = os.path.getsize(image_file)
     part_size = oss2.determine_part_size(total_size, preferred_size=page_size)
     upload_id = bucket_client.init_multipart_upload(blob_name).upload_id
 
-    with open(image_file, 'rb') as image_obj:
-        parts = []
-        part_number = 1
-        offset = 0
+    if telemetry:
+        telemetry.start(
+            total_size,
+            getattr(bucket_client, 'endpoint', None)
+        )
 
-        if progress_callback:
-            progress_callback(0, total_size)
+    try:
+        with open(image_file, 'rb') as image_obj:
+            parts = []
+            part_number = 1
+            offset = 0
 
-        while offset < total_size:
-            size_to_upload = min(part_size, total_size - offset)
-            result = bucket_client.upload_part(
+            if progress_callback:
+                progress_callback(0, total_size)
+
+            while offset < total_size:
+                size_to_upload = min(part_size, total_size - offset)
+
+                read_start = time.perf_counter()
+                data = image_obj.read(size_to_upload)
+                read_seconds = time.perf_counter() - read_start
+
+                start = time.time()
+                result, retries = retry_call(
+                    bucket_client.upload_part,
+                    blob_name,
+                    upload_id,
+                    part_number,
+                    data,
+                    max_retries=max_retries
+                )
+
+                if telemetry:
+                    telemetry.record_part(
+                        part_number,
+                        offset,
+                        size_to_upload,
+                        start,
+                        time.time(),
+                        read_seconds=read_seconds,
+                        retries=retries
+                    )
+
+                parts.append(
+                    oss2.models.PartInfo(
+                        part_number,
+                        result.etag,
+                        size=size_to_upload,
+                        part_crc=result.crc
+                    )
+                )
+
+                offset += size_to_upload
+                part_number += 1
+
+                if progress_callback:
+                    progress_callback(size_to_upload, total_size)
+
+            if progress_callback:
+                progress_callback(part_size, total_size, done=True)
+
+            bucket_client.complete_multipart_upload(
                 blob_name,
                 upload_id,
+                parts
+            )
+    finally:
+        # A failed transfer still reports the parts sent before it
+        if telemetry:
+            telemetry.finish()
+
+
+def put_blob_fanout(
+    bucket_clients,
+    blob_name,
+    image_file,
+    page_size=10 * 1024 * 1024,
+    progress_callback=None,
+    max_retries=2,
+    buffer_parts=4
+):
+    """
+    Upload blob to multiple buckets reading the file only once.
+
+    Each part is read once and uploaded to the multipart uploads of
+    all bucket clients concurrently. At most buffer_parts parts are
+    held in memory. Connection and server errors of a part are retried
+    up to max_retries times per bucket with backoff, a bucket which
+    still fails is aborted while the uploads to the other buckets
+    continue.
+
+    Returns a list with None or the error for each bucket client.
+    """
+    total_size = os.path.getsize(image_file)
+    part_size = oss2.determine_part_size(total_size, preferred_size=page_size)
+    errors = [None] * len(bucket_clients)
+    upload_ids = [None] * len(bucket_clients)
+    parts = [[] for client in bucket_clients]
+
+    for index, client in enumerate(bucket_clients):
+        try:
+            upload_ids[index] = client.init_multipart_upload(
+                blob_name
+            ).upload_id
+        except Exception as error:
+            errors[index] = error
+
+    def upload_part(index, part_number, data):
+        if errors[index]:
+            return
+
+        try:
+            result, _ = retry_call(
+                bucket_clients[index].upload_part,
+                blob_name,
+                upload_ids[index],
                 part_number,
-                oss2.SizedFileAdapter(image_obj, size_to_upload)
+                data,
+                max_retries=max_retries
             )
-            parts.append(
+        except Exception as error:
+            errors[index] = error
+        else:
+            parts[index].append(
                 oss2.models.PartInfo(
                     part_number,
                     result.etag,
-                    size=size_to_upload,
+                    size=len(data),
                     part_crc=result.crc
                 )
             )
 
+    def finish_part(size, futures):
+        wait_on_futures(futures)
+
+        if progress_callback:
+            progress_callback(size, total_size)
+
+    pending = deque()
+    max_workers = len(bucket_clients) * buffer_parts
+    grow_storage_session(bucket_clients, max_workers)
+
+    with open(image_file, 'rb') as image_obj, \
+            ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        part_number = 1
+        offset = 0
+
+        if progress_callback:
+            progress_callback(0, total_size)
+
+        while offset < total_size and not all(errors):
+            size_to_upload = min(part_size, total_size - offset)
+            data = image_obj.read(size_to_upload)
+
+            pending.append((size_to_upload, [
+                executor.submit(upload_part, index, part_number, data)
+                for index in range(len(bucket_clients))
+                if not errors[index]
+            ]))
+
+            # Bound the parts in memory, report finished parts in order
+            while pending and (
+                len(pending) >= buffer_parts or
+                all(future.done() for future in pending[0][1])
+            ):
+                finish_part(*pending.popleft())
+
             offset += size_to_upload
             part_number += 1
 
-            if progress_callback:
-                progress_callback(size_to_upload, total_size)
+        while pending:
+            finish_part(*pending.popleft())
 
-        if progress_callback:
-            progress_callback(part_size, total_size, done=True)
+    if progress_callback:
+        progress_callback(part_size, total_size, done=True)
+
+    for index, client in enumerate(bucket_clients):
+        if not errors[index]:
+            try:
+                client.complete_multipart_upload(
+                    blob_name,
+                    upload_ids[index],
+                    sorted(parts[index], key=lambda part: part.part_number)
+                )
+            except Exception as error:
+                errors[index] = error
+        elif upload_ids[index]:
+            try:
+                client.abort_multipart_upload(blob_name, upload_ids[index])
+            except Exception:
+                pass  # Best effort, the upload already failed
 
-        bucket_client.complete_multipart_upload(blob_name, upload_id, parts)
+    return errors
 
 
 def get_compute_client(access_key, access_secret, region):
@@ -260,7 +652,7 @@ def get_compute_client(access_key, access_secret, region):
     Returns a compute client instance.
     """
     try:
-        compute_client = AcsClient(
+        compute_client = sdk_client.AcsClient(
             access_key,
             access_secret,
             region
@@ -273,12 +665,25 @@ def get_compute_client(access_key, access_secret, region):
     return compute_client
 
 
+def get_ecs_request(action):
+    """
+    Return a new ECS API request for action.
+
+    The request module is imported on first use.
+    """
+    request_module = importlib.import_module(
+        f'aliyunsdkecs.request.v20140526.{action}Request'
+    )
+    request = getattr(request_module, f'{action}Request')()
+    request.set_accept_format('json')
+    return request
+
+
 def import_key_pair(name, public_key, client):
     """
     Create a new key pair using the provided public key.
     """
-    request = ImportKeyPairRequest()
-    request.set_accept_format('json')
+    request = get_ecs_request('ImportKeyPair')
     request.set_KeyPairName(name)
     request.set_PublicKeyBody(public_key)
 
@@ -294,8 +699,7 @@ def delete_key_pair(name, client):
     """
     Delete key pair matching the name given.
     """
-    request = DeleteKeyPairsRequest()
-    request.set_accept_format('json')
+    request = get_ecs_request('DeleteKeyPairs')
     request.set_KeyPairNames(f'["{name}"]')
 
     try:
@@ -317,11 +721,23 @@ def get_future_date(months=6, date_format='%Y%m%d'):
 
     By default th date is 6 months from now.
     """
+    from dateutil.relativedelta import relativedelta
+
     today = date.today()
     future_date = today + relativedelta(months=int(months))
     return future_date.strftime(date_format)
 
 
+def get_image_tags(image):
+    """Return a dictionary of tags from a DescribeImages image entry."""
+    tags = {}
+
+    for tag in image.get('Tags', {}).get('Tag', []):
+        tags[tag['TagKey']] = tag.get('TagValue')
+
+    return tags
+
+
 @contextmanager
 def handle_http_errors():
     """
@@ -329,7 +745,7 @@ def handle_http_errors():
     """
     try:
         yield
-    except ClientException as error:
+    except sdk_exceptions.ClientException as error:
         if error.error_code == 'SDK.HttpError':
             # Prevent client ID and signatures from ending up in logs
             raise AliyunException(
@@ -0,0 +1,1324 @@
+# -*- coding: utf-8 -*-
+
+"""Local stand-in server for the Aliyun OSS and ECS APIs."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import base64
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+from xml.etree import ElementTree
+
+import oss2
+
+from aliyun_img_utils.aliyun_clock import system_clock
+
+DEFAULT_REGIONS = [
+    'cn-beijing',
+    'cn-shanghai',
+    'cn-hangzhou',
+    'eu-central-1',
+    'us-west-1'
+]
+CHUNK_SIZE = 64 * 1024
+
+
+class ServiceProfile(object):
+    """
+    Performance and fault profile of the simulated service.
+
+    Latency (seconds) is added to every request. Bandwidth (bytes per
+    second) limits request and response bodies of each request. Rate
+    limit (requests per second per action) throttles requests beyond
+    the limit. Failure rate is the probability a request fails with
+    an internal error.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        bandwidth=None,
+        rate_limit=None,
+        failure_rate=0.0
+    ):
+        """Initialize profile."""
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.rate_limit = rate_limit
+        self.failure_rate = failure_rate
+
+
+class ServiceError(Exception):
+    """Error response of the simulated service."""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class StoredObject(object):
+    """Object or part stored in a simulated bucket."""
+
+    def __init__(self, data, size, crc, etag, last_modified):
+        self.data = data
+        self.size = size
+        self.crc = crc
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def read(self, start=0, end=None):
+        """Return bytes start to end (exclusive) of the object."""
+        end = self.size if end is None else end
+
+        if self.data is None:
+            return bytes(end - start)
+
+        return self.data[start:end]
+
+
+class FakeAliyunServer(object):
+    """
+    Local HTTP server emulating the OSS and ECS APIs used by the tool.
+
+    ECS requests (identified by the Action parameter) support
+    DescribeRegions, DescribeImages, ImportImage, CopyImage, DeleteImage,
+    TagResources, ModifyImageAttribute, ModifyImageSharePermission and
+    DescribeImageSharePermission. OSS requests use path style urls and
+    support objects, multipart uploads (including UploadPartCopy),
+    listing and batch deletes. Signatures are not verified.
+
+    Imports and copies become available after image_create_time and
+    image_copy_time seconds on the clock. The copy time can also be a
+    function of the source and destination region. Deleted images
+    remain visible for image_delete_time seconds. With store_data
+    False object data is discarded after computing checksums and reads
+    return zeros, so large uploads do not use memory.
+
+    Every request is counted per action in calls and per region and
+    action in region_calls. The requests list holds the receive time,
+    region and action of each request.
+
+    AliyunImage connects to the server with the compute_endpoint and
+    storage_endpoint overrides::
+
+        with FakeAliyunServer() as server:
+            server.create_bucket('images')
+            image = AliyunImage(
+                'key', 'secret', 'cn-beijing', bucket_name='images',
+                compute_endpoint=server.compute_endpoint,
+                storage_endpoint=server.storage_endpoint
+            )
+    """
+
+    def __init__(
+        self,
+        host='127.0.0.1',
+        port=0,
+        regions=None,
+        profile=None,
+        region_profiles=None,
+        clock=None,
+        image_create_time=60,
+        image_copy_time=60,
+        image_delete_time=0,
+        store_data=True,
+        seed=None
+    ):
+        """Initialize server state. The server is started by start."""
+        self.host = host
+        self.port = port
+        self.regions = regions or list(DEFAULT_REGIONS)
+        self.profile = profile or ServiceProfile()
+        self.region_profiles = region_profiles or {}
+        self.clock = clock or system_clock
+        self.image_create_time = image_create_time
+        self.image_copy_time = image_copy_time
+        self.image_delete_time = image_delete_time
+        self.store_data = store_data
+        self.calls = Counter()
+        self.region_calls = Counter()
+        self.requests = []
+        self.buckets = {}
+        self.images = {}
+        self.uploads = {}
+        self._failures = []
+        self._rate_windows = defaultdict(list)
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Start serving requests in a background thread."""
+        self._server = ThreadingHTTPServer(
+            (self.host, self.port),
+            FakeRequestHandler
+        )
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            name='aliyun-fake-server',
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def endpoint(self):
+        """Return the host:port of the server."""
+        return f'{self.host}:{self.port}'
+
+    @property
+    def compute_endpoint(self):
+        """Return the ECS endpoint override for AliyunImage."""
+        return self.endpoint
+
+    @property
+    def storage_endpoint(self):
+        """Return the OSS endpoint override for AliyunImage."""
+        return f'http://{self.endpoint}'
+
+    def get_profile(self, region):
+        """Return the service profile for region."""
+        return self.region_profiles.get(region, self.profile)
+
+    def inject_failure(
+        self,
+        action,
+        count=1,
+        status=500,
+        code='InternalError',
+        message='Injected failure.',
+        region=None
+    ):
+        """
+        Fail the next count requests of action (in region) with an error.
+
+        Action is the ECS action or OSS operation name, for example
+        CopyImage or UploadPart.
+        """
+        with self._lock:
+            self._failures.append({
+                'action': action,
+                'region': region,
+                'count': count,
+                'error': ServiceError(status, code, message)
+            })
+
+    def reset_calls(self):
+        """Reset the request counters and log."""
+        with self._lock:
+            self.calls.clear()
+            self.region_calls.clear()
+            self.requests.clear()
+
+    def create_bucket(self, name, region='cn-beijing'):
+        """Create an empty bucket in region."""
+        with self._lock:
+            self.buckets.setdefault(name, {'region': region, 'objects': {}})
+
+    def put_object(self, bucket_name, key, data):
+        """Store data as an object in the bucket."""
+        with self._lock:
+            self.buckets[bucket_name]['objects'][key] = self._make_object(
+                data,
+                len(data),
+                _crc64(data),
+                hashlib.md5(data).hexdigest().upper()
+            )
+
+    def get_object(self, bucket_name, key):
+        """Return the data of an object in the bucket."""
+        return self.buckets[bucket_name]['objects'][key].read()
+
+    def add_image(
+        self,
+        image_name,
+        region='cn-beijing',
+        status=None,
+        duration=0,
+        **attributes
+    ):
+        """
+        Add a compute image in region and return the image id.
+
+        The image becomes available after duration seconds unless
+        a fixed status is provided.
+        """
+        with self._lock:
+            image_id = f'm-{next(self._ids):012d}'
+            image = {
+                'ImageId': image_id,
+                'ImageName': image_name,
+                'Description': '',
+                'RegionId': region,
+                'OSType': 'linux',
+                'Architecture': 'x86_64',
+                'Platform': 'Others Linux',
+                'Size': 20,
+                'ImageOwnerAlias': 'self',
+                'created': self.clock.time(),
+                'duration': duration,
+                'status': status,
+                'tags': {},
+                'launch_permission': None,
+                'accounts': set()
+            }
+            image.update(attributes)
+            self.images[image_id] = image
+
+        return image_id
+
+    def describe_image(self, image):
+        """Return the DescribeImages representation of the image."""
+        elapsed = self.clock.time() - image['created']
+
+        if image['duration'] > 0:
+            progress = min(int(elapsed * 100 / image['duration']), 100)
+        else:
+            progress = 100
+
+        status = image['status']
+        if not status:
+            status = 'Available' if progress == 100 else 'Creating'
+
+        data = {
+            key: value for key, value in image.items()
+            if key[0].isupper()
+        }
+        data.update({
+            'Status': status,
+            'Progress': f'{progress}%',
+            'CreationTime': _iso_time(image['created'], '%Y-%m-%dT%H:%M:%SZ'),
+            'Tags': {
+                'Tag': [
+                    {'TagKey': key, 'TagValue': value}
+                    for key, value in image['tags'].items()
+                ]
+            }
+        })
+
+        return data
+
+    def handle(self, handler):
+        """Handle a request from the request handler."""
+        parsed = urlsplit(handler.path)
+        params = dict(parse_qsl(parsed.query, keep_blank_values=True))
+
+        if 'Action' in params:
+            self._handle_ecs(handler, params)
+        else:
+            self._handle_oss(handler, unquote(parsed.path), params)
+
+    def _check_request(self, action, region):
+        """Count the request and apply the profile and injected faults."""
+        profile = self.get_profile(region)
+
+        with self._lock:
+            self.calls[action] += 1
+            self.region_calls[(region, action)] += 1
+            self.requests.append((time.time(), region, action))
+
+        if profile.latency:
+            time.sleep(profile.latency)
+
+        with self._lock:
+            if profile.rate_limit:
+                now = time.monotonic()
+                window = [
+                    start for start in self._rate_windows[(region, action)]
+                    if now - start < 1
+                ]
+
+                if len(window) >= profile.rate_limit:
+                    self._rate_windows[(region, action)] = window
+
+                    if action in OSS_ACTIONS:
+                        raise ServiceError(
+                            503,
+                            'SlowDown',
+                            'Please reduce your request rate.'
+                        )
+
+                    raise ServiceError(
+                        400,
+                        'Throttling',
+                        'Request was denied due to request throttling.'
+                    )
+
+                window.append(now)
+                self._rate_windows[(region, action)] = window
+
+            for failure in self._failures:
+                if failure['action'] == action and failure['region'] in (
+                    None,
+                    region
+                ):
+                    failure['count'] -= 1
+                    if failure['count'] <= 0:
+                        self._failures.remove(failure)
+                    raise failure['error']
+
+            if profile.failure_rate and (
+                self._random.random() < profile.failure_rate
+            ):
+                raise ServiceError(
+                    500,
+                    'InternalError',
+                    'Random injected failure.'
+                )
+
+        return profile
+
+    def _handle_ecs(self, handler, params):
+        """Handle an ECS RPC request."""
+        body = handler.read_body()
+        if body and 'form' in handler.headers.get('Content-Type', ''):
+            params.update(parse_qsl(body.decode(), keep_blank_values=True))
+
+        action = params['Action']
+        region = params.get('RegionId')
+        request_id = str(uuid.uuid4()).upper()
+
+        try:
+            self._check_request(action, region)
+            method = getattr(self, f'_ecs_{action}', None)
+
+            if not method:
+                raise ServiceError(
+                    404,
+                    'InvalidAction.NotFound',
+                    f'Specified api is not found: {action}'
+                )
+
+            with self._lock:
+                self._remove_deleted_images()
+                result = method(region, params)
+        except ServiceError as error:
+            status = error.status
+            result = {
+                'Code': error.code,
+                'Message': error.message,
+                'HostId': 'ecs.aliyuncs.com'
+            }
+        else:
+            status = 200
+
+        result['RequestId'] = request_id
+        handler.send(
+            status,
+            json.dumps(result).encode(),
+            {'Content-Type': 'application/json'}
+        )
+
+    def _get_image(self, region, image_id):
+        image = self.images.get(image_id)
+
+        if not image or image['RegionId'] != region:
+            raise ServiceError(
+                404,
+                'InvalidImageId.NotFound',
+                f'The specified ImageId does not exist: {image_id}'
+            )
+
+        return image
+
+    def _check_image_name(self, region, image_name):
+        for image in self.images.values():
+            if image['RegionId'] == region and \
+                    image['ImageName'] == image_name:
+                raise ServiceError(
+                    400,
+                    'InvalidImageName.Duplicated',
+                    'The specified Image name has already been used.'
+                )
+
+    def _ecs_DescribeRegions(self, region, params):
+        return {
+            'Regions': {
+                'Region': [
+                    {'RegionId': region_id, 'LocalName': region_id}
+                    for region_id in self.regions
+                ]
+            }
+        }
+
+    def _ecs_DescribeImages(self, region, params):
+        image_ids = None
+        if params.get('ImageId'):
+            image_ids = params['ImageId'].split(',')
+
+        statuses = params.get('Status', 'Available').split(',')
+        tags = _indexed(params, 'Tag', ('Key', 'Value'))
+        filters = dict(
+            (item['Key'], item['Value'])
+            for item in _indexed(params, 'Filter', ('Key', 'Value'))
+        )
+
+        images = []
+        for image in self.images.values():
+            data = self.describe_image(image)
+
+            if image['RegionId'] != region or data['Status'] not in statuses:
+                continue
+
+            if image_ids and image['ImageId'] not in image_ids:
+                continue
+
+            if params.get('ImageName') and \
+                    params['ImageName'] != image['ImageName']:
+                continue
+
+            if any(
+                tag['Key'] not in image['tags'] or (
+                    tag.get('Value') and
+                    image['tags'][tag['Key']] != tag['Value']
+                ) for tag in tags
+            ):
+                continue
+
+            start = filters.get('CreationStartTime')
+            if start and data['CreationTime'][:16] + 'Z' < start:
+                continue
+
+            images.append(data)
+
+        images.sort(key=lambda data: data['CreationTime'], reverse=True)
+        page_size = int(params.get('PageSize', 10))
+        page_number = int(params.get('PageNumber', 1))
+        offset = (page_number - 1) * page_size
+
+        return {
+            'TotalCount': len(images),
+            'PageNumber': page_number,
+            'PageSize': page_size,
+            'RegionId': region,
+            'Images': {'Image': images[offset:offset + page_size]}
+        }
+
+    def _ecs_ImportImage(self, region, params):
+        mapping = _indexed(
+            params,
+            'DiskDeviceMapping',
+            ('OSSBucket', 'OSSObject', 'DiskImageSize')
+        )[0]
+        bucket = self.buckets.get(mapping.get('OSSBucket'))
+
+        if not bucket or mapping.get('OSSObject') not in bucket['objects']:
+            raise ServiceError(
+                400,
+                'InvalidOSSObject.NotFound',
+                'The specified OSS object does not exist.'
+            )
+
+        self._check_image_name(region, params['ImageName'])
+        image_id = self.add_image(
+            params['ImageName'],
+            region,
+            duration=self.image_create_time,
+            Description=params.get('Description', ''),
+            OSType=params.get('OSType', 'linux'),
+            Architecture=params.get('Architecture', 'x86_64'),
+            Platform=params.get('Platform', 'Others Linux'),
+            Size=int(mapping.get('DiskImageSize') or 20)
+        )
+
+        return {'ImageId': image_id, 'RegionId': region}
+
+    def _ecs_CopyImage(self, region, params):
+        source = self._get_image(region, params['ImageId'])
+
+        if self.describe_image(source)['Status'] != 'Available':
+            raise ServiceError(
+                403,
+                'IncorrectImageStatus',
+                'The specified image is not available.'
+            )
+
+        destination = params['DestinationRegionId']
+        name = params.get('DestinationImageName') or source['ImageName']
+        self._check_image_name(destination, name)
+
+        duration = self.image_copy_time
+        if callable(duration):
+            duration = duration(region, destination)
+
+        image_id = self.add_image(
+            name,
+            destination,
+            duration=duration,
+            Description=params.get(
+                'DestinationDescription',
+                source['Description']
+            ),
+            OSType=source['OSType'],
+            Architecture=source['Architecture'],
+            Platform=source['Platform'],
+            Size=source['Size']
+        )
+
+        return {'ImageId': image_id}
+
+    def _ecs_DeleteImage(self, region, params):
+        image = self._get_image(region, params['ImageId'])
+
+        if self.image_delete_time:
+            image.setdefault(
+                'deleted',
+                self.clock.time() + self.image_delete_time
+            )
+        else:
+            del self.images[params['ImageId']]
+
+        return {}
+
+    def _remove_deleted_images(self):
+        now = self.clock.time()
+
+        for image_id, image in list(self.images.items()):
+            if image.get('deleted', now + 1) <= now:
+                del self.images[image_id]
+
+    def _ecs_TagResources(self, region, params):
+        tags = _indexed(params, 'Tag', ('Key', 'Value'))
+
+        for image_id in _indexed_values(params, 'ResourceId'):
+            image = self._get_image(region, image_id)
+            image['tags'].update(
+                (tag['Key'], tag.get('Value', '')) for tag in tags
+            )
+
+        return {}
+
+    def _ecs_ModifyImageAttribute(self, region, params):
+        image = self._get_image(region, params['ImageId'])
+
+        if params.get('Status'):
+            image['status'] = params['Status']
+
+        for name in ('ImageName', 'Description'):
+            if params.get(name):
+                image[name] = params[name]
+
+        return {}
+
+    def _ecs_ModifyImageSharePermission(self, region, params):
+        image = self._get_image(region, params['ImageId'])
+
+        if 'LaunchPermission' in params:
+            image['launch_permission'] = params['LaunchPermission']
+
+        image['accounts'].update(_indexed_values(params, 'AddAccount'))
+        image['accounts'].difference_update(
+            _indexed_values(params, 'RemoveAccount')
+        )
+
+        return {}
+
+    def _ecs_DescribeImageSharePermission(self, region, params):
+        image = self._get_image(region, params['ImageId'])
+        groups = []
+
+        if image['launch_permission']:
+            groups.append({'Group': image['launch_permission']})
+
+        return {
+            'ImageId': image['ImageId'],
+            'RegionId': region,
+            'ShareGroups': {'ShareGroup': groups},
+            'Accounts': {
+                'Account': [
+                    {'AliyunId': account}
+                    for account in sorted(image['accounts'])
+                ]
+            },
+            'TotalCount': len(image['accounts']),
+            'PageNumber': 1,
+            'PageSize': len(image['accounts'])
+        }
+
+    def _handle_oss(self, handler, path, params):
+        """Handle an OSS REST request."""
+        bucket_name, _, key = path.lstrip('/').partition('/')
+        action = _get_oss_action(handler, key, params)
+        bucket = self.buckets.get(bucket_name)
+        region = bucket['region'] if bucket else None
+        request_id = uuid.uuid4().hex.upper()
+
+        try:
+            profile = self._check_request(action, region)
+
+            if not bucket:
+                raise ServiceError(
+                    404,
+                    'NoSuchBucket',
+                    'The specified bucket does not exist.'
+                )
+
+            method = getattr(self, f'_oss_{action}')
+            status, body, headers = method(
+                handler,
+                profile,
+                bucket,
+                bucket_name,
+                key,
+                params
+            )
+        except ServiceError as error:
+            status = error.status
+            body = _error_xml(error, request_id)
+            headers = {'Content-Type': 'application/xml'}
+
+            if handler.command == 'HEAD':
+                headers['x-oss-err'] = base64.b64encode(body).decode()
+                body = b''
+
+            # Drain the request body so the connection can be reused
+            handler.read_body()
+            profile = self.get_profile(region)
+
+        headers['x-oss-request-id'] = request_id
+        handler.send(
+            status,
+            body,
+            headers,
+            bandwidth=profile.bandwidth
+        )
+
+    def _make_object(self, data, size, crc, etag):
+        return StoredObject(
+            data if self.store_data else None,
+            size,
+            crc,
+            etag,
+            self.clock.time()
+        )
+
+    def _read_object(self, handler, profile):
+        data, size, crc, md5 = handler.read_body(
+            bandwidth=profile.bandwidth,
+            checksums=True,
+            keep=self.store_data
+        )
+        return self._make_object(data, size, crc, md5.upper())
+
+    def _get_stored_object(self, bucket, key):
+        stored = bucket['objects'].get(key)
+
+        if not stored:
+            raise ServiceError(
+                404,
+                'NoSuchKey',
+                'The specified key does not exist.'
+            )
+
+        return stored
+
+    def _get_upload(self, params):
+        upload = self.uploads.get(params['uploadId'])
+
+        if not upload:
+            raise ServiceError(
+                404,
+                'NoSuchUpload',
+                'The specified upload does not exist.'
+            )
+
+        return upload
+
+    def _object_headers(self, stored):
+        return {
+            'ETag': f'"{stored.etag}"',
+            'Last-Modified': formatdate(stored.last_modified, usegmt=True),
+            'x-oss-hash-crc64ecma': str(stored.crc),
+            'x-oss-object-type': 'Normal',
+            'Content-Type': 'application/octet-stream'
+        }
+
+    def _oss_GetBucketInfo(self, handler, profile, bucket, name, key, params):
+        location = f'oss-{bucket["region"]}'
+        root = ElementTree.Element('BucketInfo')
+        node = ElementTree.SubElement(root, 'Bucket')
+        _add_children(node, {
+            'Name': name,
+            'CreationDate': _iso_time(0),
+            'StorageClass': 'Standard',
+            'ExtranetEndpoint': f'{location}.aliyuncs.com',
+            'IntranetEndpoint': f'{location}-internal.aliyuncs.com',
+            'Location': location
+        })
+        owner = ElementTree.SubElement(node, 'Owner')
+        _add_children(owner, {'DisplayName': 'owner', 'ID': 'owner'})
+        acl = ElementTree.SubElement(node, 'AccessControlList')
+        _add_children(acl, {'Grant': 'private'})
+
+        return 200, ElementTree.tostring(root), {}
+
+    def _oss_ListObjects(self, handler, profile, bucket, name, key, params):
+        prefix = params.get('prefix', '')
+        marker = params.get('marker', '')
+        max_keys = int(params.get('max-keys') or 100)
+        url_encoded = params.get('encoding-type') == 'url'
+
+        with self._lock:
+            keys = sorted(
+                key for key in bucket['objects']
+                if key.startswith(prefix) and key > marker
+            )
+            objects = [
+                (key, bucket['objects'][key]) for key in keys[:max_keys]
+            ]
+
+        root = ElementTree.Element('ListBucketResult')
+        _add_children(root, {
+            'Name': name,
+            'Prefix': prefix,
+            'Marker': marker,
+            'MaxKeys': str(max_keys),
+            'IsTruncated': str(len(keys) > max_keys).lower()
+        })
+
+        if url_encoded:
+            _add_children(root, {'EncodingType': 'url'})
+
+        if len(keys) > max_keys:
+            next_marker = objects[-1][0]
+            _add_children(root, {
+                'NextMarker':
+                    quote(next_marker) if url_encoded else next_marker
+            })
+
+        for object_key, stored in objects:
+            node = ElementTree.SubElement(root, 'Contents')
+            _add_children(node, {
+                'Key': quote(object_key) if url_encoded else object_key,
+                'LastModified': _iso_time(stored.last_modified),
+                'ETag': f'"{stored.etag}"',
+                'Type': 'Normal',
+                'Size': str(stored.size),
+                'StorageClass': 'Standard'
+            })
+
+        return 200, ElementTree.tostring(root), {}
+
+    def _oss_DeleteMultipleObjects(
+        self,
+        handler,
+        profile,
+        bucket,
+        name,
+        key,
+        params
+    ):
+        request = ElementTree.fromstring(handler.read_body())
+        url_encoded = params.get('encoding-type') == 'url'
+        root = ElementTree.Element('DeleteResult')
+
+        if url_encoded:
+            _add_children(root, {'EncodingType': 'url'})
+
+        with self._lock:
+            for node in request.findall('Object'):
+                object_key = node.findtext('Key')
+                bucket['objects'].pop(object_key, None)
+                deleted = ElementTree.SubElement(root, 'Deleted')
+                _add_children(deleted, {
+                    'Key': quote(object_key) if url_encoded else object_key
+                })
+
+        return 200, ElementTree.tostring(root), {}
+
+    def _oss_PutObject(self, handler, profile, bucket, name, key, params):
+        stored = self._read_object(handler, profile)
+
+        with self._lock:
+            bucket['objects'][key] = stored
+
+        return 200, b'', self._object_headers(stored)
+
+    def _oss_GetObject(self, handler, profile, bucket, name, key, params):
+        stored = self._get_stored_object(bucket, key)
+        headers = self._object_headers(stored)
+        start, end = _parse_range(handler.headers.get('Range'), stored.size)
+
+        if start is None:
+            return 200, stored.read(), headers
+
+        headers['Content-Range'] = f'bytes {start}-{end - 1}/{stored.size}'
+        return 206, stored.read(start, end), headers
+
+    def _oss_HeadObject(self, handler, profile, bucket, name, key, params):
+        stored = self._get_stored_object(bucket, key)
+        headers = self._object_headers(stored)
+        headers['Content-Length'] = str(stored.size)
+        return 200, b'', headers
+
+    _oss_GetObjectMeta = _oss_HeadObject
+
+    def _oss_DeleteObject(self, handler, profile, bucket, name, key, params):
+        with self._lock:
+            bucket['objects'].pop(key, None)
+
+        return 204, b'', {}
+
+    def _oss_InitiateMultipartUpload(
+        self,
+        handler,
+        profile,
+        bucket,
+        name,
+        key,
+        params
+    ):
+        upload_id = uuid.uuid4().hex.upper()
+
+        with self._lock:
+            self.uploads[upload_id] = {
+                'bucket': name,
+                'key': key,
+                'parts': {}
+            }
+
+        root = ElementTree.Element('InitiateMultipartUploadResult')
+        _add_children(root, {
+            'Bucket': name,
+            'Key': key,
+            'UploadId': upload_id
+        })
+
+        return 200, ElementTree.tostring(root), {}
+
+    def _oss_UploadPart(self, handler, profile, bucket, name, key, params):
+        upload = self._get_upload(params)
+        stored = self._read_object(handler, profile)
+
+        with self._lock:
+            upload['parts'][int(params['partNumber'])] = stored
+
+        return 200, b'', {
+            'ETag': f'"{stored.etag}"',
+            'x-oss-hash-crc64ecma': str(stored.crc)
+        }
+
+    def _oss_UploadPartCopy(
+        self,
+        handler,
+        profile,
+        bucket,
+        name,
+        key,
+        params
+    ):
+        upload = self._get_upload(params)
+        source_bucket, _, source_key = unquote(
+            handler.headers['x-oss-copy-source']
+        ).lstrip('/').partition('/')
+
+        if source_bucket not in self.buckets:
+            raise ServiceError(
+                404,
+                'NoSuchBucket',
+                'The specified bucket does not exist.'
+            )
+
+        source = self._get_stored_object(
+            self.buckets[source_bucket],
+            source_key
+        )
+        start, end = _parse_range(
+            handler.headers.get('x-oss-copy-source-range'),
+            source.size
+        )
+        data = source.read(start or 0, end)
+        stored = self._make_object(
+            data,
+            len(data),
+            _crc64(data),
+            hashlib.md5(data).hexdigest().upper()
+        )
+
+        with self._lock:
+            upload['parts'][int(params['partNumber'])] = stored
+
+        root = ElementTree.Element('CopyPartResult')
+        _add_children(root, {
+            'LastModified': _iso_time(stored.last_modified),
+            'ETag': f'"{stored.etag}"'
+        })
+
+        return 200, ElementTree.tostring(root), {
+            'ETag': f'"{stored.etag}"',
+            'x-oss-hash-crc64ecma': str(stored.crc)
+        }
+
+    def _oss_ListParts(self, handler, profile, bucket, name, key, params):
+        upload = self._get_upload(params)
+        root = ElementTree.Element('ListPartsResult')
+        _add_children(root, {
+            'Bucket': name,
+            'Key': key,
+            'UploadId': params['uploadId'],
+            'IsTruncated': 'false',
+            'NextPartNumberMarker': '0'
+        })
+
+        with self._lock:
+            parts = sorted(upload['parts'].items())
+
+        for part_number, stored in parts:
+            node = ElementTree.SubElement(root, 'Part')
+            _add_children(node, {
+                'PartNumber': str(part_number),
+                'LastModified': _iso_time(stored.last_modified),
+                'ETag': f'"{stored.etag}"',
+                'Size': str(stored.size)
+            })
+
+        return 200, ElementTree.tostring(root), {}
+
+    def _oss_CompleteMultipartUpload(
+        self,
+        handler,
+        profile,
+        bucket,
+        name,
+        key,
+        params
+    ):
+        upload = self._get_upload(params)
+        request = ElementTree.fromstring(handler.read_body())
+
+        with self._lock:
+            parts = []
+            for node in request.findall('Part'):
+                stored = upload['parts'].get(int(node.findtext('PartNumber')))
+
+                if not stored or \
+                        node.findtext('ETag').strip('"') != stored.etag:
+                    raise ServiceError(
+                        400,
+                        'InvalidPart',
+                        'One or more of the specified parts could not '
+                        'be found.'
+                    )
+
+                parts.append(stored)
+
+            crc = oss2.utils.calc_obj_crc_from_parts([
+                oss2.models.PartInfo(
+                    index,
+                    stored.etag,
+                    size=stored.size,
+                    part_crc=stored.crc
+                ) for index, stored in enumerate(parts)
+            ])
+            data = None
+            if self.store_data:
+                data = b''.join(stored.data for stored in parts)
+
+            etag = hashlib.md5(
+                b''.join(bytes.fromhex(stored.etag) for stored in parts)
+            ).hexdigest().upper() + f'-{len(parts)}'
+            stored = self._make_object(
+                data,
+                sum(part.size for part in parts),
+                crc,
+                etag
+            )
+            bucket['objects'][key] = stored
+            del self.uploads[params['uploadId']]
+
+        root = ElementTree.Element('CompleteMultipartUploadResult')
+        _add_children(root, {
+            'Bucket': name,
+            'Key': key,
+            'ETag': f'"{etag}"'
+        })
+
+        return 200, ElementTree.tostring(root), {
+            'ETag': f'"{etag}"',
+            'x-oss-hash-crc64ecma': str(crc)
+        }
+
+    def _oss_AbortMultipartUpload(
+        self,
+        handler,
+        profile,
+        bucket,
+        name,
+        key,
+        params
+    ):
+        with self._lock:
+            self._get_upload(params)
+            del self.uploads[params['uploadId']]
+
+        return 204, b'', {}
+
+
+OSS_ACTIONS = (
+    'GetBucketInfo',
+    'ListObjects',
+    'DeleteMultipleObjects',
+    'PutObject',
+    'GetObject',
+    'HeadObject',
+    'GetObjectMeta',
+    'DeleteObject',
+    'InitiateMultipartUpload',
+    'UploadPart',
+    'UploadPartCopy',
+    'ListParts',
+    'CompleteMultipartUpload',
+    'AbortMultipartUpload'
+)
+
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    """Request handler passing requests to the FakeAliyunServer."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_request(self):
+        self._body_read = False
+        self.server.fake.handle(self)
+
+    do_GET = do_PUT = do_POST = do_DELETE = do_HEAD = do_request
+
+    def log_message(self, format, *args):
+        """Do not log requests to stderr."""
+
+    def read_body(self, bandwidth=None, checksums=False, keep=True):
+        """
+        Read the request body.
+
+        Returns the data, or with checksums a tuple of the data (None
+        unless keep is True), size, CRC64 and MD5 hex digest.
+        """
+        crc = oss2.utils.Crc64()
+        md5 = hashlib.md5()
+        chunks = []
+        size = 0
+        start = time.monotonic()
+
+        for chunk in self._iter_body():
+            size += len(chunk)
+            _limit_bandwidth(start, size, bandwidth)
+
+            if checksums:
+                crc.update(chunk)
+                md5.update(chunk)
+
+            if keep or not checksums:
+                chunks.append(chunk)
+
+        data = b''.join(chunks)
+
+        if not checksums:
+            return data
+
+        return (data if keep else None), size, crc.crc, md5.hexdigest()
+
+    def _iter_body(self):
+        if self._body_read:
+            return
+
+        self._body_read = True
+
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                length = int(self.rfile.readline().split(b';')[0], 16)
+                if not length:
+                    self.rfile.readline()
+                    return
+
+                yield self.rfile.read(length)
+                self.rfile.readline()
+
+        remaining = int(self.headers.get('Content-Length') or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+
+            remaining -= len(chunk)
+            yield chunk
+
+    def send(self, status, body, headers, bandwidth=None):
+        """Send the response with the body limited to bandwidth."""
+        self.send_response(status)
+
+        headers = dict(headers)
+        headers.setdefault('Content-Length', str(len(body)))
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.end_headers()
+
+        if self.command == 'HEAD':
+            return
+
+        start = time.monotonic()
+
+        for offset in range(0, len(body), CHUNK_SIZE):
+            self.wfile.write(body[offset:offset + CHUNK_SIZE])
+            _limit_bandwidth(start, offset + CHUNK_SIZE, bandwidth)
+
+
+def _get_oss_action(handler, key, params):
+    """Return the OSS operation name of the request."""
+    method = handler.command
+
+    if not key:
+        if 'bucketInfo' in params:
+            return 'GetBucketInfo'
+        elif 'delete' in params:
+            return 'DeleteMultipleObjects'
+
+        return 'ListObjects'
+
+    if method == 'PUT':
+        if 'uploadId' in params:
+            if 'x-oss-copy-source' in handler.headers:
+                return 'UploadPartCopy'
+            return 'UploadPart'
+        return 'PutObject'
+    elif method == 'POST':
+        if 'uploads' in params:
+            return 'InitiateMultipartUpload'
+        return 'CompleteMultipartUpload'
+    elif method == 'DELETE':
+        if 'uploadId' in params:
+            return 'AbortMultipartUpload'
+        return 'DeleteObject'
+    elif method == 'HEAD':
+        if 'objectMeta' in params:
+            return 'GetObjectMeta'
+        return 'HeadObject'
+    elif 'uploadId' in params:
+        return 'ListParts'
+
+    return 'GetObject'
+
+
+def _limit_bandwidth(start, size, bandwidth):
+    """Sleep until size bytes since start fit within bandwidth."""
+    if bandwidth:
+        delay = start + size / bandwidth - time.monotonic()
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _indexed(params, name, fields):
+    """Return the list of dictionaries of RPC params like Tag.1.Key."""
+    items = []
+
+    for index in itertools.count(1):
+        item = {
+            field: params[f'{name}.{index}.{field}']
+            for field in fields if f'{name}.{index}.{field}' in params
+        }
+
+        if not item:
+            return items
+
+        items.append(item)
+
+
+def _indexed_values(params, name):
+    """Return the list of values of RPC params like ResourceId.1."""
+    values = []
+
+    for index in itertools.count(1):
+        if f'{name}.{index}' not in params:
+            return values
+
+        values.append(params[f'{name}.{index}'])
+
+
+def _parse_range(value, size):
+    """Return the start and end (exclusive) of a bytes range header."""
+    if not value:
+        return None, None
+
+    start, _, end = value.split('=', 1)[1].partition('-')
+    end = min(int(end) + 1, size) if end else size
+
+    return int(start), end
+
+
+def _crc64(data):
+    crc = oss2.utils.Crc64()
+    crc.update(data)
+    return crc.crc
+
+
+def _iso_time(timestamp, date_format='%Y-%m-%dT%H:%M:%S.000Z'):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        date_format
+    )
+
+
+def _add_children(node, children):
+    for tag, text in children.items():
+        ElementTree.SubElement(node, tag).text = text
+
+
+def _error_xml(error, request_id):
+    root = ElementTree.Element('Error')
+    _add_children(root, {
+        'Code': error.code,
+        'Message': error.message,
+        'RequestId': request_id,
+        'HostId': 'oss.aliyuncs.com'
+    })
+    return ElementTree.tostring(root)
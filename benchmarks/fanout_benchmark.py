@@ -0,0 +1,360 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Region fan-out benchmark for aliyun_img_utils.
+
+Runs replicate_image, publish_image_to_regions, deprecate_image_in_regions
+and delete_compute_image_in_regions against a local FakeAliyunServer for
+an increasing number of regions. Regions in the source group (cn) use
+the local latency and all other regions the remote latency. Every
+region can be throttled to a number of requests per second per action.
+
+For each operation and region count the total wall clock time, the
+number of API calls by action and the time spent sleeping in waiters
+(on a virtual clock) are recorded. Results can be saved as a baseline
+and compared against a stored baseline.
+
+Example::
+
+    python benchmarks/fanout_benchmark.py run --region-counts 1,5,10,20 \\
+        --baseline benchmarks/baselines/fanout.json
+"""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import platform
+import sys
+import time
+
+import click
+
+from aliyun_img_utils import __version__
+from aliyun_img_utils.aliyun_clock import VirtualClock
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.testing import FakeAliyunServer, ServiceProfile
+
+REGION_GROUPS = ('cn', 'ap', 'eu', 'us')
+SOURCE_REGION = 'cn-bench-0'
+IMAGE_NAME = 'bench-image-v1'
+OPERATIONS = ('replicate', 'publish', 'deprecate', 'delete')
+
+
+def get_bench_regions(count):
+    """Return count destination region ids spread over the groups."""
+    return [
+        f'{REGION_GROUPS[index % len(REGION_GROUPS)]}-bench-{index}'
+        for index in range(1, count + 1)
+    ]
+
+
+def get_region_profiles(regions, latency, remote_latency, rate_limit):
+    """Return the service profile of every region."""
+    profiles = {}
+
+    for region in regions:
+        profiles[region] = ServiceProfile(
+            latency=latency if region.startswith('cn-') else remote_latency,
+            rate_limit=rate_limit or None
+        )
+
+    return profiles
+
+
+def measure(server, clock, func, *args, **kwargs):
+    """Run func and return the wall, virtual and API call measurements."""
+    server.reset_calls()
+    sleeps = clock.sleeps
+    slept = clock.slept
+    start_time = clock.time()
+    start = time.perf_counter()
+
+    func(*args, **kwargs)
+
+    calls = dict(server.calls)
+    return {
+        'wall_seconds': round(time.perf_counter() - start, 3),
+        'simulated_seconds': round(clock.time() - start_time, 3),
+        'waiter_sleeps': clock.sleeps - sleeps,
+        'waiter_sleep_seconds': round(clock.slept - slept, 3),
+        'api_calls': sum(calls.values()),
+        'api_calls_by_action': dict(sorted(calls.items()))
+    }
+
+
+def run_region_count(
+    count,
+    latency,
+    remote_latency,
+    rate_limit,
+    copy_time,
+    delete_time
+):
+    """Run all operations for count destination regions."""
+    regions = get_bench_regions(count)
+    all_regions = [SOURCE_REGION] + regions
+    clock = VirtualClock(start=time.time())
+    server = FakeAliyunServer(
+        regions=all_regions,
+        region_profiles=get_region_profiles(
+            all_regions,
+            latency,
+            remote_latency,
+            rate_limit
+        ),
+        clock=clock,
+        image_copy_time=copy_time,
+        image_delete_time=delete_time
+    )
+    results = []
+
+    with server:
+        server.add_image(IMAGE_NAME, SOURCE_REGION)
+        image = AliyunImage(
+            'key',
+            'secret',
+            SOURCE_REGION,
+            log_level=logging.CRITICAL,
+            clock=clock,
+            compute_endpoint=server.compute_endpoint
+        )
+
+        operations = {
+            'replicate': (image.replicate_image, IMAGE_NAME, regions),
+            'publish': (
+                image.publish_image_to_regions,
+                IMAGE_NAME,
+                'hidden',
+                all_regions
+            ),
+            'deprecate': (
+                image.deprecate_image_in_regions,
+                IMAGE_NAME,
+                all_regions
+            ),
+            'delete': (
+                image.delete_compute_image_in_regions,
+                IMAGE_NAME,
+                False,
+                all_regions
+            )
+        }
+
+        for operation in OPERATIONS:
+            image.region = SOURCE_REGION
+            result = {'operation': operation, 'regions': count}
+            result.update(measure(server, clock, *operations[operation]))
+            results.append(result)
+
+            if operation == 'replicate':
+                # Let the copies finish before the next operation
+                clock.advance(copy_time)
+
+    return results
+
+
+def run_benchmark(
+    region_counts,
+    latency=0.002,
+    remote_latency=0.01,
+    rate_limit=None,
+    copy_time=600,
+    delete_time=30,
+    echo=None
+):
+    """
+    Run the fan-out benchmark and return the report dictionary.
+
+    Latencies are in seconds per request and the rate limit in
+    requests per second per region and action (None for unlimited).
+    Copy and delete times are simulated seconds.
+    """
+    results = []
+
+    for count in region_counts:
+        for result in run_region_count(
+            count,
+            latency,
+            remote_latency,
+            rate_limit,
+            copy_time,
+            delete_time
+        ):
+            results.append(result)
+
+            if echo:
+                echo(json.dumps(result))
+
+    return {
+        'benchmark': 'fanout',
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'latency': latency,
+            'remote_latency': remote_latency,
+            'rate_limit': rate_limit,
+            'copy_time': copy_time,
+            'delete_time': delete_time
+        },
+        'results': results
+    }
+
+
+def compare_results(report, baseline, tolerance=0.2):
+    """
+    Compare the report results against the baseline results.
+
+    Returns a list of regression messages. API calls and waiter sleeps
+    must not increase. Wall clock time may increase by the tolerance
+    fraction.
+    """
+    expected = {
+        (result['operation'], result['regions']): result
+        for result in baseline['results']
+    }
+    regressions = []
+
+    for result in report['results']:
+        key = (result['operation'], result['regions'])
+        base = expected.get(key)
+
+        if not base:
+            continue
+
+        name = f'{result["operation"]} ({result["regions"]} regions)'
+
+        for action, calls in result['api_calls_by_action'].items():
+            base_calls = base['api_calls_by_action'].get(action, 0)
+            if calls > base_calls:
+                regressions.append(
+                    f'{name}: {action} calls increased from '
+                    f'{base_calls} to {calls}'
+                )
+
+        if result['waiter_sleep_seconds'] > base['waiter_sleep_seconds']:
+            regressions.append(
+                f'{name}: waiter sleep increased from '
+                f'{base["waiter_sleep_seconds"]}s to '
+                f'{result["waiter_sleep_seconds"]}s'
+            )
+
+        limit = base['wall_seconds'] * (1 + tolerance)
+        if result['wall_seconds'] > limit:
+            regressions.append(
+                f'{name}: wall time increased from '
+                f'{base["wall_seconds"]}s to {result["wall_seconds"]}s'
+            )
+
+    return regressions
+
+
+def split_values(value, convert):
+    return [convert(item) for item in value.split(',') if item]
+
+
+@click.group()
+def main():
+    """Aliyun image region fan-out benchmark."""
+
+
+@main.command()
+@click.option(
+    '--region-counts',
+    default='1,5,10,20',
+    help='Comma separated numbers of destination regions.'
+)
+@click.option(
+    '--latency',
+    type=float,
+    default=0.002,
+    help='Simulated request latency in seconds of cn regions.'
+)
+@click.option(
+    '--remote-latency',
+    type=float,
+    default=0.01,
+    help='Simulated request latency in seconds of other regions.'
+)
+@click.option(
+    '--rate-limit',
+    type=int,
+    default=0,
+    help='Requests per second per region and action (0 for unlimited).'
+)
+@click.option(
+    '--baseline',
+    type=click.Path(exists=True, dir_okay=False),
+    help='Compare the results against this baseline report.'
+)
+@click.option(
+    '--tolerance',
+    type=float,
+    default=0.2,
+    help='Allowed fraction of wall clock increase over the baseline.'
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Write the JSON report (usable as a baseline) to this file '
+         'instead of stdout.'
+)
+def run(
+    region_counts,
+    latency,
+    remote_latency,
+    rate_limit,
+    baseline,
+    tolerance,
+    output
+):
+    """Run the fan-out benchmark."""
+    report = run_benchmark(
+        split_values(region_counts, int),
+        latency=latency,
+        remote_latency=remote_latency,
+        rate_limit=rate_limit,
+        echo=lambda line: click.echo(line, err=True)
+    )
+
+    if output:
+        with open(output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+    if baseline:
+        with open(baseline) as baseline_file:
+            regressions = compare_results(
+                report,
+                json.load(baseline_file),
+                tolerance
+            )
+
+        for regression in regressions:
+            click.secho(regression, fg='red', err=True)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+CLI startup benchmark for aliyun_img_utils.
+
+Measures the cold import time of the CLI module and, for a set of CLI
+commands, the time until the first API request reaches a local
+FakeAliyunServer and the total run time. Every measurement runs in a
+fresh interpreter and is repeated, the minimum and median are
+reported as JSON.
+
+Example::
+
+    python benchmarks/startup_benchmark.py run --repeat 20 \\
+        --output startup.json
+"""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+from aliyun_img_utils import __version__
+from aliyun_img_utils.testing import FakeAliyunServer
+
+IMAGE_NAME = 'bench-image-v1'
+SDK_MODULES = (
+    'oss2',
+    'aliyunsdkcore',
+    'aliyunsdkecs',
+    'yaml',
+    'dateutil',
+    'asyncio'
+)
+COMMANDS = {
+    'version': ['--version'],
+    'help': ['image', '--help'],
+    'info': ['image', 'info', '--image-name', IMAGE_NAME],
+    'list-blobs': ['image', 'list-blobs'],
+    'activate': [
+        'image',
+        'activate',
+        '--image-name',
+        IMAGE_NAME,
+        '--regions',
+        'cn-beijing'
+    ]
+}
+
+# Runs the CLI entry point with AliyunImage pointed at the fake server
+LAUNCHER = """
+import sys
+from functools import partialmethod
+from aliyun_img_utils.aliyun_image import AliyunImage
+AliyunImage.__init__ = partialmethod(
+    AliyunImage.__init__,
+    compute_endpoint=sys.argv[1],
+    storage_endpoint=sys.argv[2]
+)
+del sys.argv[1:3]
+from aliyun_img_utils.aliyun_cli import main
+main(prog_name='aliyun-img-utils')
+"""
+
+IMPORT_CHECK = """
+import json
+import sys
+import aliyun_img_utils.aliyun_cli
+print(json.dumps([
+    name for name in {modules!r} if name in sys.modules
+]))
+"""
+
+
+def summarize(values):
+    """Return the minimum and median of values in seconds."""
+    return {
+        'min': round(min(values), 4),
+        'median': round(statistics.median(values), 4)
+    }
+
+
+def time_python(code, repeat):
+    """Return the run times of python code in fresh interpreters."""
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', code],
+            check=True,
+            capture_output=True
+        )
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def get_heaviest_imports(count=10):
+    """Return the top level imports with the highest cumulative time."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         'import aliyun_img_utils.aliyun_cli'],
+        check=True,
+        capture_output=True,
+        text=True
+    )
+    imports = []
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.strip()))
+
+    imports.sort(reverse=True)
+    return [
+        {'module': name, 'cumulative_ms': round(cumulative / 1000, 1)}
+        for cumulative, name in imports[:count]
+    ]
+
+
+def measure_import(repeat):
+    """Return the import time measurements of the CLI module."""
+    interpreter = time_python('pass', repeat)
+    cli = time_python('import aliyun_img_utils.aliyun_cli', repeat)
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_CHECK.format(modules=SDK_MODULES)],
+        check=True,
+        capture_output=True,
+        text=True
+    )
+
+    return {
+        'interpreter': summarize(interpreter),
+        'cli_import': summarize(cli),
+        'cli_import_overhead': summarize([
+            cli_time - interpreter_time
+            for cli_time, interpreter_time in zip(
+                sorted(cli),
+                sorted(interpreter)
+            )
+        ]),
+        'sdk_modules_loaded': json.loads(result.stdout),
+        'heaviest_imports': get_heaviest_imports()
+    }
+
+
+def measure_command(server, config_dir, args, repeat):
+    """
+    Return the run time and time to first request of a CLI command.
+
+    The time to first request is None for commands without requests.
+    """
+    totals = []
+    first_requests = []
+    command = [
+        sys.executable,
+        '-c',
+        LAUNCHER,
+        server.compute_endpoint,
+        server.storage_endpoint,
+        *args
+    ]
+
+    if args[0] == 'image' and '--help' not in args:
+        command += ['--config-dir', config_dir]
+
+    for _ in range(repeat):
+        server.reset_calls()
+        start_time = time.time()
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True)
+        totals.append(time.perf_counter() - start)
+
+        if result.returncode:
+            raise click.ClickException(
+                f'{" ".join(args)} failed: {result.stdout}{result.stderr}'
+            )
+
+        if server.requests:
+            first_requests.append(server.requests[0][0] - start_time)
+
+    return {
+        'total': summarize(totals),
+        'first_request': summarize(first_requests) if first_requests
+        else None,
+        'requests': len(server.requests)
+    }
+
+
+def run_benchmark(commands, repeat, echo=None):
+    """Run the startup benchmark and return the report dictionary."""
+    report = {
+        'benchmark': 'startup',
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {'repeat': repeat},
+        'import': measure_import(repeat),
+        'commands': {}
+    }
+
+    if echo:
+        echo(json.dumps(report['import']))
+
+    with tempfile.TemporaryDirectory() as config_dir, \
+            FakeAliyunServer() as server:
+        with open(os.path.join(config_dir, 'default.yaml'), 'w') as config:
+            config.write(
+                'access_key: key\n'
+                'access_secret: secret\n'
+                'region: cn-beijing\n'
+                'bucket_name: images\n'
+            )
+
+        server.create_bucket('images', 'cn-beijing')
+        server.put_object('images', 'bench.qcow2', b'image')
+        server.add_image(IMAGE_NAME, 'cn-beijing')
+
+        for name in commands:
+            result = measure_command(
+                server,
+                config_dir,
+                COMMANDS[name],
+                repeat
+            )
+            report['commands'][name] = result
+
+            if echo:
+                echo(json.dumps({name: result}))
+
+    return report
+
+
+@click.group()
+def main():
+    """Aliyun image CLI startup benchmark."""
+
+
+@main.command()
+@click.option(
+    '--commands',
+    default=','.join(COMMANDS),
+    help='Comma separated CLI commands to measure. Available: '
+         f'{", ".join(COMMANDS)}.'
+)
+@click.option(
+    '--repeat',
+    type=int,
+    default=10,
+    help='Number of runs per measurement.'
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Write the JSON report to this file instead of stdout.'
+)
+def run(commands, repeat, output):
+    """Run the CLI startup benchmark."""
+    commands = [name for name in commands.split(',') if name]
+    for name in commands:
+        if name not in COMMANDS:
+            raise click.BadParameter(f'Unknown command: {name}')
+
+    report = run_benchmark(
+        commands,
+        repeat,
+        echo=lambda line: click.echo(line, err=True)
+    )
+
+    if output:
+        with open(output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
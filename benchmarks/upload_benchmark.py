@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Upload throughput benchmark for aliyun_img_utils.
+
+Uploads synthetic sparse and dense images to a local FakeAliyunServer
+with simulated per connection bandwidth and round trip time. Sweeps
+image kind, size, part size and concurrency and writes the results as
+JSON. Each upload runs in a fresh interpreter so CPU time and peak RSS
+only include the client.
+
+Example::
+
+    python benchmarks/upload_benchmark.py run --sizes 1,10 \\
+        --part-sizes 8,32,64 --concurrency 1,4,8 --output results.json
+"""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+from aliyun_img_utils import __version__
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.testing import FakeAliyunServer, ServiceProfile
+
+GB = 1024 ** 3
+MB = 1024 ** 2
+IMAGE_KINDS = ('sparse', 'dense')
+DATA_BLOCK = 16 * MB
+SPARSE_STRIDE = 64 * MB
+
+
+def create_image(path, kind, size):
+    """
+    Create a synthetic image file of size bytes.
+
+    Dense images are filled with random data. Sparse images are holes
+    with 1 MB of random data every 64 MB, like a freshly built disk.
+    """
+    block = os.urandom(DATA_BLOCK)
+
+    with open(path, 'wb') as image_file:
+        if kind == 'dense':
+            remaining = size
+            while remaining > 0:
+                remaining -= image_file.write(block[:remaining])
+        else:
+            for offset in range(0, size, SPARSE_STRIDE):
+                image_file.seek(offset)
+                image_file.write(block[:min(MB, size - offset)])
+
+            image_file.truncate(size)
+
+
+def get_engines(concurrency):
+    """
+    Return the (engine, concurrency) combinations to run.
+
+    The sync engine uploads one part at a time. The async engine is
+    only used when aiohttp is available.
+    """
+    engines = [('sync', 1)]
+
+    if importlib.util.find_spec('aiohttp'):
+        engines += [('async', value) for value in concurrency]
+
+    return engines
+
+
+def run_upload(config):
+    """
+    Upload the image described by config and return the measurements.
+
+    Runs in the worker process.
+    """
+    image = AliyunImage(
+        'key',
+        'secret',
+        'cn-beijing',
+        bucket_name='images',
+        compute_endpoint=config['compute_endpoint'],
+        storage_endpoint=config['storage_endpoint']
+    )
+    image.bucket_client  # Setup client outside of the measurement
+
+    start_usage = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    image.upload_image_tarball(
+        config['image_file'],
+        page_size=config['part_size'],
+        blob_name=config['blob_name'],
+        force_replace_image=True,
+        transfer_engine=config['engine'],
+        max_concurrency=config['concurrency']
+    )
+    seconds = time.perf_counter() - start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu_seconds = (
+        usage.ru_utime - start_usage.ru_utime +
+        usage.ru_stime - start_usage.ru_stime
+    )
+    size = os.path.getsize(config['image_file'])
+
+    return {
+        'seconds': round(seconds, 3),
+        'mb_per_s': round(size / MB / seconds, 2),
+        'cpu_seconds': round(cpu_seconds, 3),
+        'cpu_seconds_per_gb': round(cpu_seconds / (size / GB), 3),
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1)  # KB on Linux
+    }
+
+
+def run_case(config):
+    """Run one upload in a fresh interpreter and return the results."""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), 'worker'],
+        input=json.dumps(config),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout)
+
+
+def run_benchmark(
+    sizes,
+    kinds,
+    part_sizes,
+    concurrency,
+    bandwidth,
+    rtt,
+    work_dir,
+    echo=None
+):
+    """
+    Run the upload sweep and return the report dictionary.
+
+    Sizes are in GB, part sizes in MB and bandwidth in MB/s per
+    connection (None for unlimited). RTT in seconds is added to every
+    request.
+    """
+    profile = ServiceProfile(
+        latency=rtt,
+        bandwidth=bandwidth * MB if bandwidth else None
+    )
+    results = []
+
+    with FakeAliyunServer(profile=profile, store_data=False) as server:
+        server.create_bucket('images', 'cn-beijing')
+
+        for kind in kinds:
+            for size in sizes:
+                image_file = os.path.join(work_dir, f'{kind}-{size}gb.raw')
+                create_image(image_file, kind, int(size * GB))
+
+                for part_size in part_sizes:
+                    for engine, workers in get_engines(concurrency):
+                        case = {
+                            'kind': kind,
+                            'size_gb': size,
+                            'part_size_mb': part_size,
+                            'engine': engine,
+                            'concurrency': workers
+                        }
+                        server.reset_calls()
+                        case.update(run_case({
+                            'compute_endpoint': server.compute_endpoint,
+                            'storage_endpoint': server.storage_endpoint,
+                            'image_file': image_file,
+                            'blob_name': os.path.basename(image_file),
+                            'part_size': part_size * MB,
+                            'engine': engine,
+                            'concurrency': workers
+                        }))
+                        case['parts'] = server.calls['UploadPart']
+                        results.append(case)
+
+                        if echo:
+                            echo(json.dumps(case))
+
+                os.remove(image_file)
+
+    return {
+        'benchmark': 'upload',
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'bandwidth_mb_per_s': bandwidth,
+            'rtt': rtt
+        },
+        'results': results
+    }
+
+
+def split_values(value, convert):
+    return [convert(item) for item in value.split(',') if item]
+
+
+@click.group()
+def main():
+    """Aliyun image upload benchmark."""
+
+
+@main.command()
+@click.option(
+    '--sizes',
+    default='1',
+    help='Comma separated image sizes in GB.'
+)
+@click.option(
+    '--kinds',
+    default=','.join(IMAGE_KINDS),
+    help='Comma separated image kinds (sparse, dense).'
+)
+@click.option(
+    '--part-sizes',
+    default='8,32,64',
+    help='Comma separated part sizes in MB.'
+)
+@click.option(
+    '--concurrency',
+    default='1,4,8,16',
+    help='Comma separated concurrency values for the async engine.'
+)
+@click.option(
+    '--bandwidth',
+    type=float,
+    default=100,
+    help='Simulated bandwidth per connection in MB/s (0 for unlimited).'
+)
+@click.option(
+    '--rtt',
+    type=float,
+    default=0.02,
+    help='Simulated round trip time in seconds.'
+)
+@click.option(
+    '--work-dir',
+    type=click.Path(exists=True, file_okay=False),
+    help='Directory for the synthetic images. Defaults to a temporary '
+         'directory.'
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Write the JSON report to this file instead of stdout.'
+)
+def run(
+    sizes,
+    kinds,
+    part_sizes,
+    concurrency,
+    bandwidth,
+    rtt,
+    work_dir,
+    output
+):
+    """Run the upload throughput sweep."""
+    kinds = split_values(kinds, str)
+    for kind in kinds:
+        if kind not in IMAGE_KINDS:
+            raise click.BadParameter(f'Unknown image kind: {kind}')
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as directory:
+        report = run_benchmark(
+            split_values(sizes, float),
+            kinds,
+            split_values(part_sizes, int),
+            split_values(concurrency, int),
+            bandwidth,
+            rtt,
+            directory,
+            echo=lambda line: click.echo(line, err=True)
+        )
+
+    if output:
+        with open(output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+
+@main.command(hidden=True)
+def worker():
+    """Run a single upload configured on stdin."""
+    click.echo(json.dumps(run_upload(json.load(sys.stdin))))
+
+
+if __name__ == '__main__':
+    main()
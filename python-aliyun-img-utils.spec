@@ -40,6 +40,7 @@ BuildRequires:  %{pythons}-aliyun-python-sdk-core
 BuildRequires:  %{pythons}-aliyun-python-sdk-ecs >= 4.24.77
 BuildRequires:  %{pythons}-python-dateutil
 BuildRequires:  %{pythons}-pytest
+BuildRequires:  %{pythons}-aiohttp
 BuildRequires:  %{pythons}-coverage
 BuildRequires:  %{pythons}-pytest-cov
 BuildRequires:  %{pythons}-pip
@@ -51,6 +52,7 @@ Requires:       %{pythons}-oss2
 Requires:       %{pythons}-aliyun-python-sdk-core
 Requires:       %{pythons}-aliyun-python-sdk-ecs >= 4.24.77
 Requires:       %{pythons}-python-dateutil
+Recommends:     %{pythons}-aiohttp
 
 BuildArch:      noarch
 Provides:       python3-aliyun-img-utils = %{version}
@@ -88,7 +90,13 @@ install -m 644 man/man1/* %{buildroot}/%{_mandir}/man1
 %{_mandir}/man1/aliyun-img-utils-image-replicate.1%{?ext_man}
 %{_mandir}/man1/aliyun-img-utils-image-upload.1%{?ext_man}
 %{_mandir}/man1/aliyun-img-utils-image-share-permission.1%{?ext_man}
+%{_mandir}/man1/aliyun-img-utils-image-inventory.1%{?ext_man}
+%{_mandir}/man1/aliyun-img-utils-image-gc.1%{?ext_man}
+%{_mandir}/man1/aliyun-img-utils-image-list-blobs.1%{?ext_man}
+%{_mandir}/man1/aliyun-img-utils-image-delete-blobs.1%{?ext_man}
+%{_mandir}/man1/aliyun-img-utils-image-copy-blob.1%{?ext_man}
 %{_mandir}/man1/aliyun-img-utils-image.1%{?ext_man}
+%{_mandir}/man1/aliyun-img-utils-serve.1%{?ext_man}
 %{_mandir}/man1/aliyun-img-utils.1%{?ext_man}
 %{_bindir}/%{upstream_name}
 %{_sitelibdir}/aliyun_img_utils/
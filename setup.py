@@ -59,6 +59,7 @@ setup(
     python_requires='>=3.8',
     install_requires=requirements,
     extras_require={
+        'async': ['aiohttp'],
         'dev': dev_requirements,
         'test': test_requirements
     },
@@ -28,7 +28,12 @@ from unittest.mock import patch, Mock
 
 from pytest import raises
 
+from aliyun_img_utils.aliyun_clock import VirtualClock
 from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_inventory import ImageInventory
+from aliyun_img_utils.aliyun_operations import ImageOperationPoller
+from aliyun_img_utils.aliyun_replication import RegionTopology
+from aliyun_img_utils.aliyun_scheduler import ImageJobScheduler
 from aliyun_img_utils.aliyun_exceptions import (
     AliyunException,
     AliyunImageException,
@@ -55,7 +60,14 @@ class TestAliyunImage(object):
         mock_bucket_client.return_value = client
         assert self.image.bucket_client
 
+        # Auth is validated once per bucket and endpoint
+        self.image._bucket_client = None
+        assert self.image.bucket_client
+        assert client.get_bucket_info.call_count == 1
+
         # Server Error
+        client = Mock()
+        mock_bucket_client.return_value = client
         client.get_bucket_info.side_effect = oss2.exceptions.ServerError(
             'Failed', Mock(), Mock(), {'Message': 'Failed'}
         )
@@ -167,6 +179,30 @@ class TestAliyunImage(object):
                 force_replace_image=True
             )
 
+    @patch.object(AliyunImage, 'wait_on_blob')
+    @patch('aliyun_img_utils.aliyun_image.aliyun_transfer.put_blob_async')
+    def test_upload_image_tarball_async(self, mock_put_blob, mock_wait):
+        client = Mock()
+        client.get_object_meta.side_effect = oss2.exceptions.NoSuchKey(
+            {}, {}, {}, {}
+        )
+        self.image._bucket_client = client
+
+        assert self.image.upload_image_tarball(
+            'tests/data/blob.qcow2',
+            transfer_engine='async',
+            max_concurrency=4
+        ) == 'blob.qcow2'
+
+        args, kwargs = mock_put_blob.call_args
+        assert args[1:] == (
+            'test-bucket',
+            'https://oss-accelerate.aliyuncs.com',
+            'blob.qcow2',
+            'tests/data/blob.qcow2'
+        )
+        assert kwargs['max_concurrency'] == 4
+
     @patch.object(AliyunImage, 'get_compute_image')
     def test_delete_compute_image(self, mock_get_image):
         image = {
@@ -444,6 +480,15 @@ class TestAliyunImage(object):
         # Available state
         self.image.wait_on_compute_image('m-123')
 
+        # Not found fails after the grace period, not the timeout
+        self.image.clock = VirtualClock(start=1700000000)
+        mock_get_image.side_effect = AliyunImageException('Not found')
+
+        with raises(AliyunImageException):
+            self.image.wait_on_compute_image('m-123', not_found_timeout=60)
+
+        assert self.image.clock.time() < 1700000000 + 120
+
     @patch.object(AliyunImage, 'get_compute_image')
     def test_get_share_permission(self, mock_get_image):
         image = {'ImageId': 'm-123', 'Status': 'Available'}
@@ -460,3 +505,533 @@ class TestAliyunImage(object):
         client.do_action_with_exception.side_effect = Exception
         with raises(AliyunImageException):
             self.image.describe_share_permission('m-123')
+
+    def test_get_compute_images(self):
+        page1 = {
+            'TotalCount': 101,
+            'Images': {
+                'Image': [{'ImageId': f'm-{i}'} for i in range(100)]
+            }
+        }
+        page2 = {'TotalCount': 101, 'Images': {'Image': [{'ImageId': 'x'}]}}
+
+        client = Mock()
+        client.do_action_with_exception.side_effect = [
+            json.dumps(page1),
+            json.dumps(page2)
+        ]
+        self.image._compute_client = client
+
+        images = self.image.get_compute_images(
+            image_ids=['m-1'],
+            tags=[{'Key': 'Removal date'}],
+            filters=[{'Key': 'CreationStartTime', 'Value': '2026'}]
+        )
+        assert len(images) == 101
+        assert client.do_action_with_exception.call_count == 2
+
+        # List failure
+        client.do_action_with_exception.side_effect = Exception
+        with raises(AliyunImageException):
+            self.image.get_compute_images()
+
+    @patch('aliyun_img_utils.aliyun_image.sdk_client.AcsClient')
+    def test_get_compute_client_for_region(self, mock_acs):
+        client = Mock()
+        self.image._compute_client = client
+
+        assert self.image._get_compute_client('cn-beijing') == client
+        assert self.image._get_compute_client('cn-shanghai').client == \
+            mock_acs.return_value
+
+        # Region clients are cached
+        self.image._get_compute_client('cn-shanghai')
+        assert mock_acs.call_count == 1
+
+        mock_acs.side_effect = Exception('Invalid!')
+        with raises(AliyunException):
+            self.image._get_compute_client('cn-hangzhou')
+
+    @patch.object(AliyunImage, 'get_compute_images')
+    @patch.object(AliyunImage, 'get_regions')
+    def test_get_image_inventory(self, mock_get_regions, mock_get_images):
+        mock_get_regions.return_value = ['cn-beijing', 'cn-shanghai']
+
+        def get_images(region):
+            if region == 'cn-shanghai':
+                raise AliyunImageException('Failed')
+            return [{'ImageId': 'm-123', 'ImageName': 'test-image'}]
+
+        mock_get_images.side_effect = get_images
+
+        with ImageInventory() as inventory:
+            counts = self.image.get_image_inventory(inventory)
+            assert counts == {'cn-beijing': 1}
+            assert inventory.query(image_name='test-image')
+
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_get_image_inventory_incremental(self, mock_get_images):
+        inventory = ImageInventory()
+        inventory.replace_region(
+            'cn-beijing',
+            [
+                {
+                    'ImageId': 'm-1',
+                    'Status': 'Creating',
+                    'CreationTime': '2026-01-01T10:15:32Z'
+                },
+                {
+                    'ImageId': 'm-2',
+                    'Status': 'Available',
+                    'CreationTime': '2026-01-01T09:00:00Z'
+                }
+            ]
+        )
+
+        def get_images(region, image_ids=None, filters=None):
+            if region == 'cn-shanghai':
+                return [{'ImageId': 'm-5', 'Status': 'Available'}]
+            if filters:
+                assert filters[0]['Value'] == '2026-01-01T10:15Z'
+                return [{
+                    'ImageId': 'm-3',
+                    'Status': 'Available',
+                    'CreationTime': '2026-01-02T00:00:00Z'
+                }]
+            # All known images are rechecked, m-2 has been deleted
+            assert sorted(image_ids) == ['m-1', 'm-2']
+            return [{
+                'ImageId': 'm-1',
+                'Status': 'Available',
+                'CreationTime': '2026-01-01T10:15:32Z'
+            }]
+
+        mock_get_images.side_effect = get_images
+
+        counts = self.image.get_image_inventory(
+            inventory,
+            regions=['cn-beijing', 'cn-shanghai'],
+            incremental=True
+        )
+        assert counts == {'cn-beijing': 2, 'cn-shanghai': 1}
+        assert sorted(
+            image['ImageId'] for image in inventory.query()
+        ) == ['m-1', 'm-3', 'm-5']
+        inventory.close()
+
+    @patch('aliyun_img_utils.aliyun_image.get_todays_date')
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_get_expired_images(self, mock_get_images, mock_todays_date):
+        mock_todays_date.return_value = '20260601'
+
+        def get_images(region, tags=None):
+            assert tags == [{'Key': 'Removal date'}]
+            if region == 'cn-shanghai':
+                raise AliyunImageException('Failed')
+            return [
+                {
+                    'ImageId': 'm-1',
+                    'Tags': {'Tag': [
+                        {'TagKey': 'Removal date', 'TagValue': '20260501'}
+                    ]}
+                },
+                {
+                    'ImageId': 'm-2',
+                    'Tags': {'Tag': [
+                        {'TagKey': 'Removal date', 'TagValue': '20261201'}
+                    ]}
+                },
+                {
+                    # Kept on the removal date itself
+                    'ImageId': 'm-3',
+                    'Tags': {'Tag': [
+                        {'TagKey': 'Removal date', 'TagValue': '20260601'}
+                    ]}
+                }
+            ]
+
+        mock_get_images.side_effect = get_images
+
+        expired = self.image.get_expired_images(
+            regions=['cn-beijing', 'cn-shanghai']
+        )
+        assert list(expired) == ['cn-beijing']
+        assert [image['ImageId'] for image in expired['cn-beijing']] == \
+            ['m-1']
+
+    @patch.object(AliyunImage, 'wait_on_compute_images_delete')
+    @patch.object(AliyunImage, '_delete_image')
+    @patch.object(AliyunImage, 'get_expired_images')
+    def test_delete_expired_images(
+        self,
+        mock_get_expired,
+        mock_delete_image,
+        mock_wait_delete
+    ):
+        mock_get_expired.return_value = {
+            'cn-beijing': [
+                {'ImageId': 'm-1', 'ImageName': 'image-1'},
+                {'ImageId': 'm-2', 'ImageName': 'image-2'}
+            ],
+            'cn-shanghai': []
+        }
+
+        # Dry run
+        result = self.image.delete_expired_images(dry_run=True)
+        assert result == {
+            'cn-beijing': ['image-1', 'image-2'],
+            'cn-shanghai': []
+        }
+        assert mock_delete_image.call_count == 0
+
+        def delete_image(image_id, force=False, region=None):
+            if image_id == 'm-2':
+                raise AliyunImageException('Failed')
+
+        mock_delete_image.side_effect = delete_image
+        mock_wait_delete.side_effect = AliyunImageException('Timeout')
+
+        result = self.image.delete_expired_images()
+        assert result == {'cn-beijing': ['image-1'], 'cn-shanghai': []}
+        mock_wait_delete.assert_called_once_with(['m-1'], region='cn-beijing')
+
+    def test_delete_image(self):
+        client = Mock()
+        self.image._compute_client = client
+
+        self.image._delete_image('m-123', force=True)
+
+        # Delete failure
+        client.do_action_with_exception.side_effect = Exception
+        with raises(AliyunImageException):
+            self.image._delete_image('m-123')
+
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_wait_on_compute_images_delete(self, mock_get_images):
+        self.image.clock = VirtualClock()
+        mock_get_images.side_effect = [
+            [{'ImageId': 'm-1'}],
+            []
+        ]
+
+        self.image.wait_on_compute_images_delete(['m-1', 'm-2'])
+        assert mock_get_images.call_count == 2
+        assert self.image.clock.slept == 10
+
+        # Timeout
+        mock_get_images.side_effect = None
+        mock_get_images.return_value = [{'ImageId': 'm-1'}]
+        with raises(AliyunImageException):
+            self.image.wait_on_compute_images_delete(['m-1'])
+
+    @patch('aliyun_img_utils.aliyun_image.time.time')
+    @patch('aliyun_img_utils.aliyun_image.oss2.ObjectIterator')
+    def test_list_storage_blobs(self, mock_iterator, mock_time):
+        mock_time.return_value = 10 * 86400
+
+        # The virtual clock of the waiters is not used for blob times
+        self.image.clock = VirtualClock(100 * 86400)
+        mock_iterator.return_value = [
+            oss2.models.SimplifiedObjectInfo(
+                'old.qcow2', 86400, 'etag', 'Normal', 10, 'Standard'
+            ),
+            oss2.models.SimplifiedObjectInfo(
+                'new.qcow2', 9 * 86400, 'etag', 'Normal', 10, 'Standard'
+            )
+        ]
+        self.image._bucket_client = Mock()
+
+        blobs = list(self.image.list_storage_blobs('', older_than=5))
+        assert [blob.key for blob in blobs] == ['old.qcow2']
+
+        blobs = list(self.image.list_storage_blobs(''))
+        assert len(blobs) == 2
+
+        # List failure
+        mock_iterator.side_effect = oss2.exceptions.RequestError('Failed')
+        with raises(AliyunImageException):
+            list(self.image.list_storage_blobs(''))
+
+    def test_delete_storage_blobs(self):
+        client = Mock()
+        self.image._bucket_client = client
+
+        def batch_delete(keys):
+            if 'fail-0' in keys:
+                raise oss2.exceptions.RequestError('Failed')
+            return Mock(deleted_keys=keys)
+
+        client.batch_delete_objects.side_effect = batch_delete
+        callback = Mock()
+
+        names = [f'blob-{index}' for index in range(2500)]
+        deleted = self.image.delete_storage_blobs(
+            names,
+            progress_callback=callback
+        )
+        assert sorted(deleted) == sorted(names)
+        assert client.batch_delete_objects.call_count == 3
+        assert callback.call_count == 5
+
+        # Batch failure
+        deleted = self.image.delete_storage_blobs(['fail-0', 'blob-1'])
+        assert deleted == []
+
+    @patch.object(AliyunImage, 'import_compute_image')
+    def test_create_compute_image_no_wait(self, mock_import_image):
+        mock_import_image.return_value = 'm-123'
+        poller = Mock()
+        self.image.operation_poller = poller
+
+        operation = self.image.create_compute_image(
+            'test-image',
+            'test description',
+            'test-blob.qcow2',
+            'SLES',
+            wait=False
+        )
+        assert operation.image_id == 'm-123'
+        assert operation.region == 'cn-beijing'
+        poller.add.assert_called_once_with(operation)
+
+    @patch.object(AliyunImage, 'get_compute_images')
+    @patch.object(AliyunImage, 'get_compute_image')
+    def test_copy_compute_image_operation(
+        self,
+        mock_get_image,
+        mock_get_images
+    ):
+        mock_get_image.return_value = {
+            'ImageId': 'm-123',
+            'Description': 'Test image'
+        }
+        mock_get_images.return_value = [
+            {'ImageId': 'm-321', 'Status': 'Available'}
+        ]
+
+        client = Mock()
+        client.do_action_with_exception.return_value = json.dumps(
+            {'ImageId': 'm-321'}
+        )
+        self.image._compute_client = client
+        self.image.operation_poller = ImageOperationPoller(interval=0.01)
+
+        # Default returns the id without waiting
+        assert self.image.copy_compute_image(
+            'test-image',
+            'cn-shanghai'
+        ) == 'm-321'
+
+        operation = self.image.copy_compute_image(
+            'test-image',
+            'cn-shanghai',
+            wait=False
+        )
+        assert operation.result(timeout=5) == 'm-321'
+        assert operation.done()
+
+        assert self.image.copy_compute_image(
+            'test-image',
+            'cn-shanghai',
+            wait=True
+        ) == 'm-321'
+
+    @patch.object(AliyunImage, 'copy_compute_image')
+    def test_replicate_image_scheduler(self, mock_copy_image):
+        def copy_image(name, region, wait=None):
+            assert wait is True
+            if region == 'cn-hangzhou':
+                raise AliyunImageException('Failed')
+            return f'm-{region}'
+
+        mock_copy_image.side_effect = copy_image
+
+        with ImageJobScheduler(max_per_region=1) as scheduler:
+            images = self.image.replicate_image(
+                'test-image',
+                regions=['cn-beijing', 'cn-shanghai', 'cn-hangzhou'],
+                scheduler=scheduler
+            )
+
+        assert images == {
+            'cn-shanghai': 'm-cn-shanghai',
+            'cn-hangzhou': None
+        }
+
+    @patch.object(AliyunImage, 'copy_compute_image')
+    def test_replicate_image_tree(self, mock_copy_image):
+        copies = []
+
+        def copy_image(name, region, wait=None, source_region=None):
+            assert wait is True
+            copies.append((source_region, region))
+            if region == 'eu-west-1':
+                raise AliyunImageException('Failed')
+            return f'm-{region}'
+
+        mock_copy_image.side_effect = copy_image
+
+        topology = RegionTopology()
+        images = self.image.replicate_image(
+            'test-image',
+            regions=[
+                'cn-shanghai',
+                'eu-central-1',
+                'eu-west-1',
+                'eu-north-1'
+            ],
+            strategy='tree',
+            topology=topology
+        )
+
+        assert images == {
+            'cn-shanghai': 'm-cn-shanghai',
+            'eu-central-1': 'm-eu-central-1',
+            'eu-west-1': None,
+            'eu-north-1': 'm-eu-north-1'
+        }
+
+        # One cross continent copy then copies within europe
+        assert ('cn-beijing', 'cn-shanghai') in copies
+        assert ('cn-beijing', 'eu-central-1') in copies
+        assert ('eu-central-1', 'eu-north-1') in copies
+        assert ('eu-central-1', 'eu-west-1') in copies
+        assert ('cn-beijing', 'eu-central-1') in topology.measured
+
+    @patch.object(AliyunImage, 'copy_compute_image')
+    def test_replicate_image_tree_scheduler(self, mock_copy_image):
+        mock_copy_image.return_value = 'm-123'
+
+        with ImageJobScheduler() as scheduler:
+            images = self.image.replicate_image(
+                'test-image',
+                regions=['cn-shanghai', 'eu-central-1'],
+                scheduler=scheduler,
+                strategy='tree'
+            )
+
+        assert images == {'cn-shanghai': 'm-123', 'eu-central-1': 'm-123'}
+
+    def test_copy_compute_image_from_source_region(self):
+        client = Mock()
+        client.do_action_with_exception.side_effect = [
+            json.dumps({
+                'Images': {
+                    'Image': [
+                        {'ImageId': 'm-123', 'Description': 'Test image'}
+                    ]
+                }
+            }),
+            json.dumps({'ImageId': 'm-321'})
+        ]
+        self.image._region_clients['cn-shanghai'] = client
+
+        assert self.image.copy_compute_image(
+            'test-image',
+            'cn-hangzhou',
+            source_region='cn-shanghai'
+        ) == 'm-321'
+        request = client.do_action_with_exception.call_args[0][0]
+        assert request.get_query_params()['ImageId'] == 'm-123'
+
+    @patch.object(AliyunImage, 'copy_compute_image')
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_replicate_image_skip_existing(
+        self,
+        mock_get_images,
+        mock_copy_image
+    ):
+        def get_images(region, image_name=None):
+            assert image_name == 'test-image'
+            if region == 'cn-hangzhou':
+                raise AliyunImageException('Throttled')
+            elif region == 'cn-shanghai':
+                return [
+                    {'ImageId': 'm-similar', 'ImageName': 'test-image-v2'},
+                    {'ImageId': 'm-existing', 'ImageName': 'test-image'}
+                ]
+            # Images with a similar name are not the image
+            return [{'ImageId': 'm-similar', 'ImageName': 'test-image-v2'}]
+
+        mock_get_images.side_effect = get_images
+        mock_copy_image.return_value = 'm-new'
+
+        images = self.image.replicate_image(
+            'test-image',
+            regions=['cn-shanghai', 'cn-hangzhou', 'eu-central-1'],
+            skip_existing=True
+        )
+
+        assert images == {
+            'cn-shanghai': 'm-existing',
+            'cn-hangzhou': None,
+            'eu-central-1': 'm-new'
+        }
+        mock_copy_image.assert_called_once_with('test-image', 'eu-central-1')
+
+        with raises(AliyunImageException):
+            self.image.replicate_image(
+                'test-image',
+                skip_existing=True,
+                force_replace_image=True
+            )
+
+    @patch.object(AliyunImage, 'wait_on_compute_images_delete')
+    @patch.object(AliyunImage, '_delete_image')
+    @patch.object(AliyunImage, 'copy_compute_image')
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_replicate_image_force_replace(
+        self,
+        mock_get_images,
+        mock_copy_image,
+        mock_delete_image,
+        mock_wait_on_delete
+    ):
+        def get_images(region, image_name=None):
+            return [{'ImageId': f'm-{region}', 'ImageName': image_name}]
+
+        def delete_image(image_id, region=None):
+            if region == 'cn-hangzhou':
+                raise AliyunImageException('Image in use')
+
+        mock_get_images.side_effect = get_images
+        mock_delete_image.side_effect = delete_image
+        mock_copy_image.return_value = 'm-new'
+
+        images = self.image.replicate_image(
+            'test-image',
+            regions=['cn-shanghai', 'cn-hangzhou'],
+            force_replace_image=True
+        )
+
+        assert images == {'cn-shanghai': 'm-new', 'cn-hangzhou': None}
+        mock_wait_on_delete.assert_called_once_with(
+            ['m-cn-shanghai'],
+            region='cn-shanghai'
+        )
+        mock_copy_image.assert_called_once_with('test-image', 'cn-shanghai')
+
+    @patch.object(AliyunImage, 'get_compute_image')
+    def test_wait_on_compute_image_progress(self, mock_get_image):
+        clock = Mock(wraps=VirtualClock())
+        self.image.clock = clock
+        mock_get_image.side_effect = [
+            AliyunImageException('Not found'),
+            {'Status': 'Creating', 'Progress': '10%'},
+            {'Status': 'Creating', 'Progress': '70%'},
+            {'Status': 'Creating', 'Progress': '95%'},
+            {'Status': 'Available', 'Progress': '100%'}
+        ]
+        callback = Mock()
+
+        self.image.wait_on_compute_image(
+            'm-123',
+            progress_callback=callback
+        )
+
+        assert [call[0][0] for call in callback.call_args_list] == [
+            0, 10, 70, 95, 100
+        ]
+        sleeps = [call[0][0] for call in clock.sleep.call_args_list]
+        assert sleeps[:2] == [30, 60]
+        assert sleeps[-1] < sleeps[-2]
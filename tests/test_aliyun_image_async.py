@@ -0,0 +1,235 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils async class tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+from unittest.mock import patch, AsyncMock
+
+from pytest import raises
+
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_image_async import AsyncAliyunImage
+from aliyun_img_utils.aliyun_exceptions import AliyunImageException
+
+
+@patch('aliyun_img_utils.aliyun_image_async.asyncio.sleep', new=AsyncMock())
+class TestAsyncAliyunImage(object):
+    """Test async Aliyun Image class."""
+
+    def setup_method(self):
+        self.image = AsyncAliyunImage(
+            '12345',
+            '54321',
+            'cn-beijing',
+            bucket_name='test-bucket'
+        )
+
+    def teardown_method(self):
+        self.image.close()
+
+    def test_get_image(self):
+        image = self.image.get_image()
+        assert image.region == 'cn-beijing'
+        assert image.bucket_name == 'test-bucket'
+        assert self.image.get_image('cn-beijing') is image
+        assert self.image.get_image('cn-shanghai').region == 'cn-shanghai'
+
+    @patch.object(AliyunImage, 'import_compute_image')
+    @patch.object(AliyunImage, 'get_compute_image')
+    @patch.object(AliyunImage, 'image_exists')
+    def test_create_compute_image(
+        self,
+        mock_image_exists,
+        mock_get_image,
+        mock_import_image
+    ):
+        mock_image_exists.return_value = False
+        mock_import_image.return_value = 'm-123'
+        mock_get_image.side_effect = [
+            AliyunImageException('Not found'),
+            {'ImageId': 'm-123', 'Status': 'Creating'},
+            {'ImageId': 'm-123', 'Status': 'Available'}
+        ]
+
+        image_id = asyncio.run(
+            self.image.create_compute_image(
+                'test-image',
+                'test description',
+                'test-blob.qcow2',
+                'SLES',
+                force_replace_image=True,
+                region='cn-shanghai',
+                nvme_support=True
+            )
+        )
+        assert image_id == 'm-123'
+        assert mock_get_image.call_count == 3
+
+    @patch.object(AliyunImage, 'get_compute_image')
+    def test_wait_on_compute_image(self, mock_get_image):
+        mock_get_image.return_value = {'Status': 'CreateFailed'}
+
+        with raises(AliyunImageException):
+            asyncio.run(self.image.wait_on_compute_image('m-123'))
+
+        # Timeout
+        mock_get_image.return_value = {'Status': 'Creating'}
+
+        with raises(AliyunImageException):
+            asyncio.run(
+                self.image.wait_on_compute_image('m-123', timeout=0)
+            )
+
+        # Not found
+        mock_get_image.side_effect = AliyunImageException('Not found')
+
+        with raises(AliyunImageException):
+            asyncio.run(
+                self.image.wait_on_compute_image(
+                    'm-123',
+                    not_found_timeout=0
+                )
+            )
+
+    @patch.object(AliyunImage, 'get_compute_image')
+    def test_wait_on_compute_image_deadline(self, mock_get_image):
+        mock_get_image.side_effect = [
+            {'Status': 'Creating'},
+            {'Status': 'Available'}
+        ]
+
+        with patch(
+            'aliyun_img_utils.aliyun_image_async.asyncio.sleep',
+            new=AsyncMock()
+        ) as mock_sleep:
+            asyncio.run(
+                self.image.wait_on_compute_image('m-123', timeout=5)
+            )
+
+        # The default interval of 30 seconds ends at the deadline
+        assert 0 < mock_sleep.call_args[0][0] <= 5
+
+    @patch.object(AliyunImage, 'image_tarball_exists')
+    def test_wait_on_blob(self, mock_tarball_exists):
+        mock_tarball_exists.side_effect = [False, True]
+        asyncio.run(self.image.wait_on_blob('blob.qcow2'))
+        assert mock_tarball_exists.call_count == 2
+
+    @patch.object(AliyunImage, '_delete_image')
+    @patch.object(AliyunImage, 'get_compute_image')
+    def test_delete_compute_image_in_regions(
+        self,
+        mock_get_image,
+        mock_delete_image
+    ):
+        def get_image(image_name=None, image_id=None, status=None):
+            if image_id:
+                raise AliyunImageException('Deleted')
+            return {'ImageId': 'm-123'}
+
+        mock_get_image.side_effect = get_image
+        mock_delete_image.side_effect = [
+            None,
+            AliyunImageException('Failed')
+        ]
+
+        result = asyncio.run(
+            self.image.delete_compute_image_in_regions(
+                'test-image',
+                regions=['cn-beijing', 'cn-shanghai']
+            )
+        )
+        assert result == {'cn-beijing': True, 'cn-shanghai': None}
+
+        # Image not exists
+        mock_get_image.side_effect = AliyunImageException('Not found')
+        assert asyncio.run(
+            self.image.delete_compute_image('test-image')
+        ) is False
+
+    @patch.object(AliyunImage, 'get_compute_image')
+    @patch.object(AliyunImage, 'copy_compute_image')
+    @patch.object(AliyunImage, 'get_regions')
+    def test_replicate_image(
+        self,
+        mock_get_regions,
+        mock_copy_image,
+        mock_get_image
+    ):
+        mock_get_regions.return_value = ['cn-beijing', 'cn-shanghai']
+        mock_copy_image.return_value = 'm-321'
+        mock_get_image.return_value = {'Status': 'Available'}
+
+        result = asyncio.run(
+            self.image.replicate_image('test-image', wait=True)
+        )
+        assert result == {'cn-shanghai': 'm-321'}
+        mock_copy_image.assert_called_once_with('test-image', 'cn-shanghai')
+
+    @patch.object(AliyunImage, 'activate_image')
+    @patch.object(AliyunImage, 'deprecate_image')
+    @patch.object(AliyunImage, 'publish_image')
+    def test_regions_actions(
+        self,
+        mock_publish_image,
+        mock_deprecate_image,
+        mock_activate_image
+    ):
+        regions = ['cn-beijing', 'cn-shanghai']
+
+        asyncio.run(
+            self.image.publish_image_to_regions(
+                'test-image',
+                'VISIBLE',
+                regions=regions
+            )
+        )
+        assert mock_publish_image.call_count == 2
+
+        asyncio.run(
+            self.image.deprecate_image_in_regions(
+                'test-image',
+                regions=regions,
+                replacement_image='test-image-v2'
+            )
+        )
+        mock_deprecate_image.assert_called_with('test-image', 'test-image-v2')
+
+        mock_activate_image.side_effect = AliyunImageException('Failed')
+        result = asyncio.run(
+            self.image.activate_image_in_regions('test-image', regions)
+        )
+        assert result == {'cn-beijing': None, 'cn-shanghai': None}
+
+    @patch.object(AliyunImage, 'upload_image_tarball')
+    def test_upload_image_tarball(self, mock_upload):
+        mock_upload.return_value = 'blob.qcow2'
+
+        async def run():
+            async with self.image as image:
+                return await image.upload_image_tarball(
+                    'tests/data/blob.vhd',
+                    blob_name='blob.qcow2'
+                )
+
+        assert asyncio.run(run()) == 'blob.qcow2'
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils benchmark tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import importlib.util
+import json
+import os
+
+BENCHMARKS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'benchmarks'
+)
+
+
+def load_benchmark(name):
+    spec = importlib.util.spec_from_file_location(
+        name,
+        os.path.join(BENCHMARKS, f'{name}.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_create_sparse_image(tmp_path):
+    upload_benchmark = load_benchmark('upload_benchmark')
+    path = str(tmp_path / 'sparse.raw')
+    upload_benchmark.create_image(path, 'sparse', 130 * 1024 * 1024)
+
+    assert os.path.getsize(path) == 130 * 1024 * 1024
+    assert os.stat(path).st_blocks * 512 < 10 * 1024 * 1024
+
+
+def test_upload_benchmark(tmp_path):
+    upload_benchmark = load_benchmark('upload_benchmark')
+    report = upload_benchmark.run_benchmark(
+        sizes=[0.002],
+        kinds=['dense'],
+        part_sizes=[1],
+        concurrency=[2],
+        bandwidth=None,
+        rtt=0,
+        work_dir=str(tmp_path)
+    )
+
+    assert report['benchmark'] == 'upload'
+    result = report['results'][0]
+    assert result['engine'] == 'sync'
+    assert result['parts'] == 3
+    assert result['mb_per_s'] > 0
+    assert result['cpu_seconds_per_gb'] > 0
+    assert result['peak_rss_mb'] > 0
+
+
+def test_fanout_benchmark():
+    fanout_benchmark = load_benchmark('fanout_benchmark')
+    report = fanout_benchmark.run_benchmark(
+        [2],
+        latency=0,
+        remote_latency=0,
+        delete_time=10
+    )
+    results = {
+        result['operation']: result for result in report['results']
+    }
+
+    assert results['replicate']['api_calls_by_action'] == {
+        'CopyImage': 2,
+        'DescribeImages': 2
+    }
+    assert results['publish']['api_calls_by_action'][
+        'ModifyImageSharePermission'
+    ] == 3
+    assert results['delete']['api_calls_by_action']['DeleteImage'] == 3
+    assert results['delete']['waiter_sleep_seconds'] == 30
+
+    assert fanout_benchmark.compare_results(report, report) == []
+
+    baseline = json.loads(json.dumps(report))
+    results['delete']['api_calls_by_action']['DescribeImages'] += 1
+    results['delete']['wall_seconds'] += 100
+    regressions = fanout_benchmark.compare_results(report, baseline)
+    assert len(regressions) == 2
+    assert 'DescribeImages calls increased' in regressions[0]
+
+
+def test_startup_benchmark():
+    startup_benchmark = load_benchmark('startup_benchmark')
+    report = startup_benchmark.run_benchmark(['version', 'info'], repeat=1)
+
+    assert report['import']['sdk_modules_loaded'] == []
+    assert report['import']['cli_import']['min'] > 0
+    assert report['commands']['version']['first_request'] is None
+    assert report['commands']['info']['requests'] == 1
+    assert report['commands']['info']['first_request']['min'] > 0
@@ -21,7 +21,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from unittest.mock import patch, MagicMock
+import pstats
+
+from unittest.mock import patch, MagicMock, Mock
 
 from aliyun_img_utils.aliyun_cli import main
 from aliyun_img_utils.aliyun_exceptions import AliyunException
@@ -78,6 +80,80 @@ def test_cli_upload_tarball(mock_img_class):
     assert 'Image uploaded' in result.output
 
 
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_upload_tarball_async(mock_img_class, tmp_path):
+    report = str(tmp_path / 'report.json')
+    image_class = MagicMock()
+    mock_img_class.return_value = image_class
+    image_class.upload_image_tarball.return_value = 'blob_name.vhd'
+
+    args = [
+        'image', 'upload', '--blob-name', 'test.vhd', '--access-key',
+        '12345', '--access-secret', '54321', '--region', 'cn-beijing',
+        '--bucket-name', 'test-bucket', '--image-file', 'tests/data/blob.vhd',
+        '--transfer-engine', 'async', '--max-concurrency', '4',
+        '--transfer-stats', '--transfer-report', report
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert 'Image uploaded' in result.output
+
+    kwargs = image_class.upload_image_tarball.call_args[1]
+    assert kwargs['transfer_engine'] == 'async'
+    assert kwargs['max_concurrency'] == 4
+    image_class.transfer_telemetry.format_summary.assert_called_once_with()
+    image_class.transfer_telemetry.write_json.assert_called_once_with(
+        report
+    )
+
+    # The report is written for failed uploads too
+    image_class.transfer_telemetry.write_json.reset_mock()
+    image_class.upload_image_tarball.side_effect = Exception('Upload failed')
+    result = runner.invoke(main, args)
+    assert result.exit_code == 1
+    image_class.transfer_telemetry.write_json.assert_called_once_with(
+        report
+    )
+
+    # The async engine can't upload to multiple buckets
+    result = runner.invoke(
+        main,
+        args[:16] + ['--destination', 'images-sh:cn-shanghai']
+    )
+    assert result.exit_code == 2
+    assert 'does not support --destination' in result.output
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_upload_tarball_destination(mock_img_class):
+    image_class = MagicMock()
+    mock_img_class.return_value = image_class
+    image_class.upload_image_tarball_to_buckets.return_value = 'test.vhd'
+
+    args = [
+        'image', 'upload', '--blob-name', 'test.vhd', '--access-key',
+        '12345', '--access-secret', '54321', '--region', 'cn-beijing',
+        '--bucket-name', 'test-bucket', '--image-file', 'tests/data/blob.vhd'
+    ]
+
+    # Fan out to destination buckets
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        args + ['--destination', 'images-sh:cn-shanghai']
+    )
+    assert result.exit_code == 0
+    assert image_class.upload_image_tarball_to_buckets.call_args[0][1] == [
+        ('test-bucket', 'cn-beijing'),
+        ('images-sh', 'cn-shanghai')
+    ]
+
+    result = runner.invoke(main, args + ['--destination', 'images'])
+    assert result.exit_code == 2
+
+
 @patch('aliyun_img_utils.aliyun_cli.AliyunImage')
 def test_cli_create_image(mock_img_class):
     image_class = MagicMock()
@@ -137,6 +213,54 @@ def test_cli_replicate_image(mock_img_class):
     assert result.exit_code == 0
     assert 'ami-123' in result.output
 
+    # At least one copy has to run at a time
+    result = runner.invoke(main, args + ['--max-concurrency', '0'])
+    assert result.exit_code == 2
+    assert 'x>=1' in result.output
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_replicate_image_skip_existing(mock_img_class):
+    image_class = MagicMock()
+    image_class.replicate_image.return_value = {'cn-shanghai': 'ami-321'}
+    mock_img_class.return_value = image_class
+
+    args = [
+        'image', 'replicate', '--image-name', 'test-image',
+        '--regions', 'cn-beijing,cn-shanghai'
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert not image_class.replicate_image.call_args[1]['skip_existing']
+
+    result = runner.invoke(main, args + ['--skip-existing'])
+    assert result.exit_code == 0
+    assert image_class.replicate_image.call_args[1]['skip_existing']
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_replicate_image_simulate(mock_img_class, tmp_path):
+    image_class = MagicMock()
+    mock_img_class.return_value = image_class
+
+    topology = tmp_path / 'topology.yaml'
+    topology.write_text('cross_group: 1800\n')
+
+    args = [
+        'image', 'replicate', '--image-name', 'test-image',
+        '--regions', 'cn-beijing,eu-central-1,eu-west-1',
+        '--strategy', 'tree', '--topology', str(topology),
+        '--simulate'
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert '"total_time": 2400.0' in result.output
+    assert not image_class.replicate_image.called
+
 
 @patch('aliyun_img_utils.aliyun_cli.AliyunImage')
 def test_cli_publish_image(mock_img_class):
@@ -202,3 +326,147 @@ def test_cli_share_permission(mock_img_class):
     runner = CliRunner()
     result = runner.invoke(main, args)
     assert result.exit_code == 0
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_profile(mock_img_class, tmp_path):
+    image_class = MagicMock()
+    image_class.describe_share_permission.return_value = '{}'
+    mock_img_class.return_value = image_class
+    cpu_file = tmp_path / 'cpu.pstats'
+    mem_file = tmp_path / 'mem.txt'
+
+    args = [
+        '--profile-cpu', str(cpu_file), '--profile-mem', str(mem_file),
+        'image', 'share-permission', '--image-name', 'test-image'
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert f'CPU profile written to {cpu_file}' in result.output
+    assert 'function calls' in result.output
+    assert 'Peak traced memory' in result.output
+
+    stats = pstats.Stats(str(cpu_file))
+    assert stats.total_calls > 0
+    assert 'Top 50 allocations by line' in mem_file.read_text()
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_inventory(mock_img_class, tmp_path):
+    image_class = MagicMock()
+    mock_img_class.return_value = image_class
+
+    args = [
+        'image', 'inventory', '--regions', 'cn-beijing,cn-shanghai',
+        '--inventory-file', str(tmp_path / 'inventory.db'),
+        '--tag', 'Removal date', '--incremental'
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert image_class.get_image_inventory.call_count == 1
+
+    # Query cached inventory only
+    args = [
+        'image', 'inventory', '--cached', '--image-name', 'test-*',
+        '--inventory-file', str(tmp_path / 'inventory.db')
+    ]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert result.output.strip().endswith('[]')
+    assert image_class.get_image_inventory.call_count == 1
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_gc(mock_img_class):
+    image_class = MagicMock()
+    image_class.delete_expired_images.return_value = {
+        'cn-beijing': ['image-1', 'image-2']
+    }
+    mock_img_class.return_value = image_class
+
+    args = ['image', 'gc', '--regions', 'cn-beijing', '--dry-run']
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert 'Expired images: 2' in result.output
+
+    args = ['image', 'gc', '--max-workers', '5']
+    result = runner.invoke(main, args, input='y\n')
+    assert result.exit_code == 0
+    assert 'Deleted images: 2' in result.output
+
+    # Abort
+    result = runner.invoke(main, args, input='n\n')
+    assert result.exit_code == 0
+    assert image_class.delete_expired_images.call_count == 2
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_list_blobs(mock_img_class):
+    image_class = MagicMock()
+    image_class.list_storage_blobs.return_value = iter([
+        Mock(key='blob.qcow2', size=10, last_modified=86400)
+    ])
+    mock_img_class.return_value = image_class
+
+    args = ['image', 'list-blobs', '--prefix', 'blob', '--older-than', '5']
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert '"name": "blob.qcow2"' in result.output
+    image_class.list_storage_blobs.assert_called_once_with('blob', 5)
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_copy_blob(mock_img_class):
+    image_class = MagicMock()
+    image_class.copy_blob.return_value = 'blob.qcow2'
+    mock_img_class.return_value = image_class
+
+    args = [
+        'image', 'copy-blob', '--blob-name', 'blob.qcow2',
+        '--target-bucket', 'images-sh', '--target-region', 'cn-shanghai',
+        '--max-workers', '4'
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert 'Blob copied to images-sh as blob.qcow2' in result.output
+    assert image_class.copy_blob.call_args[1]['target_region'] == \
+        'cn-shanghai'
+
+
+@patch('aliyun_img_utils.aliyun_cli.AliyunImage')
+def test_cli_delete_blobs(mock_img_class):
+    image_class = MagicMock()
+    image_class.list_storage_blobs.side_effect = lambda *args: iter([
+        Mock(key='blob1.qcow2'),
+        Mock(key='blob2.qcow2')
+    ])
+    image_class.delete_storage_blobs.return_value = ['blob1.qcow2']
+    mock_img_class.return_value = image_class
+
+    args = ['image', 'delete-blobs', '--prefix', 'blob', '--dry-run']
+
+    runner = CliRunner()
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert 'blob2.qcow2' in result.output
+    assert image_class.delete_storage_blobs.call_count == 0
+
+    args = ['image', 'delete-blobs', '--prefix', 'blob']
+    result = runner.invoke(main, args, input='y\n')
+    assert result.exit_code == 0
+    assert 'Deleted 1 of 2 blobs' in result.output
+
+    # Abort
+    result = runner.invoke(main, args, input='n\n')
+    assert result.exit_code == 0
+    assert image_class.delete_storage_blobs.call_count == 1
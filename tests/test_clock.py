@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils clock tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+import json
+import time
+
+from collections import Counter
+from unittest.mock import patch
+
+from aliyun_img_utils.aliyun_clock import SystemClock, VirtualClock
+from aliyun_img_utils.aliyun_image import AliyunImage
+
+
+class FakeCompute(object):
+    """ECS images that take a fixed virtual time to become available."""
+
+    def __init__(self, clock, duration=600):
+        self.clock = clock
+        self.duration = duration
+        self.images = {}
+        self.calls = Counter()
+        self.ids = itertools.count()
+
+    def client(self, access_key, access_secret, region, **kwargs):
+        return FakeClient(self, region)
+
+    def add_image(self, name, region, description=''):
+        image_id = f'm-{next(self.ids)}'
+        self.images[image_id] = {
+            'ImageId': image_id,
+            'ImageName': name,
+            'Description': description,
+            'RegionId': region,
+            'created': self.clock.time()
+        }
+        return image_id
+
+    def describe(self, image):
+        elapsed = self.clock.time() - image['created']
+        progress = min(int(elapsed * 100 / self.duration), 100)
+        return dict(
+            image,
+            Status='Available' if progress == 100 else 'Creating',
+            Progress=f'{progress}%'
+        )
+
+
+class FakeClient(object):
+    def __init__(self, compute, region):
+        self.compute = compute
+        self.region = region
+
+    def do_action_with_exception(self, request):
+        action = request.get_action_name()
+        params = request.get_query_params()
+        self.compute.calls[action] += 1
+
+        if action == 'ImportImage':
+            image_id = self.compute.add_image(params['ImageName'], self.region)
+        elif action == 'CopyImage':
+            image_id = self.compute.add_image(
+                params['DestinationImageName'],
+                params['DestinationRegionId']
+            )
+        elif action == 'DescribeImages':
+            images = [
+                self.compute.describe(image)
+                for image in self.compute.images.values()
+                if image['RegionId'] == self.region and
+                params.get('ImageId', image['ImageId']) == image['ImageId']
+                and params.get('ImageName', image['ImageName']) ==
+                image['ImageName']
+            ]
+            return json.dumps({
+                'TotalCount': len(images),
+                'Images': {'Image': images}
+            })
+
+        return json.dumps({'ImageId': image_id})
+
+
+def test_system_clock():
+    clock = SystemClock()
+    assert abs(clock.time() - time.time()) < 1
+    clock.sleep(0)
+
+
+def test_virtual_clock():
+    clock = VirtualClock(100)
+    clock.sleep(30)
+    clock.advance(5)
+
+    assert clock.time() == 135
+    assert clock.sleeps == 1
+    assert clock.slept == 30
+
+
+def test_simulated_release():
+    clock = VirtualClock()
+    compute = FakeCompute(clock)
+    regions = ['cn-shanghai', 'cn-hangzhou', 'eu-central-1']
+    start = time.time()
+
+    with patch(
+        'aliyun_img_utils.aliyun_image.sdk_client.AcsClient',
+        compute.client
+    ):
+        image = AliyunImage(
+            '12345',
+            '54321',
+            'cn-beijing',
+            bucket_name='test-bucket',
+            clock=clock
+        )
+        image.create_compute_image(
+            'test-image',
+            'Test image',
+            'test-image.qcow2',
+            'SUSE'
+        )
+        images = image.replicate_image('test-image', regions=regions)
+
+        for region in regions:
+            image.region = region
+            image.wait_on_compute_image(images[region])
+
+    # Hours of simulated waiting run instantly
+    assert time.time() - start < 5
+    assert clock.time() >= 2 * compute.duration
+    assert compute.calls['ImportImage'] == 1
+    assert compute.calls['CopyImage'] == 3
+
+    # API calls per completed image
+    assert compute.calls['DescribeImages'] / 4 < 20
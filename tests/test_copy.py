@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils blob copy tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import oss2
+import pytest
+
+from aliyun_img_utils.aliyun_copy import copy_blob
+from aliyun_img_utils.aliyun_exceptions import AliyunImageException
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.testing import FakeAliyunServer
+
+PART_SIZE = 100 * 1024
+
+
+class FailingBucket(object):
+    """Bucket proxy failing copies of one part."""
+
+    def __init__(self, bucket, part_number):
+        self.bucket = bucket
+        self.part_number = part_number
+
+    def __getattr__(self, name):
+        return getattr(self.bucket, name)
+
+    def upload_part_copy(self, *args):
+        if args[-1] == self.part_number:
+            raise oss2.exceptions.RequestError('Interrupted')
+        return self.bucket.upload_part_copy(*args)
+
+
+class TestCopyBlob(object):
+    """Test blob copies against the local fake server."""
+
+    def setup_method(self, method):
+        self.server = FakeAliyunServer(regions=['cn-beijing', 'cn-shanghai'])
+        self.server.start()
+        self.server.create_bucket('images', 'cn-beijing')
+        self.server.create_bucket('images-bj', 'cn-beijing')
+        self.server.create_bucket('images-sh', 'cn-shanghai')
+        self.data = os.urandom(5 * PART_SIZE + 10)
+        self.server.put_object('images', 'image.qcow2', self.data)
+        self.image = AliyunImage(
+            'key',
+            'secret',
+            'cn-beijing',
+            bucket_name='images',
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint
+        )
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def test_copy_blob_server_side(self, tmp_path):
+        source = self.image.get_bucket_client('images', 'cn-beijing')
+        target = self.image.get_bucket_client('images-bj', 'cn-beijing')
+        progress = []
+
+        with pytest.raises(oss2.exceptions.RequestError):
+            copy_blob(
+                source,
+                FailingBucket(target, 3),
+                'image.qcow2',
+                part_size=PART_SIZE,
+                checkpoint_dir=str(tmp_path),
+                max_retries=0
+            )
+
+        assert len(os.listdir(tmp_path)) == 1
+        self.server.reset_calls()
+
+        # Resume only copies the missing part
+        copy_blob(
+            source,
+            target,
+            'image.qcow2',
+            part_size=PART_SIZE,
+            progress_callback=lambda *args, **kwargs: progress.append(args),
+            checkpoint_dir=str(tmp_path)
+        )
+
+        assert self.server.get_object('images-bj', 'image.qcow2') == self.data
+        assert self.server.calls['UploadPartCopy'] == 1
+        assert self.server.calls['InitiateMultipartUpload'] == 0
+        assert not self.server.calls['UploadPart']
+        assert sum(size for size, total in progress[1:-1]) == len(self.data)
+        assert not os.listdir(tmp_path)
+
+    def test_copy_blob_cross_region(self):
+        blob_name = self.image.copy_blob(
+            'image.qcow2',
+            'images-sh',
+            target_region='cn-shanghai',
+            target_blob_name='copy.qcow2',
+            part_size=PART_SIZE
+        )
+
+        assert blob_name == 'copy.qcow2'
+        assert self.server.get_object('images-sh', 'copy.qcow2') == self.data
+        assert self.server.calls['UploadPart'] == 6
+        assert not self.server.calls['UploadPartCopy']
+
+        with pytest.raises(AliyunImageException):
+            self.image.copy_blob(
+                'image.qcow2',
+                'images-sh',
+                target_region='cn-shanghai',
+                target_blob_name='copy.qcow2'
+            )
+
+        with pytest.raises(AliyunImageException):
+            self.image.copy_blob('missing.qcow2', 'images-bj')
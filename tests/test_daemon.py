@@ -0,0 +1,282 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils daemon tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import json
+import os
+import threading
+
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+
+from aliyun_img_utils.aliyun_cli import main
+from aliyun_img_utils.aliyun_daemon import (
+    AliyunDaemon,
+    ContextStream,
+    forward_command,
+    get_absolute_args,
+    get_socket_path,
+    is_trusted_socket,
+    send_request,
+    strip_credentials
+)
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_pool import ClientPool, get_client_pool
+from aliyun_img_utils.aliyun_tracing import ContextThreadPoolExecutor
+from aliyun_img_utils.testing import FakeAliyunServer, ServiceProfile
+
+
+def test_context_stream():
+    default = io.StringIO()
+    job = io.StringIO()
+    stream = ContextStream(default)
+
+    token = stream.redirect(job)
+    stream.write('job ')
+    with ContextThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(stream.write, 'worker').result()
+    stream.reset(token)
+
+    thread = threading.Thread(target=stream.write, args=('other',))
+    thread.start()
+    thread.join()
+
+    assert job.getvalue() == 'job worker'
+    assert default.getvalue() == 'other'
+
+
+def test_client_pool():
+    pool = ClientPool()
+    factory_calls = []
+
+    def factory():
+        factory_calls.append(1)
+        return object()
+
+    client = pool.get(('ecs', 'cn-beijing'), factory)
+    assert pool.get(('ecs', 'cn-beijing'), factory) is client
+    assert len(factory_calls) == 1
+    assert pool.stats() == {'clients': 1, 'hits': 1, 'misses': 1}
+
+
+def test_get_absolute_args():
+    args = get_absolute_args(
+        main,
+        ['image', 'upload', '--image-file', 'image.tar.gz',
+         '--metrics-file=metrics.json', '--image-name', 'image.tar.gz']
+    )
+    assert args[3] == os.path.abspath('image.tar.gz')
+    assert args[4] == '--metrics-file=' + os.path.abspath('metrics.json')
+    assert args[6] == 'image.tar.gz'
+
+
+def test_forward_command_no_daemon(tmp_path):
+    socket_path = str(tmp_path / 'daemon.sock')
+    args = ['image', 'info', '--image-name', 'image-v1']
+
+    assert forward_command(main, args, socket_path) is None
+    assert forward_command(main, ['image', 'delete'], socket_path) is None
+
+
+def test_get_socket_path(tmp_path):
+    with patch.dict(os.environ, {'XDG_RUNTIME_DIR': str(tmp_path)}):
+        os.environ.pop('ALIYUN_IMG_UTILS_SOCKET', None)
+        assert get_socket_path() == str(
+            tmp_path / f'aliyun-img-utils-{os.getuid()}.sock'
+        )
+
+    # No shared fallback such as /tmp
+    with patch.dict(os.environ, clear=True):
+        assert get_socket_path() is None
+        assert forward_command(main, ['image', 'info']) is None
+
+
+def test_untrusted_socket(tmp_path):
+    socket_path = str(tmp_path / 'daemon.sock')
+    daemon = AliyunDaemon(main, socket_path)
+
+    try:
+        assert is_trusted_socket(socket_path)
+
+        os.chmod(socket_path, 0o666)
+        assert not is_trusted_socket(socket_path)
+        assert forward_command(
+            main,
+            ['image', 'info', '--image-name', 'image-v1'],
+            socket_path
+        ) is None
+    finally:
+        daemon.server_close()
+
+    (tmp_path / 'file').write_text('')
+    os.chmod(tmp_path / 'file', 0o600)
+    assert not is_trusted_socket(str(tmp_path / 'file'))
+
+
+def test_strip_credentials(tmp_path):
+    (tmp_path / 'test.yaml').write_text(
+        'access_key: key\naccess_secret: secret\n'
+    )
+    args = [
+        'image', 'info', '-C', str(tmp_path), '--profile', 'test',
+        '--access-key', 'key', '--access-secret=secret'
+    ]
+
+    assert strip_credentials(args) == args[:6]
+
+    # Values which differ from the config are still sent
+    args[7] = 'other'
+    assert strip_credentials(args) == args[:8]
+
+
+class TestDaemonFakeServer(object):
+    """Test the daemon against the local fake server."""
+
+    def setup_method(self, method):
+        self.server = FakeAliyunServer(
+            regions=['cn-beijing', 'cn-shanghai'],
+            profile=ServiceProfile(latency=0.05)
+        )
+        self.server.start()
+        self.server.add_image('image-v1', 'cn-beijing')
+        self.server.add_image('image-v1', 'cn-shanghai')
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def test_serve_and_forward(self, tmp_path, capsys):
+        socket_path = str(tmp_path / 'daemon.sock')
+        image_class = partial(
+            AliyunImage,
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint
+        )
+        args = [
+            'image', 'info', '--image-name', 'image-v1', '--access-key',
+            'key', '--access-secret', 'secret', '--region', 'cn-beijing'
+        ]
+
+        daemon = AliyunDaemon(main, socket_path)
+        daemon.activate()
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+
+        try:
+            with pytest.raises(AliyunException):
+                AliyunDaemon(main, socket_path)
+
+            with patch(
+                'aliyun_img_utils.aliyun_cli.AliyunImage',
+                image_class
+            ):
+                assert forward_command(main, args, socket_path) == 0
+                assert forward_command(main, args, socket_path) == 0
+                assert forward_command(
+                    main,
+                    args[:3] + ['missing'] + args[4:],
+                    socket_path
+                ) == 1
+
+            status = send_request({'action': 'status'}, socket_path)
+            assert status['pool'] == {'clients': 1, 'hits': 2, 'misses': 1}
+            assert get_client_pool() is daemon.pool
+
+            send_request({'action': 'shutdown'}, socket_path)
+            thread.join(5)
+        finally:
+            daemon.deactivate()
+            daemon.server_close()
+
+        output = capsys.readouterr()
+        assert output.out.count('image-v1') >= 2
+        assert 'Unable to find image' in output.out
+        assert get_client_pool() is None
+        assert not os.path.exists(socket_path)
+
+    def test_concurrent_jobs(self, tmp_path):
+        socket_path = str(tmp_path / 'daemon.sock')
+        barrier = threading.Barrier(2, timeout=5)
+
+        def image_class(*args, **kwargs):
+            barrier.wait()  # Both jobs run at the same time
+            return AliyunImage(
+                *args,
+                compute_endpoint=self.server.compute_endpoint,
+                storage_endpoint=self.server.storage_endpoint,
+                **kwargs
+            )
+
+        def run(region, *options):
+            args = [
+                'image', 'info', '--image-name', 'image-v1', '--access-key',
+                'key', '--access-secret', 'secret', '--region', region,
+                '--metrics-file', str(tmp_path / f'{region}.json')
+            ]
+            results[region] = send_request(
+                {'action': 'run', 'args': args + list(options)},
+                socket_path
+            )
+
+        results = {}
+        daemon = AliyunDaemon(main, socket_path)
+        daemon.activate()
+        server_thread = threading.Thread(target=daemon.serve_forever)
+        server_thread.start()
+
+        try:
+            with patch(
+                'aliyun_img_utils.aliyun_cli.AliyunImage',
+                image_class
+            ):
+                jobs = [
+                    threading.Thread(target=run, args=('cn-beijing',)),
+                    threading.Thread(
+                        target=run,
+                        args=('cn-shanghai', '--verbose', '--no-color')
+                    )
+                ]
+                for job in jobs:
+                    job.start()
+                for job in jobs:
+                    job.join()
+
+            daemon.shutdown()
+            server_thread.join(5)
+        finally:
+            daemon.deactivate()
+            daemon.server_close()
+
+        # Every job only captures its own output and records its own calls
+        for region in ('cn-beijing', 'cn-shanghai'):
+            assert results[region]['exit_code'] == 0
+            assert results[region]['stdout'].count('"RegionId"') == 1
+            assert f'"RegionId": "{region}"' in results[region]['stdout']
+
+        for region in ('cn-beijing', 'cn-shanghai'):
+            metrics = json.loads((tmp_path / f'{region}.json').read_text())
+            assert {
+                record['region'] for record in metrics['records']
+            } == {region}
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils storage endpoint selection tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+
+from unittest.mock import patch
+
+import oss2
+import pytest
+
+from aliyun_img_utils.aliyun_endpoints import (
+    PROBE_PREFIX,
+    ProbeResult,
+    get_best_probe,
+    get_candidate_endpoints,
+    probe_endpoint,
+    select_storage_endpoint
+)
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.testing import FakeAliyunServer, ServiceProfile
+
+UNREACHABLE = 'http://127.0.0.1:1'
+
+
+def test_candidate_endpoints():
+    assert get_candidate_endpoints('cn-beijing') == [
+        'https://oss-accelerate.aliyuncs.com',
+        'https://oss-cn-beijing.aliyuncs.com',
+        'https://oss-cn-beijing-internal.aliyuncs.com'
+    ]
+
+
+def test_get_best_probe():
+    fast = ProbeResult('fast', True, 0.2, 2000.0, None)
+    near = ProbeResult('near', True, 0.01, 1000.0, None)
+    down = ProbeResult('down', False, None, None, 'refused')
+    assert get_best_probe([near, fast, down]) is fast
+
+    # Without throughput samples the lowest rtt wins
+    assert get_best_probe([
+        fast._replace(throughput=None),
+        near._replace(throughput=None)
+    ]).endpoint == 'near'
+
+    with pytest.raises(AliyunException):
+        get_best_probe([down])
+
+
+class TestEndpointsFakeServer(object):
+    """Test endpoint probes against local fake servers."""
+
+    def setup_method(self, method):
+        self.fast = FakeAliyunServer(regions=['cn-beijing'])
+        self.slow = FakeAliyunServer(
+            regions=['cn-beijing'],
+            profile=ServiceProfile(bandwidth=128 * 1024)
+        )
+
+        for server in (self.fast, self.slow):
+            server.start()
+            server.create_bucket('images', 'cn-beijing')
+
+        self.auth = oss2.Auth('key', 'secret')
+
+    def teardown_method(self, method):
+        self.fast.stop()
+        self.slow.stop()
+
+    def test_probe_endpoint(self):
+        result = probe_endpoint(
+            self.fast.storage_endpoint,
+            self.auth,
+            'images',
+            sample_size=1024
+        )
+        assert result.reachable
+        assert result.rtt > 0
+        assert result.throughput > 0
+        assert self.fast.calls['PutObject'] == 1
+        assert self.fast.calls['DeleteObject'] == 1
+
+        result = probe_endpoint(UNREACHABLE, timeout=0.5)
+        assert not result.reachable
+        assert result.error
+
+    def test_probe_endpoint_sample_failure(self):
+        # Read only credentials rank the endpoint by round trip time
+        self.fast.inject_failure('PutObject', status=403, code='AccessDenied')
+        result = probe_endpoint(
+            self.fast.storage_endpoint,
+            self.auth,
+            'images',
+            sample_size=1024
+        )
+        assert result.reachable
+        assert result.rtt > 0
+        assert result.throughput is None
+        assert 'Throughput sample failed' in result.error
+
+    def test_probe_endpoint_unique_keys(self):
+        # Without delete permission each probe leaves its own sample
+        self.fast.inject_failure('DeleteObject', count=2, status=403)
+
+        for attempt in range(2):
+            probe_endpoint(
+                self.fast.storage_endpoint,
+                self.auth,
+                'images',
+                sample_size=1024
+            )
+
+        samples = [
+            key for key in self.fast.buckets['images']['objects']
+            if key.startswith(PROBE_PREFIX)
+        ]
+        assert len(samples) == 2
+
+    def test_select_storage_endpoint(self, tmp_path):
+        cache_file = tmp_path / 'endpoints.json'
+        endpoints = [
+            self.slow.storage_endpoint,
+            self.fast.storage_endpoint,
+            UNREACHABLE
+        ]
+
+        with patch.dict(
+            'aliyun_img_utils.aliyun_endpoints.endpoint_cache',
+            clear=True
+        ):
+            endpoint = select_storage_endpoint(
+                'cn-beijing',
+                self.auth,
+                'images',
+                endpoints=endpoints,
+                sample_size=64 * 1024,
+                cache_file=str(cache_file)
+            )
+            assert endpoint == self.fast.storage_endpoint
+
+            # The winner is cached per host and region
+            self.fast.reset_calls()
+            assert select_storage_endpoint(
+                'cn-beijing',
+                endpoints=endpoints,
+                cache_file=str(cache_file)
+            ) == endpoint
+            assert not self.fast.calls
+
+        cache = json.loads(cache_file.read_text())
+        entry = list(cache.values())[0]
+        assert entry['endpoint'] == endpoint
+        assert len(entry['probes']) == 3
+        assert not [
+            key for key in self.fast.buckets['images']['objects']
+            if key.startswith(PROBE_PREFIX)
+        ]
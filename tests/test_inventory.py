@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils inventory tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pytest import raises
+
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_inventory import ImageInventory
+
+
+def get_image(image_id, name, status='Available', created=None, tags=None):
+    image = {
+        'ImageId': image_id,
+        'ImageName': name,
+        'Status': status,
+        'CreationTime': created or '2026-01-01T00:00:00Z'
+    }
+
+    if tags:
+        image['Tags'] = {
+            'Tag': [
+                {'TagKey': key, 'TagValue': value}
+                for key, value in tags.items()
+            ]
+        }
+
+    return image
+
+
+class TestImageInventory(object):
+    """Test image inventory class."""
+
+    def setup_method(self):
+        self.inventory = ImageInventory()
+        self.inventory.replace_region(
+            'cn-beijing',
+            [
+                get_image('m-1', 'sles-v1', created='2026-01-01T00:00:00Z'),
+                get_image(
+                    'm-2',
+                    'sles-v2',
+                    status='Deprecated',
+                    created='2026-02-01T00:00:00Z',
+                    tags={'Removal date': '20260801'}
+                )
+            ]
+        )
+        self.inventory.replace_region(
+            'cn-shanghai',
+            [get_image('m-3', 'sles-v1', created='2026-01-02T00:00:00Z')]
+        )
+
+    def teardown_method(self):
+        self.inventory.close()
+
+    def test_query(self):
+        assert len(self.inventory.query()) == 3
+
+        images = self.inventory.query(image_name='sles-v1')
+        assert [image['RegionId'] for image in images] == [
+            'cn-shanghai', 'cn-beijing'
+        ]
+
+        assert len(self.inventory.query(image_name='sles-*')) == 3
+        assert self.inventory.query(image_id='m-2')[0]['ImageName'] == \
+            'sles-v2'
+        assert len(self.inventory.query(status='Available')) == 2
+        assert len(self.inventory.query(status='Available,Deprecated')) == 3
+        assert len(self.inventory.query(region='cn-shanghai')) == 1
+        assert len(self.inventory.query(tag_key='Removal date')) == 1
+        assert len(
+            self.inventory.query(tag_key='Removal date', tag_value='1')
+        ) == 0
+        assert len(
+            self.inventory.query(created_after='2026-01-02T00:00:00Z')
+        ) == 2
+        assert len(
+            self.inventory.query(created_before='2026-01-02T00:00:00Z')
+        ) == 1
+
+    def test_replace_region(self):
+        self.inventory.replace_region('cn-beijing', [])
+
+        assert len(self.inventory.query()) == 1
+        assert len(self.inventory.query(tag_key='Removal date')) == 0
+        assert sorted(self.inventory.get_regions()) == [
+            'cn-beijing', 'cn-shanghai'
+        ]
+
+    def test_update_region(self):
+        assert self.inventory.get_high_water_mark('cn-beijing') == \
+            '2026-02-01T00:00:00Z'
+        assert self.inventory.get_high_water_mark('cn-hongkong') is None
+        assert self.inventory.get_image_ids(
+            'cn-beijing', ['Deprecated']
+        ) == ['m-2']
+
+        self.inventory.update_region(
+            'cn-beijing',
+            [get_image('m-4', 'sles-v3', created='2026-03-01T00:00:00Z')],
+            removed_image_ids=['m-2']
+        )
+
+        assert self.inventory.get_high_water_mark('cn-beijing') == \
+            '2026-03-01T00:00:00Z'
+        assert self.inventory.get_image_ids('cn-beijing', ['Deprecated']) \
+            == []
+        assert len(self.inventory.query(region='cn-beijing')) == 2
+        assert 'm-4' in self.inventory.get_image_ids('cn-beijing')
+        assert len(self.inventory.get_image_ids('cn-beijing')) == 2
+
+        # Empty region uses the epoch
+        self.inventory.replace_region('cn-hongkong', [])
+        assert self.inventory.get_high_water_mark('cn-hongkong') == \
+            '1970-01-01T00:00:00Z'
+
+    def test_persistence(self, tmp_path):
+        path = str(tmp_path / 'inventory' / 'default.db')
+
+        with ImageInventory(path) as inventory:
+            inventory.replace_region('cn-beijing', [get_image('m-1', 'a')])
+
+        with ImageInventory(path) as inventory:
+            assert inventory.query()[0]['ImageId'] == 'm-1'
+
+    def test_invalid_path(self, tmp_path):
+        with raises(AliyunException):
+            ImageInventory(str(tmp_path))
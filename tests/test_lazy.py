@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils lazy import tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import subprocess
+import sys
+
+from unittest.mock import patch
+
+from aliyun_img_utils.aliyun_lazy import LazyModule
+
+
+def test_lazy_module():
+    lazy_json = LazyModule('json')
+
+    assert lazy_json.dumps({'a': 1}) == json.dumps({'a': 1})
+    assert 'json' in repr(lazy_json)
+
+    with patch.object(lazy_json, 'dumps', return_value='patched'):
+        assert lazy_json.dumps({}) == 'patched'
+
+    assert lazy_json.dumps({}) == '{}'
+
+
+def test_cli_import_does_not_load_sdk():
+    result = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'import json, sys\n'
+            'import aliyun_img_utils.aliyun_cli\n'
+            'print(json.dumps(sorted(sys.modules)))'
+        ],
+        check=True,
+        capture_output=True,
+        text=True
+    )
+    modules = json.loads(result.stdout)
+
+    for name in ('oss2', 'aliyunsdkcore', 'aliyunsdkecs', 'yaml'):
+        assert name not in modules
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils metrics tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+
+from functools import partial
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from click.testing import CliRunner
+
+from aliyun_img_utils.aliyun_cli import main
+from aliyun_img_utils.aliyun_clock import VirtualClock
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_metrics import (
+    InstrumentedBucket,
+    InstrumentedClient,
+    MetricsRecorder,
+    get_default_recorder,
+    percentile
+)
+from aliyun_img_utils.testing import FakeAliyunServer
+
+
+def test_percentile():
+    values = [4, 1, 3, 2]
+
+    assert percentile([], 50) == 0.0
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4
+
+
+def test_recorder_summary():
+    recorder = MetricsRecorder()
+    records = []
+    recorder.add_hook(records.append)
+
+    recorder.record('ecs', 'DescribeImages', 'cn-beijing', 0, 0.1)
+    recorder.record('ecs', 'DescribeImages', 'cn-shanghai', 0, 0.3,
+                    retries=2, error=ValueError('failed'))
+    recorder.record('oss', 'PutObject', None, 0, 0.2)
+    recorder.record('sleep', 'wait_on_compute_image', 'cn-beijing', 0, 5)
+
+    summary = recorder.summary()
+    describe = summary['actions']['DescribeImages']
+    assert describe['count'] == 2
+    assert describe['errors'] == 1
+    assert describe['retries'] == 2
+    assert describe['p50'] == pytest.approx(0.2)
+    assert summary['regions']['global']['count'] == 1
+    assert summary['sleeps']['wait_on_compute_image']['total'] == 5
+    assert records[1].error == 'ValueError'
+    assert records[1].outcome == 'error'
+
+    text = recorder.format_summary()
+    assert 'DescribeImages' in text
+    assert 'wait_on_compute_image' in text
+
+
+def test_recorder_hook_failure(caplog):
+    recorder = MetricsRecorder(max_records=1)
+
+    def hook(record):
+        raise Exception('Broken hook')
+
+    recorder.add_hook(hook)
+    recorder.record('ecs', 'DescribeImages', 'cn-beijing', 0, 0.1)
+    recorder.record('ecs', 'CopyImage', 'cn-beijing', 0, 0.1)
+
+    assert 'Broken hook' in caplog.text
+    assert len(recorder.records) == 1
+
+    recorder.remove_hook(hook)
+    assert recorder.hooks == []
+
+
+def test_instrumented_client_retries():
+    recorder = MetricsRecorder()
+    client = MagicMock()
+    request = MagicMock()
+    request.get_action_name.return_value = 'CopyImage'
+
+    def do_action(request):
+        client._handle_single_request()
+        client._handle_single_request()
+        return b'{}'
+
+    client.do_action_with_exception.side_effect = do_action
+    instrumented = InstrumentedClient(client, recorder, 'cn-beijing')
+
+    assert instrumented.do_action_with_exception(request) == b'{}'
+    assert instrumented.get_region_id is client.get_region_id
+
+    record = recorder.records[0]
+    assert record.kind == 'ecs'
+    assert record.action == 'CopyImage'
+    assert record.region == 'cn-beijing'
+    assert record.retries == 1
+
+
+def test_instrumented_bucket_error():
+    recorder = MetricsRecorder()
+    bucket = MagicMock()
+    error = Exception('Not found')
+    error.code = 'NoSuchKey'
+    bucket.get_object.side_effect = error
+    instrumented = InstrumentedBucket(bucket, recorder, 'cn-beijing')
+
+    with pytest.raises(Exception):
+        instrumented.get_object('image.qcow2')
+
+    assert instrumented.bucket_name is bucket.bucket_name
+    assert recorder.records[0].action == 'GetObject'
+    assert recorder.records[0].error == 'NoSuchKey'
+
+
+class TestMetricsFakeServer(object):
+    """Test metrics of AliyunImage against the local fake server."""
+
+    def setup_method(self, method):
+        self.server = FakeAliyunServer(regions=['cn-beijing'])
+        self.server.start()
+        self.server.create_bucket('images', 'cn-beijing')
+        self.server.put_object('images', 'image.qcow2', b'image')
+        self.server.add_image('image-v1', 'cn-beijing')
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def test_call_hook(self):
+        image = AliyunImage(
+            'key',
+            'secret',
+            'cn-beijing',
+            bucket_name='images',
+            clock=VirtualClock(start=1700000000),
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint
+        )
+        records = []
+        image.add_call_hook(records.append)
+        self.server.inject_failure('DescribeImages', status=500)
+
+        image.get_compute_image(image_name='image-v1')
+        image.image_tarball_exists('image.qcow2')
+
+        assert [record.action for record in records] == [
+            'DescribeImages',
+            'GetBucketInfo',
+            'GetObjectMeta'
+        ]
+        assert records[0].region == 'cn-beijing'
+        assert records[0].retries == 1
+        assert records[1].kind == 'oss'
+
+    def test_cli_timings(self, tmp_path):
+        metrics_file = tmp_path / 'metrics.json'
+        image_class = partial(
+            AliyunImage,
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint
+        )
+        args = [
+            'image', 'info', '--image-name', 'image-v1', '--access-key',
+            'key', '--access-secret', 'secret', '--region', 'cn-beijing',
+            '--timings', '--metrics-file', str(metrics_file)
+        ]
+
+        with patch('aliyun_img_utils.aliyun_cli.AliyunImage', image_class):
+            result = CliRunner().invoke(main, args)
+
+        assert result.exit_code == 0
+        assert 'DescribeImages' in result.output
+        assert get_default_recorder() is None
+
+        metrics = json.loads(metrics_file.read_text())
+        assert metrics['records'][0]['action'] == 'DescribeImages'
+        assert metrics['summary']['regions']['cn-beijing']['count'] == 1
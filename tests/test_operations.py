@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils image operation tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from pytest import raises
+
+from aliyun_img_utils.aliyun_clock import VirtualClock
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_exceptions import AliyunImageException
+from aliyun_img_utils.aliyun_operations import (
+    ImageOperation,
+    ImageOperationPoller,
+    ProgressEstimator,
+    get_image_progress,
+    get_operation_poller
+)
+
+
+def test_get_image_progress():
+    assert get_image_progress({'Progress': '45%'}) == 45
+    assert get_image_progress({'Progress': '100'}) == 100
+    assert get_image_progress({'Progress': 'n/a'}) == 0
+    assert get_image_progress({}) == 0
+
+
+def test_progress_estimator():
+    estimator = ProgressEstimator()
+
+    # No rate yet
+    estimator.update(0, 0)
+    assert estimator.eta(0) is None
+    assert estimator.next_interval(0) == 30
+
+    # 10% per minute, early polls are rare
+    estimator.update(60, 10)
+    assert estimator.eta(60) == 540
+    assert estimator.next_interval(60) == 60
+
+    # Near completion polls are frequent
+    estimator.update(540, 90)
+    assert estimator.eta(540) == 60
+    assert estimator.next_interval(540) == 30
+    assert estimator.progress == 90
+
+    # Stalled progress lowers the rate and backs off the polls
+    assert estimator.eta(720) == 80
+    assert estimator.next_interval(720) == 40
+
+
+def test_progress_estimator_stall():
+    def get_progress(now):
+        if now >= 1500:
+            return 100
+        return min(now / 6, 90)  # 90% after 540s, then stuck
+
+    estimator = ProgressEstimator()
+    now = polls = 0
+
+    while True:
+        polls += 1
+        progress = get_progress(now)
+        estimator.update(now, progress)
+
+        if progress == 100:
+            break
+
+        now += estimator.next_interval(now)
+
+    # Fewer polls than a fixed 30 second interval
+    assert polls <= 1500 / 30 + 1
+
+
+class TestImageOperations(object):
+    """Test image operation handles and the shared poller."""
+
+    def setup_method(self):
+        self.image = AliyunImage('12345', '54321', 'cn-beijing')
+        self.poller = ImageOperationPoller(interval=0.01)
+
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_poll(self, mock_get_images):
+        statuses = {'m-1': 'Creating', 'm-2': 'CreateFailed'}
+
+        def get_images(region, image_ids=None):
+            return [
+                {'ImageId': image_id, 'Status': statuses[image_id]}
+                for image_id in image_ids if image_id in statuses
+            ]
+
+        mock_get_images.side_effect = get_images
+
+        operations = [
+            ImageOperation(self.image, 'm-1', 'cn-beijing'),
+            ImageOperation(self.image, 'm-2', 'cn-beijing'),
+            ImageOperation(self.image, 'm-3', 'cn-shanghai')
+        ]
+        callback = Mock()
+        operations[0].add_done_callback(callback)
+
+        for operation in operations:
+            self.poller._operations.append(operation)
+
+        self.poller.poll()
+
+        # One request per region
+        assert mock_get_images.call_count == 2
+        assert operations[0].status() == 'Creating'
+        assert not operations[0].done()
+        assert operations[1].done()
+        assert isinstance(operations[1].exception(), AliyunImageException)
+        assert operations[2].status() == 'Waiting'
+        assert len(self.poller.pending()) == 2
+
+        statuses['m-1'] = 'Available'
+        self.poller.poll()
+
+        assert operations[0].result() == 'm-1'
+        callback.assert_called_once_with(operations[0])
+        assert 'm-1' in repr(operations[0])
+
+        # Poll failure keeps the operation waiting
+        mock_get_images.side_effect = AliyunImageException('Failed')
+        self.poller.poll()
+        assert not operations[2].done()
+
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_timeout(self, mock_get_images):
+        mock_get_images.return_value = []
+        operation = ImageOperation(self.image, 'm-1', 'cn-beijing', timeout=0)
+        self.poller.add(operation)
+
+        with raises(AliyunImageException):
+            operation.result(timeout=5)
+
+        # Result wait timeout
+        operation = ImageOperation(self.image, 'm-2', 'cn-beijing')
+
+        with raises(AliyunImageException):
+            operation.result(timeout=0)
+
+        with raises(AliyunImageException):
+            operation.exception(timeout=0)
+
+    @patch.object(AliyunImage, 'get_compute_images')
+    def test_virtual_clock(self, mock_get_images):
+        clock = VirtualClock(start=1000)
+        image = AliyunImage('12345', '54321', 'cn-beijing', clock=clock)
+        statuses = iter(['Waiting', 'Creating', 'Creating', 'Available'])
+
+        def get_images(region, image_ids=None):
+            return [{'ImageId': 'm-1', 'Status': next(statuses)}]
+
+        mock_get_images.side_effect = get_images
+
+        # The poller sleeps on the image clock, not in real time
+        operation = image.start_operation('m-1')
+        assert image.operation_poller.clock is clock
+        assert operation.result(timeout=5) == 'm-1'
+        assert clock.sleeps == 3
+        assert clock.time() == 1090
+
+        # The timeout expires in virtual time
+        mock_get_images.side_effect = None
+        mock_get_images.return_value = []
+        operation = image.start_operation('m-2', timeout=60)
+
+        with raises(AliyunImageException):
+            operation.result(timeout=5)
+
+    def test_get_operation_poller(self):
+        assert get_operation_poller() is get_operation_poller()
+
+    @patch('aliyun_img_utils.aliyun_operations.operation_poller', None)
+    @patch('aliyun_img_utils.aliyun_operations.ImageOperationPoller')
+    def test_get_operation_poller_threads(self, mock_poller_class):
+        def create_poller():
+            time.sleep(0.05)  # Let the other threads race
+            return Mock()
+
+        mock_poller_class.side_effect = create_poller
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pollers = list(
+                executor.map(lambda _: get_operation_poller(), range(4))
+            )
+
+        # Only one poller is created
+        assert mock_poller_class.call_count == 1
+        assert all(poller is pollers[0] for poller in pollers)
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils profiling tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pstats
+
+from aliyun_img_utils.aliyun_profiling import CommandProfiler
+from aliyun_img_utils.aliyun_tracing import ContextThreadPoolExecutor
+
+
+def worker_hot_spot():
+    return sum(index * index for index in range(100000))
+
+
+def test_profile_worker_threads(tmp_path):
+    cpu_file = tmp_path / 'profile.pstats'
+    profiler = CommandProfiler(str(cpu_file))
+    profiler.start()
+
+    with ContextThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda index: worker_hot_spot(), range(2)))
+
+    summary = profiler.stop()
+
+    functions = [
+        name for filename, line, name in pstats.Stats(str(cpu_file)).stats
+    ]
+    assert 'worker_hot_spot' in functions
+    assert 'worker_hot_spot' in summary or 'genexpr' in summary
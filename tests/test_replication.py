@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils replication strategy tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pytest import raises
+
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_replication import (
+    RegionTopology,
+    ReplicationPlanner,
+    get_region_group,
+    load_region_topology,
+    simulate_replication
+)
+
+REGIONS = [
+    'cn-shanghai',
+    'cn-hangzhou',
+    'eu-central-1',
+    'eu-west-1',
+    'us-west-1',
+    'us-east-1'
+]
+
+
+def test_get_region_group():
+    assert get_region_group('cn-beijing') == 'cn'
+    assert get_region_group('eu-central-1') == 'eu'
+
+
+def test_region_topology():
+    topology = RegionTopology.from_dict({
+        'groups': {'ap-southeast-1': 'cn'},
+        'costs': {'cn-beijing': {'us-west-1': 1800}}
+    })
+
+    assert topology.cost('cn-beijing', 'cn-shanghai') == 600
+    assert topology.cost('cn-beijing', 'ap-southeast-1') == 600
+    assert topology.cost('cn-beijing', 'eu-west-1') == 3600
+    assert topology.cost('cn-beijing', 'us-west-1') == 1800
+
+    topology.record('cn-beijing', 'eu-west-1', 1000)
+    assert topology.cost('cn-beijing', 'eu-west-1') == 1000
+
+    topology.record('cn-beijing', 'eu-west-1', 2000)
+    assert topology.cost('cn-beijing', 'eu-west-1') == 1500
+
+
+def test_load_region_topology(tmp_path):
+    path = tmp_path / 'topology.yaml'
+    path.write_text('same_group: 60\ncross_group: 120\n')
+
+    topology = load_region_topology(str(path))
+    assert topology.cost('cn-beijing', 'cn-shanghai') == 60
+    assert topology.cost('cn-beijing', 'eu-west-1') == 120
+
+    with raises(AliyunException):
+        load_region_topology(str(tmp_path / 'missing.yaml'))
+
+
+def test_replication_planner():
+    with raises(AliyunException):
+        ReplicationPlanner('star')
+
+    planner = ReplicationPlanner('tree')
+    copies = planner.next_copies(
+        ['cn-beijing'],
+        [],
+        ['eu-central-1', 'eu-west-1', 'cn-shanghai'],
+        10
+    )
+
+    # The second european region waits for the first one
+    assert copies == [
+        ('cn-beijing', 'cn-shanghai'),
+        ('cn-beijing', 'eu-central-1')
+    ]
+
+    copies = planner.next_copies(
+        ['cn-beijing', 'eu-central-1'],
+        [],
+        ['eu-west-1'],
+        10
+    )
+    assert copies == [('eu-central-1', 'eu-west-1')]
+
+    planner = ReplicationPlanner('source')
+    copies = planner.next_copies(
+        ['cn-beijing', 'eu-central-1'],
+        [],
+        ['eu-west-1', 'cn-shanghai'],
+        1
+    )
+    assert copies == [('cn-beijing', 'cn-shanghai')]
+
+
+def test_simulate_replication():
+    source = simulate_replication('cn-beijing', REGIONS, strategy='source')
+    tree = simulate_replication('cn-beijing', REGIONS, strategy='tree')
+
+    assert source['total_time'] == 3600
+    assert tree['total_time'] == 4200
+    assert len(tree['copies']) == len(REGIONS)
+
+    # Limited concurrency favours the tree
+    source = simulate_replication(
+        'cn-beijing',
+        REGIONS,
+        strategy='source',
+        max_concurrency=2
+    )
+    tree = simulate_replication(
+        'cn-beijing',
+        REGIONS,
+        strategy='tree',
+        max_concurrency=2
+    )
+    assert tree['total_time'] < source['total_time']
+
+    # Slow links from the source favour the tree
+    topology = RegionTopology(costs={
+        'cn-beijing': {
+            region: 10000 for region in REGIONS
+            if get_region_group(region) != 'cn'
+        }
+    })
+    source = simulate_replication(
+        'cn-beijing',
+        REGIONS,
+        strategy='source',
+        topology=topology
+    )
+    tree = simulate_replication(
+        'cn-beijing',
+        REGIONS,
+        strategy='tree',
+        topology=topology
+    )
+    assert source['total_time'] == 10000
+    assert tree['total_time'] == 4800
+
+    # The latency model can differ from the planning topology
+    tree = simulate_replication(
+        'cn-beijing',
+        REGIONS,
+        strategy='tree',
+        copy_time=topology.cost
+    )
+    assert tree['total_time'] == 10600
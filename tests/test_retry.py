@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils storage retry tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import oss2
+
+from unittest.mock import patch, Mock
+
+from pytest import raises
+
+from aliyun_img_utils.aliyun_exceptions import (
+    AliyunException,
+    AliyunTransferException
+)
+from aliyun_img_utils.aliyun_retry import (
+    get_backoff,
+    is_retryable_error,
+    retry_call
+)
+from aliyun_img_utils.aliyun_telemetry import TransferTelemetry
+from aliyun_img_utils.aliyun_utils import put_blob
+
+
+def make_error(status, code):
+    return oss2.exceptions.make_exception(
+        Mock(
+            status=status,
+            headers={},
+            read=Mock(return_value=(
+                f'<Error><Code>{code}</Code></Error>'
+            ).encode())
+        )
+    )
+
+
+def test_is_retryable_error():
+    assert is_retryable_error(make_error(503, 'ServiceUnavailable'))
+    assert is_retryable_error(make_error(500, 'InternalError'))
+    assert is_retryable_error(
+        oss2.exceptions.RequestError(ConnectionError('reset'))
+    )
+    assert is_retryable_error(AliyunTransferException('Failed', 502))
+    assert is_retryable_error(AliyunTransferException('No connection'))
+
+    assert not is_retryable_error(make_error(403, 'AccessDenied'))
+    assert not is_retryable_error(make_error(404, 'NoSuchUpload'))
+    assert not is_retryable_error(AliyunTransferException('Denied', 403))
+    assert not is_retryable_error(AliyunException('Failed'))
+    assert not is_retryable_error(ValueError('Bad data'))
+
+
+def test_get_backoff():
+    for retries in range(10):
+        delay = min(20, 0.5 * 2 ** retries)
+        assert delay / 2 <= get_backoff(retries) <= delay
+
+
+@patch('aliyun_img_utils.aliyun_retry.time.sleep')
+def test_retry_call(mock_sleep):
+    func = Mock(side_effect=[
+        make_error(503, 'ServiceUnavailable'),
+        make_error(500, 'InternalError'),
+        'result'
+    ])
+
+    assert retry_call(func, 'arg', max_retries=2) == ('result', 2)
+    func.assert_called_with('arg')
+
+    # Exponential backoff between the attempts
+    first, second = [call[0][0] for call in mock_sleep.call_args_list]
+    assert 0.25 <= first <= 0.5
+    assert 0.5 <= second <= 1
+
+
+@patch('aliyun_img_utils.aliyun_retry.time.sleep')
+def test_retry_call_exhausted(mock_sleep):
+    func = Mock(side_effect=make_error(503, 'ServiceUnavailable'))
+
+    with raises(oss2.exceptions.ServerError):
+        retry_call(func, max_retries=2)
+
+    assert func.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+@patch('aliyun_img_utils.aliyun_retry.time.sleep')
+def test_put_blob_client_error(mock_sleep):
+    client = Mock()
+    client.upload_part.side_effect = make_error(403, 'AccessDenied')
+
+    telemetry = TransferTelemetry()
+
+    with raises(oss2.exceptions.AccessDenied):
+        put_blob(
+            client,
+            'blob.vhd',
+            'tests/data/blob.vhd',
+            telemetry=telemetry
+        )
+
+    # Client errors fail the upload without retries
+    assert client.upload_part.call_count == 1
+    assert not mock_sleep.called
+
+    # The failed transfer is finished
+    assert telemetry.end_time
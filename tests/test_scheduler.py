@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils job scheduler tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from unittest.mock import Mock
+
+from pytest import raises
+
+from aliyun_img_utils.aliyun_exceptions import AliyunException
+from aliyun_img_utils.aliyun_scheduler import ImageJobScheduler
+
+
+class Tracker(object):
+    """Records the order and concurrency of jobs."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.order = []
+        self.running = {}
+        self.peak = {}
+        self.peak_total = 0
+        self.release = threading.Event()
+
+    def job(self, name, region):
+        with self.lock:
+            self.order.append(name)
+            self.running[region] = self.running.get(region, 0) + 1
+            self.peak[region] = max(
+                self.peak.get(region, 0),
+                self.running[region]
+            )
+            self.peak_total = max(
+                self.peak_total,
+                sum(self.running.values())
+            )
+
+        self.release.wait(5)
+
+        with self.lock:
+            self.running[region] -= 1
+
+        return name
+
+
+def test_caps():
+    tracker = Tracker()
+    scheduler = ImageJobScheduler(
+        max_per_region=2,
+        max_per_account=3,
+        region_limits={'cn-shanghai': 1}
+    )
+
+    futures = []
+    for region in ['cn-beijing', 'cn-shanghai']:
+        for index in range(4):
+            futures.append(
+                scheduler.submit(
+                    region,
+                    tracker.job,
+                    f'{region}-{index}',
+                    region
+                )
+            )
+
+    stats = scheduler.stats()
+    assert stats['running'] == 3
+    assert stats['pending'] == 5
+    assert stats['regions'] == {'cn-beijing': 2, 'cn-shanghai': 1}
+
+    tracker.release.set()
+    results = [future.result(5) for future in futures]
+    scheduler.shutdown()
+
+    assert results[0] == 'cn-beijing-0'
+    assert tracker.peak == {'cn-beijing': 2, 'cn-shanghai': 1}
+    assert tracker.peak_total == 3
+
+
+def test_priority_and_fair_share():
+    scheduler = ImageJobScheduler(max_per_region=5, max_per_account=2)
+    executor = Mock()
+    scheduler._executor = executor
+
+    def dispatched():
+        return [call[0][1].func() for call in executor.submit.call_args_list]
+
+    for index in range(4):
+        scheduler.submit(
+            'cn-beijing',
+            str,
+            f'a-{index}',
+            group='a'
+        )
+
+    scheduler.submit('cn-beijing', str, 'b-0', group='b')
+    scheduler.submit('cn-shanghai', str, 'c-0', group='c', priority=10)
+    assert dispatched() == ['a-0', 'a-1']
+
+    # Priority goes first
+    scheduler._run(executor.submit.call_args_list[0][0][1])
+    assert dispatched() == ['a-0', 'a-1', 'c-0']
+
+    # Group b has no running jobs so it goes before a-2
+    scheduler._run(executor.submit.call_args_list[2][0][1])
+    assert dispatched() == ['a-0', 'a-1', 'c-0', 'b-0']
+
+
+def test_failure_and_shutdown():
+    scheduler = ImageJobScheduler()
+
+    def fail():
+        raise AliyunException('Failed')
+
+    future = scheduler.submit('cn-beijing', fail)
+
+    with raises(AliyunException):
+        future.result(5)
+
+    with scheduler:
+        pass
+
+    with raises(AliyunException):
+        scheduler.submit('cn-beijing', fail)
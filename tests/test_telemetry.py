@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils transfer telemetry tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+
+from unittest.mock import Mock
+
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_telemetry import (
+    MB,
+    TransferTelemetry,
+    get_histogram
+)
+from aliyun_img_utils.testing import FakeAliyunServer
+
+
+def test_get_histogram():
+    histogram = get_histogram([0.5, 1, 3, 100], (1, 2, 4))
+
+    assert histogram == [
+        {'le': '1', 'count': 2},
+        {'le': '2', 'count': 0},
+        {'le': '4', 'count': 1},
+        {'le': 'inf', 'count': 1}
+    ]
+
+
+def test_transfer_telemetry():
+    telemetry = TransferTelemetry(window=60)
+    progress = []
+    telemetry.add_listener(progress.append)
+    telemetry.start(4 * MB, 'https://oss-accelerate.aliyuncs.com')
+
+    start = telemetry.start_time
+    telemetry.record_part(1, 0, 2 * MB, start, start + 1, read_seconds=0.5)
+    telemetry.record_part(2, 2 * MB, 2 * MB, start, start + 4, retries=1)
+    telemetry.finish()
+
+    assert progress[0].bytes_done == 0
+    assert progress[0].eta is None
+    assert progress[1].bytes_done == 2 * MB
+    assert progress[1].eta > 0
+    assert progress[-1].eta == 0.0
+    assert progress[-1].parts_done == 2
+
+    summary = telemetry.summary()
+    assert summary['endpoint'] == 'https://oss-accelerate.aliyuncs.com'
+    assert summary['parts'] == 2
+    assert summary['retries'] == 1
+    assert summary['read_throughput'] == 8.0
+    assert summary['part_seconds']['max'] == 4
+    assert summary['part_throughput']['p50'] == 1.25
+    assert summary['histograms']['part_throughput'][1]['count'] == 1
+    assert summary['histograms']['part_retries'] == [
+        {'le': '0', 'count': 1},
+        {'le': '1', 'count': 1},
+        {'le': '2', 'count': 0},
+        {'le': '5', 'count': 0},
+        {'le': 'inf', 'count': 0}
+    ]
+
+    text = telemetry.format_summary()
+    assert 'Part MB/s' in text
+    assert 'Part retries' in text
+    assert '1 retries' in text
+
+
+def test_transfer_listener_failure(caplog):
+    telemetry = TransferTelemetry()
+    telemetry.add_listener(Mock(side_effect=Exception('Broken listener')))
+    telemetry.start(10)
+
+    assert 'Broken listener' in caplog.text
+
+
+class TestTransferTelemetryFakeServer(object):
+    """Test upload telemetry against the local fake server."""
+
+    def setup_method(self, method):
+        self.server = FakeAliyunServer(regions=['cn-beijing'])
+        self.server.start()
+        self.server.create_bucket('images', 'cn-beijing')
+        self.image = AliyunImage(
+            'key',
+            'secret',
+            'cn-beijing',
+            bucket_name='images',
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint
+        )
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def test_upload_telemetry(self, tmp_path):
+        image_file = tmp_path / 'image.qcow2'
+        data = os.urandom(300 * 1024)
+        image_file.write_bytes(data)
+        report = tmp_path / 'report.json'
+        self.server.inject_failure('UploadPart')
+
+        self.image.upload_image_tarball(str(image_file), page_size=100 * 1024)
+        self.image.transfer_telemetry.write_json(str(report))
+
+        assert self.server.get_object('images', 'image.qcow2') == data
+
+        telemetry = json.loads(report.read_text())
+        assert len(telemetry['parts']) == 3
+        assert telemetry['parts'][0]['retries'] == 1
+        assert telemetry['parts'][0]['endpoint'].endswith(
+            self.server.storage_endpoint
+        )
+        assert telemetry['summary']['bytes'] == len(data)
+        assert telemetry['summary']['retries'] == 1
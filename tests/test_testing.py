@@ -0,0 +1,215 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils fake server tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import oss2
+import pytest
+
+from aliyun_img_utils.aliyun_clock import VirtualClock
+from aliyun_img_utils.aliyun_exceptions import (
+    AliyunException,
+    AliyunImageException,
+    AliyunImageUploadException
+)
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.testing import FakeAliyunServer, ServiceProfile
+
+
+class TestFakeAliyunServer(object):
+    """Test AliyunImage against the local fake server."""
+
+    def setup_method(self, method):
+        self.clock = VirtualClock(start=1700000000)
+        self.server = FakeAliyunServer(
+            regions=['cn-beijing', 'cn-shanghai', 'eu-central-1'],
+            clock=self.clock,
+            seed=1
+        )
+        self.server.start()
+        self.server.create_bucket('images', 'cn-beijing')
+        self.image = AliyunImage(
+            'key',
+            'secret',
+            'cn-beijing',
+            bucket_name='images',
+            clock=self.clock,
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint
+        )
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def upload(self, tmp_path, data, **kwargs):
+        image_file = tmp_path / 'image.qcow2'
+        image_file.write_bytes(data)
+        return self.image.upload_image_tarball(str(image_file), **kwargs)
+
+    @pytest.mark.parametrize('transfer_engine', ['sync', 'async'])
+    def test_upload_image_tarball(self, tmp_path, transfer_engine):
+        if transfer_engine == 'async':
+            pytest.importorskip('aiohttp')
+
+        data = os.urandom(300 * 1024)
+        blob_name = self.upload(
+            tmp_path,
+            data,
+            page_size=100 * 1024,
+            transfer_engine=transfer_engine
+        )
+
+        assert blob_name == 'image.qcow2'
+        assert self.image.image_tarball_exists(blob_name)
+        assert not self.image.image_tarball_exists('missing.qcow2')
+        assert self.server.get_object('images', blob_name) == data
+        assert self.server.calls['UploadPart'] == 3
+
+    def test_upload_image_tarball_to_buckets(self, tmp_path):
+        self.server.create_bucket('images-sh', 'cn-shanghai')
+        self.server.create_bucket('images-eu', 'eu-central-1')
+        self.server.inject_failure('UploadPart', count=1, region='cn-shanghai')
+
+        image_file = tmp_path / 'image.qcow2'
+        data = os.urandom(300 * 1024)
+        image_file.write_bytes(data)
+        destinations = [
+            ('images', 'cn-beijing'),
+            ('images-sh', 'cn-shanghai'),
+            ('images-eu', 'eu-central-1')
+        ]
+        progress = []
+        self.server.reset_calls()
+
+        blob_name = self.image.upload_image_tarball_to_buckets(
+            str(image_file),
+            destinations,
+            page_size=100 * 1024,
+            progress_callback=lambda *args, **kwargs: progress.append(args),
+            buffer_parts=2
+        )
+
+        for bucket_name, region in destinations:
+            assert self.server.get_object(bucket_name, blob_name) == data
+
+        assert self.server.calls['UploadPart'] == 10  # One retry
+        assert sum(size for size, total in progress[1:-1]) == len(data)
+
+        # Every destination is checked before and waited on after
+        for bucket_name, region in destinations:
+            assert self.server.region_calls[(region, 'GetObjectMeta')] == 2
+
+        # Existing blobs are only replaced with force_replace_image
+        with pytest.raises(AliyunImageUploadException):
+            self.image.upload_image_tarball_to_buckets(
+                str(image_file),
+                destinations
+            )
+
+        # A failing destination does not stop the others
+        self.server.inject_failure('UploadPart', count=10, region='cn-beijing')
+        image_file.write_bytes(data[:1000])
+
+        with pytest.raises(AliyunImageUploadException) as error:
+            self.image.upload_image_tarball_to_buckets(
+                str(image_file),
+                destinations,
+                force_replace_image=True
+            )
+
+        assert 'images (cn-beijing)' in str(error.value)
+        assert self.server.calls['AbortMultipartUpload'] == 1
+        assert self.server.get_object('images-eu', blob_name) == data[:1000]
+
+    def test_list_and_delete_blobs(self):
+        for index in range(5):
+            self.server.put_object('images', f'blob-{index}.qcow2', b'x')
+
+        blobs = [blob.key for blob in self.image.list_storage_blobs('blob-')]
+        assert blobs == [f'blob-{index}.qcow2' for index in range(5)]
+
+        deleted = self.image.delete_storage_blobs(blobs[:2])
+        assert sorted(deleted) == blobs[:2]
+        assert len(list(self.image.list_storage_blobs())) == 3
+
+    def test_image_lifecycle(self):
+        self.server.put_object('images', 'image.qcow2', b'image')
+        image_id = self.image.create_compute_image(
+            'image-v1',
+            'Test image',
+            'image.qcow2',
+            'SUSE'
+        )
+
+        image = self.image.get_compute_image(image_id=image_id)
+        assert image['ImageName'] == 'image-v1'
+        assert image['Status'] == 'Available'
+        assert self.clock.time() >= 1700000060
+
+        images = self.image.replicate_image(
+            'image-v1',
+            regions=['cn-shanghai', 'eu-central-1']
+        )
+        assert all(images.values())
+
+        self.image.publish_image('image-v1', 'hidden')
+        assert self.server.images[image_id]['launch_permission'] == 'hidden'
+
+        self.image.deprecate_image('image-v1')
+        tags = self.server.images[image_id]['tags']
+        assert 'Deprecated on' in tags
+
+        self.image.delete_compute_image('image-v1')
+        assert image_id not in self.server.images
+
+    def test_failure_injection(self):
+        self.server.add_image('image-v1', 'cn-beijing')
+        self.server.inject_failure(
+            'DescribeImages',
+            status=400,
+            code='InvalidParameter'
+        )
+
+        with pytest.raises(AliyunImageException):
+            self.image.get_compute_image(image_name='image-v1')
+
+        image = self.image.get_compute_image(image_name='image-v1')
+        assert image['ImageName'] == 'image-v1'
+        assert self.server.calls['DescribeImages'] == 2
+
+    def test_bucket_not_found(self):
+        self.image.bucket_name = 'missing'
+
+        with pytest.raises(AliyunException) as error:
+            self.image.image_tarball_exists('image.qcow2')
+
+        assert 'bucket does not exist' in str(error.value)
+
+    def test_throttling(self):
+        self.server.profile = ServiceProfile(rate_limit=1)
+        self.server.put_object('images', 'image.qcow2', b'x')
+        self.image.image_tarball_exists('image.qcow2')
+
+        with pytest.raises(oss2.exceptions.ServerError) as error:
+            self.image.image_tarball_exists('image.qcow2')
+
+        assert error.value.status == 503
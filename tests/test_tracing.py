@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils tracing tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import inspect
+import json
+
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+
+from click.testing import CliRunner
+
+from aliyun_img_utils.aliyun_cli import main
+from aliyun_img_utils.aliyun_clock import VirtualClock
+from aliyun_img_utils.aliyun_image import AliyunImage
+from aliyun_img_utils.aliyun_scheduler import ImageJobScheduler
+from aliyun_img_utils.aliyun_tracing import (
+    ContextThreadPoolExecutor,
+    Tracer,
+    current_span,
+    get_default_tracer
+)
+from aliyun_img_utils.testing import FakeAliyunServer
+
+
+def get_spans(tracer, name=None):
+    return [
+        event for event in tracer.to_dict()['traceEvents']
+        if event['ph'] == 'X' and name in (None, event['name'])
+    ]
+
+
+def test_tracer_spans(tmp_path):
+    tracer = Tracer()
+
+    with tracer.span('outer', region='cn-beijing') as outer_id:
+        with pytest.raises(ValueError):
+            with tracer.span('inner'):
+                raise ValueError('Failed')
+
+    assert current_span.get() is None
+
+    inner, outer = get_spans(tracer, 'inner')[0], get_spans(tracer, 'outer')[0]
+    assert inner['args']['parent_id'] == outer_id
+    assert inner['args']['error'] == 'ValueError'
+    assert outer['args']['region'] == 'cn-beijing'
+    assert outer['dur'] >= inner['dur']
+
+    path = tmp_path / 'trace.json'
+    tracer.write_json(str(path))
+    trace = json.loads(path.read_text())
+    assert trace['traceEvents'][0]['name'] == 'thread_name'
+
+
+def test_context_propagation():
+    tracer = Tracer()
+
+    def child(name):
+        with tracer.span(name):
+            pass
+
+    with tracer.span('parent') as parent_id:
+        with ContextThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(child, 'pool').result()
+
+        with ImageJobScheduler() as scheduler:
+            scheduler.submit('cn-beijing', child, 'job').result()
+
+    for name in ('pool', 'job'):
+        span = get_spans(tracer, name)[0]
+        assert span['args']['parent_id'] == parent_id
+
+
+class TestTracingFakeServer(object):
+    """Test tracing of AliyunImage against the local fake server."""
+
+    def setup_method(self, method):
+        self.clock = VirtualClock(start=1700000000)
+        self.server = FakeAliyunServer(
+            regions=['cn-beijing', 'cn-shanghai'],
+            clock=self.clock
+        )
+        self.server.start()
+        self.server.create_bucket('images', 'cn-beijing')
+        self.server.put_object('images', 'image.qcow2', b'image')
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def test_image_spans(self):
+        tracer = Tracer()
+        image = AliyunImage(
+            'key',
+            'secret',
+            'cn-beijing',
+            bucket_name='images',
+            clock=self.clock,
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint,
+            tracer=tracer
+        )
+
+        image.create_compute_image('image-v1', 'Test', 'image.qcow2', 'SUSE')
+        image.find_images_in_regions('image-v1', ['cn-beijing', 'cn-shanghai'])
+        image.publish_image_to_regions(
+            'image-v1',
+            'hidden',
+            ['cn-beijing', 'cn-shanghai']
+        )
+
+        create = get_spans(tracer, 'AliyunImage.create_compute_image')[0]
+        assert create['args']['image_name'] == 'image-v1'
+
+        wait = get_spans(tracer, 'AliyunImage.wait_on_compute_image')[0]
+        assert wait['args']['parent_id'] == create['args']['span_id']
+        assert get_spans(tracer, 'sleep')
+
+        find = get_spans(tracer, 'AliyunImage.find_images_in_regions')[0]
+        lookups = get_spans(tracer, 'AliyunImage.get_compute_images')
+        assert {
+            span['args']['region'] for span in lookups
+            if span['args']['parent_id'] == find['args']['span_id']
+        } == {'cn-beijing', 'cn-shanghai'}
+
+        region = get_spans(tracer, 'cn-shanghai')[0]
+        assert region['cat'] == 'region'
+        publish = get_spans(tracer, 'AliyunImage.publish_image')[1]
+        assert publish['args']['parent_id'] == region['args']['span_id']
+
+        # Generator methods are not wrapped in a span
+        blobs = image.list_storage_blobs()
+        assert inspect.isgenerator(blobs)
+        assert [blob.key for blob in blobs] == ['image.qcow2']
+        assert not get_spans(tracer, 'AliyunImage.list_storage_blobs')
+
+    def test_cli_trace_file(self, tmp_path):
+        self.server.add_image('image-v1', 'cn-beijing')
+        trace_file = tmp_path / 'trace.json'
+        args = [
+            'image', 'info', '--image-name', 'image-v1', '--access-key',
+            'key', '--access-secret', 'secret', '--region', 'cn-beijing',
+            '--trace-file', str(trace_file)
+        ]
+
+        image_class = partial(
+            AliyunImage,
+            compute_endpoint=self.server.compute_endpoint,
+            storage_endpoint=self.server.storage_endpoint
+        )
+
+        with patch('aliyun_img_utils.aliyun_cli.AliyunImage', image_class):
+            result = CliRunner().invoke(main, args)
+
+        assert result.exit_code == 0
+        assert get_default_tracer() is None
+
+        trace = json.loads(trace_file.read_text())
+        names = [event['name'] for event in trace['traceEvents']]
+        assert 'AliyunImage.get_compute_image' in names
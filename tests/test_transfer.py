@@ -0,0 +1,371 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Aliyun img utils async transfer engine tests."""
+
+# Copyright (c) 2026 SUSE LLC. All rights reserved.
+#
+# This file is part of aliyun_img_utils. aliyun_img_utils provides an
+# api and command line utilities for handling images in the Aliyun Cloud.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import oss2
+
+from datetime import datetime
+
+from unittest.mock import patch, Mock
+
+from pytest import mark, raises
+
+from aliyun_img_utils.aliyun_exceptions import (
+    AliyunException,
+    AliyunTransferException
+)
+from aliyun_img_utils.aliyun_telemetry import TransferTelemetry
+from aliyun_img_utils.aliyun_transfer import (
+    AsyncTransferEngine,
+    put_blob_async
+)
+
+
+class FakeResponse(object):
+    def __init__(self, status=200, headers=None, body=b''):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def read(self):
+        return self.body
+
+
+class FakeSession(object):
+    """Records requests and answers like OSS."""
+
+    def __init__(self, objects=None):
+        self.requests = []
+        self.objects = objects or {}
+        self.closed = False
+
+    def request(self, method, url, headers=None, data=None):
+        self.requests.append((method, url, headers, data))
+
+        if 'Signature=' not in url and 'x-oss-signature=' not in url:
+            return FakeResponse(403, body=b'<Error/>')
+        elif method == 'POST' and '?uploads&' in url:
+            return FakeResponse(
+                body=b'<Result><UploadId>upload-1</UploadId></Result>'
+            )
+        elif method == 'PUT' and 'x-oss-copy-source' in headers:
+            return FakeResponse(
+                body=b'<CopyPartResult><ETag>"copy"</ETag></CopyPartResult>'
+            )
+        elif method == 'PUT':
+            return FakeResponse(headers={'ETag': '"etag"'})
+        elif method == 'HEAD':
+            size = len(self.objects['blob.qcow2'])
+            return FakeResponse(headers={'Content-Length': str(size)})
+        elif method == 'GET':
+            start, end = headers['Range'][6:].split('-')
+            data = self.objects['blob.qcow2'][int(start):int(end) + 1]
+            return FakeResponse(body=data)
+        elif method == 'DELETE':
+            return FakeResponse(204)
+
+        return FakeResponse()
+
+    async def close(self):
+        self.closed = True
+
+
+def get_engine(session, auth=None):
+    return AsyncTransferEngine(
+        auth or oss2.Auth('12345', '54321'),
+        'test-bucket',
+        'https://oss-cn-beijing.aliyuncs.com',
+        region='cn-beijing',
+        max_concurrency=2,
+        session=session
+    )
+
+
+@mark.parametrize('auth_class', [oss2.Auth, oss2.AuthV4])
+def test_sign_matches_oss2(auth_class):
+    auth = auth_class('12345', '54321')
+    engine = get_engine(FakeSession(), auth)
+    bucket = oss2.Bucket(
+        auth,
+        engine.endpoint,
+        engine.bucket_name,
+        region=engine.region
+    )
+    params = {'partNumber': '1', 'uploadId': 'upload-1'}
+    headers = {'Content-Type': 'application/octet-stream'}
+
+    with patch('oss2.auth.datetime') as mock_datetime, \
+            patch('oss2.auth.time.time') as mock_time:
+        mock_datetime.utcnow.return_value = datetime(2026, 1, 2, 3, 4, 5)
+        mock_time.return_value = 1767323045
+        url = engine.sign('PUT', 'dir/blob.qcow2', params, headers)
+        expected = bucket.sign_url(
+            'PUT',
+            'dir/blob.qcow2',
+            900,
+            headers=dict(headers),
+            params=dict(params),
+            slash_safe=True
+        )
+
+    # The same request is presigned exactly as oss2 presigns it
+    assert url == expected
+    assert params == {'partNumber': '1', 'uploadId': 'upload-1'}
+
+
+def test_sign():
+    engine = get_engine(FakeSession())
+    url = engine.sign('POST', 'dir/blob.qcow2', {'uploads': ''})
+    assert url.startswith(
+        'https://test-bucket.oss-cn-beijing.aliyuncs.com/dir/blob.qcow2'
+        '?uploads&OSSAccessKeyId=12345&Expires='
+    )
+    assert '&Signature=' in url
+
+    # V4 signature
+    engine = get_engine(FakeSession(), oss2.AuthV4('12345', '54321'))
+    url = engine.sign('GET', 'blob.qcow2')
+    assert 'x-oss-signature-version=OSS4-HMAC-SHA256' in url
+    assert 'x-oss-signature=' in url
+
+
+def test_put_blob():
+    session = FakeSession()
+    engine = get_engine(session)
+    callback = Mock()
+    telemetry = TransferTelemetry()
+
+    asyncio.run(
+        engine.put_blob(
+            'blob.qcow2',
+            'tests/data/blob.vhd',
+            page_size=100 * 1024,
+            progress_callback=callback,
+            telemetry=telemetry
+        )
+    )
+
+    assert telemetry.endpoint == engine.endpoint
+    assert telemetry.summary()['bytes'] == os.path.getsize(
+        'tests/data/blob.vhd'
+    )
+
+    methods = [request[0] for request in session.requests]
+    assert methods[0] == 'POST'
+    assert methods[-1] == 'POST'
+    assert '/blob.qcow2?uploads&' in session.requests[0][1]
+    assert b'<PartNumber>1</PartNumber>' in session.requests[-1][3]
+    assert callback.call_args[1] == {'done': True}
+
+    put = [request for request in session.requests if request[0] == 'PUT']
+    assert put[0][2]['Content-Type'] == 'application/octet-stream'
+    assert 'partNumber=1&uploadId=upload-1' in put[0][1]
+
+
+def test_put_blob_failure():
+    session = FakeSession()
+    engine = get_engine(session)
+
+    attempts = []
+
+    async def upload_part(*args):
+        attempts.append(args)
+        raise AliyunTransferException('Failed', 503)
+
+    engine.upload_part = upload_part
+
+    with patch('aliyun_img_utils.aliyun_retry.asyncio.sleep') as mock_sleep:
+        with raises(AliyunException):
+            asyncio.run(
+                engine.put_blob('blob.qcow2', 'tests/data/blob.vhd')
+            )
+
+    # Part is retried twice with backoff then the upload is aborted
+    assert len(attempts) == 3
+    assert mock_sleep.call_count == 2
+    assert session.requests[-1][0] == 'DELETE'
+
+
+def test_put_blob_client_error():
+    session = FakeSession()
+    engine = get_engine(session)
+
+    attempts = []
+
+    async def upload_part(*args):
+        attempts.append(args)
+        raise AliyunTransferException('Access denied', 403)
+
+    engine.upload_part = upload_part
+    telemetry = TransferTelemetry()
+
+    with raises(AliyunException):
+        asyncio.run(
+            engine.put_blob(
+                'blob.qcow2',
+                'tests/data/blob.vhd',
+                telemetry=telemetry
+            )
+        )
+
+    # Client errors are not retried
+    assert len(attempts) == 1
+    assert session.requests[-1][0] == 'DELETE'
+    assert telemetry.end_time
+
+
+def test_put_blob_failure_cancels_parts(tmp_path):
+    image_file = tmp_path / 'blob.qcow2'
+    image_file.write_bytes(os.urandom(300 * 1024))
+    session = FakeSession()
+    engine = get_engine(session)
+
+    events = []
+
+    async def upload_part(key, upload_id, part_number, data):
+        if part_number == 1:
+            raise AliyunTransferException('Access denied', 403)
+
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append(('cancelled', part_number))
+            raise
+
+    async def abort_multipart_upload(key, upload_id):
+        events.append(('abort', upload_id))
+
+    engine.upload_part = upload_part
+    engine.abort_multipart_upload = abort_multipart_upload
+
+    with raises(AliyunException):
+        asyncio.run(
+            engine.put_blob(
+                'blob.qcow2',
+                str(image_file),
+                page_size=100 * 1024
+            )
+        )
+
+    # Parts in flight are cancelled and awaited before the abort
+    assert ('cancelled', 2) in events
+    assert events[-1] == ('abort', 'upload-1')
+
+
+def test_get_blob(tmp_path):
+    data = bytes(range(256)) * 10
+    session = FakeSession({'blob.qcow2': data})
+    engine = get_engine(session)
+    path = str(tmp_path / 'blob.qcow2')
+
+    asyncio.run(engine.get_blob('blob.qcow2', path, page_size=1000))
+
+    with open(path, 'rb') as blob:
+        assert blob.read() == data
+
+
+def test_upload_part_copy():
+    session = FakeSession()
+    engine = get_engine(session)
+
+    etag = asyncio.run(
+        engine.upload_part_copy(
+            'source-bucket',
+            'dir/blob.qcow2',
+            (0, 99),
+            'blob.qcow2',
+            'upload-1',
+            1
+        )
+    )
+    assert etag == 'copy'
+
+    headers = session.requests[0][2]
+    assert headers['x-oss-copy-source'] == '/source-bucket/dir%2Fblob.qcow2'
+    assert headers['x-oss-copy-source-range'] == 'bytes=0-99'
+
+
+def test_request_errors():
+    session = FakeSession()
+    engine = get_engine(session)
+
+    # Error status
+    session.request = Mock(
+        return_value=FakeResponse(
+            404,
+            body=b'<Error><Message>Not found</Message></Error>'
+        )
+    )
+    with raises(AliyunException) as error:
+        asyncio.run(engine.get_object_size('blob.qcow2'))
+    assert 'Not found' in str(error.value)
+
+    # Connection error
+    session.request = Mock(side_effect=OSError('Refused'))
+    with raises(AliyunException):
+        asyncio.run(engine.get_object_size('blob.qcow2'))
+
+    asyncio.run(engine.close())
+    assert session.closed
+
+
+def test_missing_aiohttp():
+    engine = get_engine(None)
+
+    with patch.dict('sys.modules', {'aiohttp': None}):
+        with raises(AliyunException):
+            engine.session
+
+
+@patch('aliyun_img_utils.aliyun_transfer.AsyncTransferEngine')
+def test_put_blob_async(mock_engine_class):
+    engine = Mock()
+
+    async def put_blob(*args, **kwargs):
+        engine.put_blob_args = args
+
+    async def enter():
+        return engine
+
+    async def exit(*args):
+        pass
+
+    engine.put_blob = put_blob
+    mock_engine_class.return_value.__aenter__ = lambda self: enter()
+    mock_engine_class.return_value.__aexit__ = lambda self, *args: exit()
+
+    put_blob_async(
+        oss2.Auth('12345', '54321'),
+        'test-bucket',
+        'https://oss-accelerate.aliyuncs.com',
+        'blob.qcow2',
+        'tests/data/blob.vhd'
+    )
+    assert engine.put_blob_args == ('blob.qcow2', 'tests/data/blob.vhd')
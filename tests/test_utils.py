@@ -21,6 +21,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import logging
+
 from aliyun_img_utils.aliyun_exceptions import AliyunException
 from pytest import raises
 from unittest.mock import patch, Mock
@@ -28,7 +30,14 @@ from unittest.mock import patch, Mock
 from aliyun_img_utils.aliyun_utils import (
     put_blob,
     click_progress_callback,
+    click_image_progress_callback,
+    format_eta,
     get_compute_client,
+    get_logger,
+    get_storage_auth,
+    get_storage_bucket_client,
+    get_storage_session,
+    grow_storage_session,
     import_key_pair,
     delete_key_pair
 )
@@ -40,6 +49,67 @@ def tests_click_progress_bar(mock_click):
     bar.pos = 0
     mock_click.progressbar.return_value = bar
     click_progress_callback(15, 15)
+    click_progress_callback(0, 15, done=True)
+
+    click_progress_callback(1, 2, label='Deleting blobs')
+    mock_click.progressbar.assert_called_with(
+        length=2,
+        label='Deleting blobs'
+    )
+    click_progress_callback(0, 2, done=True)
+
+
+@patch('aliyun_img_utils.aliyun_utils.click')
+def tests_click_image_progress_bar(mock_click):
+    bar = Mock()
+    bar.pos = 0
+    mock_click.progressbar.return_value = bar
+
+    click_image_progress_callback(0, None)
+    mock_click.progressbar.assert_called_with(
+        length=100,
+        label='Creating image',
+        show_eta=False,
+        item_show_func=format_eta
+    )
+    bar.pos = 40
+    click_image_progress_callback(60, 120)
+    bar.update.assert_called_with(20, current_item=120)
+
+    click_image_progress_callback(100, 0)
+    bar.render_finish.assert_called_once_with()
+
+
+def test_format_eta():
+    assert format_eta(None) is None
+    assert format_eta(42.4) == '42s remaining'
+    assert format_eta(125) == '2m 05s remaining'
+    assert format_eta(3 * 3600 + 60) == '3h 01m remaining'
+
+
+def test_grow_storage_session():
+    shared = get_storage_session()
+    own_session = Mock()
+    clients = [Mock(session=shared), Mock(session=own_session)]
+
+    grow_storage_session(clients, 64)
+
+    # Clients of the shared session move to the grown session
+    assert clients[0].session is get_storage_session()
+    assert clients[0].session is not shared
+    assert clients[1].session is own_session
+    assert get_storage_session(8) is clients[0].session
+
+
+def test_get_logger():
+    debug = get_logger(logging.DEBUG)
+    info = get_logger(logging.INFO)
+
+    # Commands at other levels keep their level and share the handler
+    assert get_logger(logging.DEBUG) is debug
+    assert debug.level == logging.DEBUG
+    assert info.level == logging.INFO
+    assert len(logging.getLogger('aliyun_img_utils').handlers) == 1
 
 
 @patch('aliyun_img_utils.aliyun_utils.oss2')
@@ -57,7 +127,7 @@ def test_put_blob(mock_oss2):
     )
 
 
-@patch('aliyun_img_utils.aliyun_utils.AcsClient')
+@patch('aliyun_img_utils.aliyun_utils.sdk_client.AcsClient')
 def test_get_compute_client(mock_acs):
     client = Mock()
     mock_acs.return_value = client
@@ -94,3 +164,29 @@ def test_delete_key():
 
     with raises(AliyunException):
         delete_key_pair('key123', client)
+
+
+@patch('aliyun_img_utils.aliyun_utils.module.storage_session', None)
+@patch('aliyun_img_utils.aliyun_utils.module.storage_pool_size', 0)
+def test_storage_session():
+    auth = get_storage_auth('key', 'secret')
+    beijing = get_storage_bucket_client(auth, 'images', 'cn-beijing')
+    shanghai = get_storage_bucket_client(
+        auth,
+        'images',
+        'cn-shanghai',
+        transfer_acceleration=False
+    )
+    assert beijing.session is shanghai.session
+
+    # Larger pool replaces the shared session
+    bucket = get_storage_bucket_client(
+        auth,
+        'images',
+        'eu-central-1',
+        pool_size=64
+    )
+    assert bucket.session is not beijing.session
+
+    bucket = get_storage_bucket_client(auth, 'images', 'cn-beijing')
+    assert bucket.session.session.adapters['https://']._pool_maxsize == 64